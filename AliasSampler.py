@@ -0,0 +1,134 @@
+"""
+Alias method sampler: draws from any weighted distribution in O(1) per draw.
+"""
+
+
+class AliasSampler:
+    """
+    Draws items with given weights using the alias method (Vose). The
+        weights are split into a table with one column per item, each
+        column holding its own item and (for the rest of the column)
+        one alias item, so a draw is one random number: it picks a
+        column and where in the column it lands picks the item or its
+        alias. Building the table is O(n), and every draw is O(1)
+        however many items there are.
+
+    Attributes
+    ----------
+    items: list
+        - The items that can be drawn.
+
+    _probabilities: list[float]
+        - How much of each column belongs to its own item (the rest belongs to its alias).
+
+    _aliases: list[int]
+        - The alias item (index) of each column.
+
+    _size: int
+        - How many columns the table has.
+
+    Methods
+    -------
+    sample(random):
+        - Draw one item.
+
+    sample_many(random, amount, out, start):
+        - Draw many items in one call (into a list).
+
+    probability(item):
+        - Return the probability of drawing an item.
+    """
+
+    def __init__(self, weights: dict):
+        """
+        Construct all the necessary attributes for the AliasSampler object
+            and build the alias table.
+
+        Parameters
+        ----------
+        weights: dict
+            - The weight of each item (weights don't have to add up to 1,
+                and items with no weight are never drawn).
+        """
+        self.items = [item for item, weight in weights.items() if weight > 0]
+        if not self.items:
+            raise ValueError("At least one item must have a weight above 0.")
+        total = sum(weights[item] for item in self.items)
+        size = len(self.items)
+        # Each column holds 1 (the average scaled weight).
+        scaled = [weights[item] * size / total for item in self.items]
+        self._probabilities = [1.0] * size
+        self._aliases = list(range(size))
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            # A column that is too small is filled up with a column that is too big.
+            small_index, large_index = small.pop(), large.pop()
+            self._probabilities[small_index] = scaled[small_index]
+            self._aliases[small_index] = large_index
+            scaled[large_index] -= 1 - scaled[small_index]
+            (small if scaled[large_index] < 1 else large).append(large_index)
+        # Columns left over are full (up to rounding errors).
+        self._size = size
+
+    def sample(self, random):
+        """
+        Draw one item.
+
+        Parameters
+        ----------
+        random: random.Random
+            - The random stream to draw with.
+        """
+        position = random.random() * self._size
+        column = int(position)
+        if position - column < self._probabilities[column]:
+            return self.items[column]
+        return self.items[self._aliases[column]]
+
+    def sample_many(self, random, amount: int, out: list = None, start: int = 0) -> list:
+        """
+        Draw many items in one call and return the list they were put in.
+
+        Parameters
+        ----------
+        random: random.Random
+            - The random stream to draw with.
+
+        amount: int
+            - How many items to draw.
+
+        out: list
+            - The list to put the items in (a new list by default).
+
+        start: int
+            - Where in the list to put the first item (the list is grown if it is too short).
+        """
+        if out is None:
+            out = []
+        if len(out) < start + amount:
+            out.extend([None] * (start + amount - len(out)))
+        items, probabilities, aliases, size = self.items, self._probabilities, self._aliases, self._size
+        next_random = random.random
+        for index in range(start, start + amount):
+            position = next_random() * size
+            column = int(position)
+            out[index] = items[column] if position - column < probabilities[column] else items[aliases[column]]
+        return out
+
+    def probability(self, item) -> float:
+        """
+        Return the probability of drawing an item.
+
+        Parameters
+        ----------
+        item
+            - The item.
+        """
+        probability = 0.0
+        for column in range(self._size):
+            if self.items[column] == item:
+                probability += self._probabilities[column]
+            if self.items[self._aliases[column]] == item:
+                probability += 1 - self._probabilities[column]
+        return probability / self._size
@@ -0,0 +1,212 @@
+"""
+Batched bot moves: finds the next word of many games in one vectorized pass.
+"""
+
+
+# Importing libraries and modules.
+import numpy as np
+
+from BotFunctions import Bot
+from GameSettings import GameSettings
+from LetterUtility import LetterUtility
+
+
+class BotBatch:
+    """
+    Finds the bots next word for N games at once (e.g. hundreds of games
+        hosted in one process, or simulations), with the same choices as
+        Bot._next_word but without the per-game Python overhead
+        (except that a second copy of a card does not add a second
+        suggestion for the easy and medium bots to pick from).
+
+    Words are encoded as rows of letter numbers and as base-26 codes, so
+        every possible move of every game (N x word length x 26) is made
+        with array arithmetic and checked against a sorted table of the
+        codes of the bots words (one np.searchsorted for the whole batch).
+    Hands are card counts (N x 27, in GameSettings card index order).
+
+    Attributes
+    ----------
+    game_settings: GameSettings
+        - The rules of the games in the batch (the rule profile that is picked by default).
+
+    _difficulty_level: Bot.Difficulty
+        - The difficulty of the bots in the batch.
+
+    _word_length: int
+        - The length of the words in the game.
+
+    _word_codes: np.ndarray
+        - Sorted base-26 codes of the bots words.
+
+    _place_values: np.ndarray
+        - Value of a letter in each position of a word code.
+
+    _letter_order: np.ndarray
+        - The letters in the order the bot tries them (alphabetical,
+            or least useful first for the hard bot).
+
+    _random: np.random.Generator
+        - Random generator for the easy and medium bots choices.
+
+    Methods
+    -------
+    encode_words(words):
+        - Return the letter numbers of a list of words (N x word length).
+
+    encode_hands(hands):
+        - Return the card counts of a list of hands (N x 27).
+
+    next_moves(words, hands):
+        - Return the new word code, position and letter of the bots move
+            in each game (with -1 where there is no move).
+
+    next_words(words, hands):
+        - Return the bots answer and card for each game (like Bot._next_word).
+    """
+
+    _STAR = GameSettings.card_index(GameSettings.STAR_CARD)
+
+    game_settings = GameSettings()
+
+    def __init__(self, difficulty_level: Bot.Difficulty, words, settings: GameSettings = None, seed: int = None):
+        """
+        Construct all the necessary attributes for the BotBatch object.
+
+        Parameters
+        ----------
+        difficulty_level: Bot.Difficulty
+            - The difficulty of the bots in the batch.
+
+        words: Iterable[str]
+            - The words that the bots can play (e.g. Bot.bot_words of a bot with the same difficulty).
+
+        settings: GameSettings
+            - The rules of the games (the rule profile that is picked by default).
+
+        seed: int
+            - Seed of the random choices (random every time by default).
+        """
+        self.game_settings = BotBatch.game_settings if settings is None else settings
+        self._difficulty_level = difficulty_level
+        self._word_length = self.game_settings.WORD_LENGTH
+        self._place_values = 26 ** np.arange(self._word_length - 1, -1, -1, dtype=np.int64)
+        self._word_codes = np.sort(self.encode_words(sorted(words)) @ self._place_values)
+
+        if difficulty_level == Bot.Difficulty.HARD:  # The hard bot tries its least useful cards first.
+            # The letter utilities of the rules (like Bot.letter_frequency_sort, ties keep alphabetical order).
+            letter_utilities = LetterUtility.letter_utilities(self.game_settings.ALL_BOT_WORDS, self._word_length)
+            self._letter_order = np.array([GameSettings.card_index(letter)
+                                           for letter in sorted(GameSettings.ALPHABET, key=letter_utilities.get)])
+        else:
+            self._letter_order = np.arange(len(GameSettings.ALPHABET))
+        self._random = np.random.default_rng(seed)
+
+    def encode_words(self, words: list[str]) -> np.ndarray:
+        """
+        Return the letter numbers (0-25, or 26 for a star card) of a list of words.
+
+        Parameters
+        ----------
+        words: list[str]
+            - The words (all of the game's word length).
+        """
+        letters = np.frombuffer("".join(words).lower().encode(), dtype=np.uint8).reshape(-1, self._word_length)
+        return np.where(letters == ord(GameSettings.STAR_CARD), self._STAR, letters.astype(np.int64) - 97)
+
+    @staticmethod
+    def encode_hands(hands: list[list[str]]) -> np.ndarray:
+        """
+        Return the card counts (N x 27, by card index) of a list of hands.
+
+        Parameters
+        ----------
+        hands: list[list[str]]
+            - The cards of each hand.
+        """
+        counts = np.zeros((len(hands), len(GameSettings.ALPHABET) + 1), dtype=np.int16)
+        for hand_number, hand in enumerate(hands):
+            for card in hand:
+                counts[hand_number, GameSettings.card_index(card.lower())] += 1
+        return counts
+
+    def next_moves(self, words: np.ndarray, hands: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the code of the new word, the position and the letter of the
+            bots move in each game (-1 where there is no move), and whether
+            the move uses a star card.
+
+        Parameters
+        ----------
+        words: np.ndarray
+            - Letter numbers of the current word of each game (from encode_words).
+
+        hands: np.ndarray
+            - Card counts of the bots hand in each game (from encode_hands).
+        """
+        games = len(words)
+        codes = words @ self._place_values  # (N,)
+        letters = np.arange(len(GameSettings.ALPHABET))
+        # Code of every word with one letter changed: (N, position, letter).
+        new_codes = (codes[:, None, None]
+                     + (letters[None, None, :] - words[:, :, None]) * self._place_values[None, :, None])
+        found = np.searchsorted(self._word_codes, new_codes).clip(max=len(self._word_codes) - 1)
+        is_word = (self._word_codes[found] == new_codes) & (letters[None, None, :] != words[:, :, None])
+
+        # Letter moves: a letter card can be played if the bot holds it (first position that makes a word).
+        playable = is_word & (hands[:, None, :len(letters)] > 0)
+        has_move = playable.any(axis=1)  # (N, letter)
+        first_position = playable.argmax(axis=1)  # (N, letter)
+        ordered = has_move[:, self._letter_order]
+        if self._difficulty_level == Bot.Difficulty.HARD:  # First letter in the order (the least useful card).
+            choice = ordered.argmax(axis=1)
+        else:  # A random letter out of the letters that have a move.
+            choice = np.where(ordered, self._random.random(ordered.shape), -1).argmax(axis=1)
+        letter = self._letter_order[choice]
+        rows = np.arange(games)
+        position = first_position[rows, letter]
+        letter_found = ordered.any(axis=1)
+
+        # Star moves (only when there is no letter move): like Bot._next_word, the last letter
+        # of the alphabet that makes a word, in the first position where it does.
+        letter_makes_word = is_word.any(axis=1)  # (N, letter)
+        star_found = ~letter_found & (hands[:, self._STAR] > 0) & letter_makes_word.any(axis=1)
+        star_letter = len(letters) - 1 - letter_makes_word[:, ::-1].argmax(axis=1)
+        star_position = is_word.argmax(axis=1)[rows, star_letter]
+
+        letter = np.where(letter_found, letter, np.where(star_found, star_letter, -1))
+        position = np.where(letter_found, position, np.where(star_found, star_position, -1))
+        new_code = np.where(letter >= 0, new_codes[rows, position, letter], -1)
+        return new_code, position, letter, star_found
+
+    def next_words(self, words: list[str], hands) -> list[tuple]:
+        """
+        Return the bots answer and the card it used for each game
+            (or (None, None) for a game where no word is found), like Bot._next_word.
+
+        Parameters
+        ----------
+        words: list[str]
+            - The current word of each game.
+
+        hands: list[list[str]] | np.ndarray
+            - The bots cards in each game (or their counts from encode_hands).
+        """
+        if not isinstance(hands, np.ndarray):
+            hands = self.encode_hands(hands)
+        new_codes, positions, letters, star_moves = self.next_moves(self.encode_words(words), hands)
+
+        # Decode the new words (N x word length letters) back into strings.
+        new_letters = (new_codes[:, None] // self._place_values[None, :]) % 26
+        new_letters[star_moves, positions[star_moves]] = self._STAR
+        characters = np.where(new_letters == self._STAR, ord(GameSettings.STAR_CARD), new_letters + 97)
+        new_words = characters.astype(np.uint8).tobytes().decode()
+
+        answers = []
+        for game, letter in enumerate(letters.tolist()):
+            if letter < 0:
+                answers.append((None, None))
+            else:
+                new_word = new_words[game * self._word_length:(game + 1) * self._word_length]
+                answers.append((new_word, Bot.STAR_CARD if star_moves[game] else GameSettings.ALPHABET[letter]))
+        return answers
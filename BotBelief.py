@@ -0,0 +1,309 @@
+"""
+Belief about the opponents hand: a weighted set of sampled hands (particle filter).
+"""
+
+
+# Importing libraries and modules.
+import numpy as np
+
+from GameSettings import GameSettings
+from WordGraph import WordGraph
+
+
+class OpponentBelief:
+    """
+    Tracks what the bot believes the opponents hand is, from what it can
+        see: the deck composition (Game.card_stack), the cards that the
+        opponent plays, their penalty draws, their missed turns and their
+        discards.
+
+    The belief is K sampled hands (K x 27 card counts) with a weight each,
+        and every observation updates all of them at once with array
+        operations, so an update takes well under a millisecond.
+    Every observation (and every draw of sample_hands) is kept, so the
+        same belief can be made again from its seed and its observations
+        (e.g. to resume a saved match) without keeping the sampled hands.
+
+    Attributes
+    ----------
+    card_weights: np.ndarray
+        - Probability of each card (by card index) in a deck from Game.card_stack
+            (from deck_probabilities, for the rules of the game).
+
+    MISSED_TURN_PROBABILITY: float
+        - Probability that the opponent misses a turn when they had a move
+            (e.g. they ran out of time).
+
+    hands: np.ndarray
+        - The sampled hands (K x 27 card counts).
+
+    weights: np.ndarray
+        - The weight of each sampled hand (they add up to 1).
+
+    seed: int
+        - Seed of the samples.
+
+    observations: list[tuple[str, str | int | None]]
+        - Everything that changed the belief, in order (the name of the
+            observation and the card, word or amount that came with it).
+
+    _graph: WordGraph
+        - Graph of the words the opponent can play.
+
+    _random: np.random.Generator
+        - Random generator of the samples.
+
+    Methods
+    -------
+    observe_play(card):
+        - Update the belief after the opponent plays a card.
+
+    observe_penalty():
+        - Update the belief after the opponent draws a penalty card.
+
+    observe_missed_turn(word):
+        - Update the belief after the opponent doesn't change a word.
+
+    observe_discard():
+        - Update the belief after the opponent discards a card.
+
+    card_probabilities():
+        - Return the probability that the opponent holds each card.
+
+    deck_probabilities(settings):
+        - Return the probability of each card in a deck from Game.card_stack.
+
+    move_probability(word):
+        - Return the probability that the opponent has a move for a word.
+
+    sample_hands(amount):
+        - Return hands drawn from the belief (as lists of cards).
+
+    replay(observations):
+        - Apply observations of another belief with the same seed (to make it again).
+    """
+
+    MISSED_TURN_PROBABILITY = 0.1
+    _deck_probabilities = {}  # The probabilities of the cards of each deck composition (made once for each one).
+
+    _STAR = GameSettings.card_index(GameSettings.STAR_CARD)
+
+    def __init__(self, words, hand_size: int, particles: int = 2000, seed: int = None,
+                 settings: GameSettings = None):
+        """
+        Construct all the necessary attributes for the OpponentBelief object.
+
+        Parameters
+        ----------
+        words: Iterable[str]
+            - The words that the opponent can play.
+
+        hand_size: int
+            - How many cards the opponent starts with.
+
+        particles: int
+            - How many hands are sampled (more is more accurate but slower).
+
+        seed: int
+            - Seed of the samples (a random seed by default).
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        self.card_weights = OpponentBelief.deck_probabilities(GameSettings() if settings is None else settings)
+        self._graph = WordGraph(words)
+        self.seed = int(np.random.default_rng().integers(1 << 63)) if seed is None else seed
+        self._random = np.random.default_rng(self.seed)
+        self.observations = []
+        self.hands = np.zeros((particles, len(self.card_weights)), dtype=np.int16)
+        self.weights = np.full(particles, 1 / particles)
+        for _ in range(hand_size):
+            self._add_random_cards()
+
+    @staticmethod
+    def deck_probabilities(settings: GameSettings) -> np.ndarray:
+        """
+        Return the probability of each card (by card index) in a deck from
+            Game.card_stack: LETTER_CARDS of the cards are random letters, and
+            the other STAR_CARD_DRAWS are star cards (8 in 11) or an "e", "a"
+            or "t" (1 in 11 each). Made once for each deck composition.
+
+        Parameters
+        ----------
+        settings: GameSettings
+            - The rules of the game.
+        """
+        letter_cards, star_card_draws = settings.LETTER_CARDS, settings.STAR_CARD_DRAWS
+        key = (letter_cards, star_card_draws)
+        if key not in OpponentBelief._deck_probabilities:
+            deck_size = letter_cards + star_card_draws
+            OpponentBelief._deck_probabilities[key] = np.array(
+                [letter_cards / deck_size / 26 + (star_card_draws / deck_size / 11 if letter in "eat" else 0)
+                 for letter in GameSettings.ALPHABET] + [star_card_draws / deck_size * 8 / 11])
+        return OpponentBelief._deck_probabilities[key]
+
+    def _add_random_cards(self) -> None:
+        """
+        Add a card drawn from the deck composition to every sampled hand.
+        """
+        cards = self._random.choice(len(self.card_weights), size=len(self.hands), p=self.card_weights)
+        self.hands[np.arange(len(self.hands)), cards] += 1
+        return None
+
+    def _random_cards(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Return a random card (each card in the hand equally likely) from some of the sampled hands.
+        """
+        cumulative_counts = self.hands[rows].cumsum(axis=1)
+        picks = (self._random.random(len(rows)) * cumulative_counts[:, -1]).astype(np.int64)
+        return (cumulative_counts > picks[:, None]).argmax(axis=1)
+
+    def observe_play(self, card: str) -> None:
+        """
+        Update the belief after the opponent plays a card.
+
+        Sampled hands that don't hold the card are repaired: one of their
+            cards (picked at random) is swapped for the played card, and the
+            weight of the hand is corrected for how much less likely the
+            swapped hand was under the deck composition.
+
+        Parameters
+        ----------
+        card: str
+            - The card that the opponent played.
+        """
+        self.observations.append(("play", card))
+        card = GameSettings.card_index(card.lower())
+        missing = np.flatnonzero((self.hands[:, card] == 0) & (self.hands.sum(axis=1) > 0))
+        if len(missing):
+            swapped = self._random_cards(missing)
+            self.hands[missing, swapped] -= 1
+            self.hands[missing, card] += 1
+            self.weights[missing] *= self.card_weights[card] / self.card_weights[swapped]
+        self.hands[:, card] = np.maximum(self.hands[:, card] - 1, 0)
+        self._normalize()
+        return None
+
+    def observe_penalty(self) -> None:
+        """
+        Update the belief after the opponent draws a penalty card (that the bot can't see).
+        """
+        self.observations.append(("penalty", None))
+        self._add_random_cards()
+        return None
+
+    def observe_missed_turn(self, word: str) -> None:
+        """
+        Update the belief after the opponent doesn't change a word: hands that
+            had a move for the word become less likely.
+
+        Parameters
+        ----------
+        word: str
+            - The word that the opponent had to change.
+        """
+        self.observations.append(("missed_turn", word))
+        self.weights *= np.where(self._has_move(word.lower()), self.MISSED_TURN_PROBABILITY, 1.0)
+        self._normalize()
+        return None
+
+    def observe_discard(self) -> None:
+        """
+        Update the belief after the opponent discards a card (that the bot can't see).
+        """
+        self.observations.append(("discard", None))
+        rows = np.flatnonzero(self.hands.sum(axis=1) > 0)
+        self.hands[rows, self._random_cards(rows)] -= 1
+        return None
+
+    def _move_mask(self, word: str) -> np.ndarray:
+        """
+        Return which cards (by card index) can change a word into another word.
+        """
+        mask = np.zeros(len(self.card_weights), dtype=bool)
+        for _, letter, _ in self._graph.neighbors(word):
+            mask[GameSettings.card_index(letter)] = True
+        mask[self._STAR] = mask.any()  # A star card can be any letter.
+        return mask
+
+    def _has_move(self, word: str) -> np.ndarray:
+        """
+        Return whether each sampled hand has a move for a word.
+        """
+        return (self.hands[:, self._move_mask(word)] > 0).any(axis=1)
+
+    def _normalize(self) -> None:
+        """
+        Make the weights add up to 1, and resample the hands when
+            too few of them carry most of the weight.
+        """
+        total = self.weights.sum()
+        if total <= 0:  # No sampled hand explains what was seen (start again from equal weights).
+            self.weights[:] = 1 / len(self.weights)
+            return None
+        self.weights /= total
+        effective_samples = 1 / np.square(self.weights).sum()
+        if effective_samples < len(self.weights) / 2:
+            # Systematic resampling: hands are copied in proportion to their weights.
+            positions = (self._random.random() + np.arange(len(self.weights))) / len(self.weights)
+            chosen = np.searchsorted(self.weights.cumsum(), positions).clip(max=len(self.weights) - 1)
+            self.hands = self.hands[chosen]
+            self.weights = np.full(len(self.weights), 1 / len(self.weights))
+        return None
+
+    def card_probabilities(self) -> dict[str, float]:
+        """
+        Return the probability that the opponent holds each card.
+        """
+        probabilities = self.weights @ (self.hands > 0)
+        return dict(zip(GameSettings.CARDS, probabilities.tolist()))
+
+    def move_probability(self, word: str) -> float:
+        """
+        Return the probability that the opponent has a move for a word
+            (e.g. to find words that block the opponent).
+
+        Parameters
+        ----------
+        word: str
+            - The word that the opponent would have to change.
+        """
+        return float(self.weights @ self._has_move(word.lower()))
+
+    def sample_hands(self, amount: int) -> list[list[str]]:
+        """
+        Return hands drawn from the belief (e.g. to search the game with them).
+
+        Parameters
+        ----------
+        amount: int
+            - How many hands to draw.
+        """
+        self.observations.append(("sample", amount))  # The draw moves the random generator on.
+        cards = GameSettings.CARDS
+        chosen = self._random.choice(len(self.hands), size=amount, p=self.weights)
+        return [[cards[card] for card in np.repeat(np.arange(len(cards)), self.hands[row])] for row in chosen]
+
+    def replay(self, observations) -> None:
+        """
+        Apply the observations of another belief (made with the same words,
+            hand size, particles and seed as this one), so this belief ends
+            up the same as it (its sampled hands, weights and random generator).
+
+        Parameters
+        ----------
+        observations: Iterable[tuple[str, str | int | None]]
+            - The observations (from OpponentBelief.observations).
+        """
+        for name, value in observations:
+            if name == "play":
+                self.observe_play(value)
+            elif name == "penalty":
+                self.observe_penalty()
+            elif name == "missed_turn":
+                self.observe_missed_turn(value)
+            elif name == "discard":
+                self.observe_discard()
+            else:
+                self.sample_hands(value)
+        return None
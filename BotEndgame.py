@@ -0,0 +1,353 @@
+"""
+Exact endgame solver for the bot (used when both hands are small).
+"""
+
+
+# Importing libraries and modules.
+import os
+import struct
+import zlib
+
+from GameSettings import GameSettings
+from WordGraph import WordGraph
+from ZobristHash import ZobristHash
+
+
+class EndgameSolver:
+    """
+    Solves small endgames with memoized negamax over
+        (word, bot hand, opponent hand, deck contents).
+
+    The deck order is shuffled every turn, so a penalty card is a chance
+        node over the deck contents and the value of a position is the
+        expected result for the side to move (1 = win, -1 = loss).
+    Playing a star card turns the word into a new random word, so
+        positions where the side to move holds a star card are not solved.
+    Moves are applied to and undone from one position in place, and the
+        Zobrist hash of the position is updated with them, so positions
+        are looked up by a 64-bit key.
+
+    Attributes
+    ----------
+    MAX_PLY: int
+        - How many turns the solver looks ahead before it gives up on
+            a line and scores it as unknown (0).
+
+    MAX_NODES: int
+        - How many positions one search can visit before the rest
+            of the lines are scored as unknown (0), so that a move
+            is always found quickly.
+
+    _graph: WordGraph
+        - Graph of all the words that can be played.
+
+    _bot_words: set[str]
+        - The words that the bot can play (the bots current words, given to best_move).
+
+    _bot_words_checksum: int | None
+        - Checksum of the bots words that the solved positions are for
+            (None before the first search).
+
+    _table_file_name: str
+        - The file that the solved positions are stored in.
+
+    _table: dict[int, tuple[float, tuple | None]]
+        - Value and best move of the solved positions (by position hash).
+
+    _unsaved_positions: list[int]
+        - Hashes of the positions solved since the table file was last written.
+
+    _search_memo: dict[int, tuple[float, tuple | None, int]]
+        - Positions that were not solved exactly in the current search.
+
+    _nodes_left: int
+        - How many more positions the current search can visit.
+
+    _hands: list[list[int]]
+        - Card counts of the bot (side 0) and the opponent (side 1)
+            in the position that is being searched.
+
+    _hand_sizes: list[int]
+        - How many cards each side holds in the position that is being searched.
+
+    _deck: list[int]
+        - Card counts of the deck in the position that is being searched.
+
+    _hash: int
+        - Zobrist hash of the position that is being searched.
+
+    Methods
+    -------
+    best_move(current_word, bot_cards, opponent_cards, deck_cards, bot_words, bot_words_checksum):
+        - Return the best word and card for the bot
+            (or None if the position can't be solved).
+
+    save_table():
+        - Append the newly solved positions to the table file.
+    """
+
+    MAX_PLY = 8
+    MAX_NODES = 10000
+
+    _TABLE_MAGIC = b"WBET"
+    _TABLE_VERSION = 2
+    _RECORD = struct.Struct("<QhHB")  # Position hash, value, best move word id and card index.
+    _NO_MOVE = (0xFFFF, 0xFF)
+    _STAR = GameSettings.card_index(GameSettings.STAR_CARD)
+
+    game_settings = GameSettings()
+
+    def __init__(self, all_words: set[str], table_file_name: str, settings: GameSettings = None):
+        """
+        Construct all the necessary attributes for the EndgameSolver object.
+
+        Parameters
+        ----------
+        all_words: set[str]
+            - All the words that can be played (by either side).
+
+        table_file_name: str
+            - The file that the solved positions are stored in.
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        self.game_settings = EndgameSolver.game_settings if settings is None else settings
+        self._graph = WordGraph(all_words)
+        self._bot_words = set()
+        self._bot_words_checksum = None
+        self._table_file_name = table_file_name
+        self._table = {}
+        self._search_memo = {}
+        self._nodes_left = 0
+        self._hands = [[], []]
+        self._hand_sizes = [0, 0]
+        self._deck = []
+        self._hash = 0
+        self._unsaved_positions = []
+        self._rewrite_table = False  # Whether the table file must be started again (e.g. the words changed).
+
+    def best_move(self, current_word: str, bot_cards: list[str], opponent_cards: list[str],
+                  deck_cards: list[str], bot_words, bot_words_checksum: int) -> tuple[str | None, str | None] | None:
+        """
+        Return the best word and card for the bot, (None, None)
+            if the bot has no move, or None if the position
+            can't be solved (e.g. the bot holds a star card).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+
+        bot_cards: list[str]
+            - The bots cards.
+
+        opponent_cards: list[str]
+            - The opponents cards.
+
+        deck_cards: list[str]
+            - The cards left in the deck (in any order).
+
+        bot_words: Iterable[str]
+            - The words that the bot can play now (e.g. after its difficulty changed).
+
+        bot_words_checksum: int
+            - Checksum of the bots words (worked out when its words change,
+                so the words aren't gone through on every search).
+        """
+        current_word = current_word.lower()
+        if bot_words_checksum != self._bot_words_checksum:  # First search, or the bots words changed.
+            self.save_table()  # The positions solved with the old words are kept for them.
+            self._bot_words = bot_words
+            self._bot_words_checksum = bot_words_checksum
+            self._table = {}  # The solved positions are only valid for the words they were solved with.
+            self._load_table()
+        self._hands = [self._counts(bot_cards), self._counts(opponent_cards)]
+        if self._hands[ZobristHash.BOT][self._STAR]:  # The bot holds a star card.
+            return None
+        self._hand_sizes = [len(bot_cards), len(opponent_cards)]
+        self._deck = self._counts(deck_cards)
+        self._hash = ZobristHash.hash_position(current_word, self._hands[ZobristHash.BOT],
+                                               self._hands[ZobristHash.OPPONENT], ZobristHash.BOT, self._deck)
+
+        self._search_memo = {}
+        self._nodes_left = self.MAX_NODES
+        _, move, _ = self._negamax(current_word, ZobristHash.BOT, 0)
+        if move is None:
+            return None, None
+        next_word, card = move
+        return next_word, GameSettings.ALPHABET[card]
+
+    @staticmethod
+    def _counts(cards: list[str]) -> list[int]:
+        """
+        Return how many of each card there are in a list of cards (by card index).
+        """
+        counts = [0] * (len(GameSettings.ALPHABET) + 1)
+        for card in cards:
+            counts[GameSettings.card_index(card.lower())] += 1
+        return counts
+
+    def _move_card(self, source: int, target: int, card: int) -> None:
+        """
+        Move a card from one owner (a hand or the deck) to another
+            and update the position hash.
+        """
+        owners = (self._hands[ZobristHash.BOT], self._hands[ZobristHash.OPPONENT], self._deck)
+        self._hash = ZobristHash.remove_card(self._hash, source, card, owners[source][card])
+        owners[source][card] -= 1
+        self._hash = ZobristHash.add_card(self._hash, target, card, owners[target][card])
+        owners[target][card] += 1
+        if source != ZobristHash.DECK:
+            self._hand_sizes[source] -= 1
+        if target != ZobristHash.DECK:
+            self._hand_sizes[target] += 1
+        return None
+
+    def _negamax(self, word: str, side: int, ply: int) -> tuple[float, tuple | None, bool]:
+        """
+        Return the value of the current position for the side to move, its best
+            move (new word and card index) and whether the value is exact.
+
+        Parameters
+        ----------
+        word: str
+            - The current word.
+
+        side: int
+            - The side to move (0 for the bot, 1 for the opponent).
+
+        ply: int
+            - How many turns deep the search is.
+        """
+        key = self._hash
+        if key in self._table:  # Position has already been solved.
+            value, move = self._table[key]
+            return value, move, True
+        depth_left = self.MAX_PLY - ply
+        if key in self._search_memo and self._search_memo[key][2] >= depth_left:
+            value, move, _ = self._search_memo[key]
+            return value, move, False
+        if depth_left <= 0 or self._nodes_left <= 0:
+            return 0.0, None, False
+        self._nodes_left -= 1
+
+        hand = self._hands[side]
+        if hand[self._STAR]:  # A star card makes the next word random, so the line can't be solved.
+            return 0.0, None, False
+
+        best_value, best_move, exact = -2.0, None, True
+        for position, letter, new_word in self._graph.neighbors(word):
+            card = ord(letter) - 97
+            if not hand[card] or (side == ZobristHash.BOT and new_word not in self._bot_words):
+                continue
+            if self._hand_sizes[side] == 1:  # Playing the last card wins the game.
+                best_value, best_move, exact = 1.0, (new_word, card), True
+                break
+
+            # Apply the move (played cards go back into the deck).
+            old_card = GameSettings.card_index(word[position])
+            self._move_card(side, ZobristHash.DECK, card)
+            self._hash = ZobristHash.switch_side(ZobristHash.change_letter(self._hash, position, old_card, card))
+            child_value, _, child_exact = self._negamax(new_word, 1 - side, ply + 1)
+            # Undo the move (the same XORs in reverse order).
+            self._hash = ZobristHash.change_letter(ZobristHash.switch_side(self._hash), position, old_card, card)
+            self._move_card(ZobristHash.DECK, side, card)
+
+            exact = exact and child_exact
+            if -child_value > best_value:
+                best_value, best_move = -child_value, (new_word, card)
+                if best_value == 1.0 and child_exact:
+                    exact = True
+                    break
+
+        if best_move is None:  # No move, so the side to move gets a penalty card.
+            best_value, exact = self._penalty_value(word, side, ply)
+
+        if exact:
+            self._table[key] = (best_value, best_move)
+            self._unsaved_positions.append(key)
+        else:
+            self._search_memo[key] = (best_value, best_move, depth_left)
+        return best_value, best_move, exact
+
+    def _penalty_value(self, word: str, side: int, ply: int) -> tuple[float, bool]:
+        """
+        Return the expected value of a penalty card for the side to move
+            and whether the value is exact.
+        """
+        deck_size = sum(self._deck)
+        self._hash = ZobristHash.switch_side(self._hash)
+        if not deck_size:  # No card to draw, so the turn just passes.
+            child_value, _, exact = self._negamax(word, 1 - side, ply + 1)
+            self._hash = ZobristHash.switch_side(self._hash)
+            return -child_value, exact
+
+        value, exact = 0.0, True
+        if self._hand_sizes[side] + 1 >= self.game_settings.MAX_CARDS:  # Reaching the maximum amount of cards loses.
+            value = -1.0
+        else:
+            for card, count in enumerate(self._deck):
+                if not count:
+                    continue
+                self._move_card(ZobristHash.DECK, side, card)
+                child_value, _, child_exact = self._negamax(word, 1 - side, ply + 1)
+                self._move_card(side, ZobristHash.DECK, card)
+                value -= child_value * count / deck_size
+                exact = exact and child_exact
+        self._hash = ZobristHash.switch_side(self._hash)
+        return value, exact
+
+    def _table_header(self) -> bytes:
+        """
+        Return the header of the table file (the table is only valid
+            for the same words, word length and maximum amount of cards).
+        """
+        words_checksum = zlib.crc32("\n".join(self._graph.words).encode())
+        return self._TABLE_MAGIC + struct.pack("<BBBII", self._TABLE_VERSION, self.game_settings.WORD_LENGTH,
+                                               self.game_settings.MAX_CARDS, words_checksum, self._bot_words_checksum)
+
+    def _load_table(self) -> None:
+        """
+        Load the solved positions from the table file (if it matches the current words and settings).
+        """
+        header = self._table_header()
+        try:
+            with open(self._table_file_name, "rb") as file:
+                if file.read(len(header)) != header:  # Table was made for other words or settings.
+                    self._rewrite_table = True
+                    return None
+                data = file.read()
+        except FileNotFoundError:  # No positions have been solved yet.
+            return None
+
+        words = self._graph.words
+        usable_size = len(data) - len(data) % self._RECORD.size  # Ignore a record that was only partly written.
+        for position_hash, value, move_word_id, move_card in self._RECORD.iter_unpack(data[:usable_size]):
+            move = None if (move_word_id, move_card) == self._NO_MOVE else (words[move_word_id], move_card)
+            self._table[position_hash] = (value / 32767, move)
+        return None
+
+    def save_table(self) -> None:
+        """
+        Append the newly solved positions to the table file (they are kept
+            in memory until then, so the file is only written when a game
+            ends instead of after every search).
+        """
+        if not self._unsaved_positions:
+            return None
+        word_ids = self._graph.word_ids
+        records = []
+        for position_hash in self._unsaved_positions:
+            value, move = self._table[position_hash]
+            move_ids = self._NO_MOVE if move is None else (word_ids[move[0]], move[1])
+            records.append(self._RECORD.pack(position_hash, round(value * 32767), *move_ids))
+        self._unsaved_positions = []
+
+        new_file = self._rewrite_table or not os.path.exists(self._table_file_name)
+        with open(self._table_file_name, "wb" if new_file else "ab") as file:
+            if new_file:
+                file.write(self._table_header())
+            file.write(b"".join(records))
+        self._rewrite_table = False
+        return None
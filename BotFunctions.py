@@ -5,10 +5,21 @@ Functions for the bot that plays against the player.
 
 
 # Importing libraries and modules.
-import random
+import json
+import sys
 from enum import Enum
 
+from BotBelief import OpponentBelief
+from BotEndgame import EndgameSolver
+from BotSearch import AnytimeSearch
+from BotThreat import ThreatTable
+from BotValueTable import ValueTable
+from BotVocabulary import RankedVocabulary, VocabularyView
 from GameSettings import GameSettings
+from LetterUtility import LetterUtility
+from OpeningBook import OpeningBook
+from RandomStream import RandomStream
+from ZobristHash import ZobristHash
 
 
 class Bot:
@@ -23,7 +34,15 @@ class Bot:
             Bot.Difficulty.MEDIUM or Bot.Difficulty.HARD.
 
     cards: list[str]
-        - The cards that the bot can play.
+        - The cards that the bot can play (read from the hand index,
+            in alphabetical order with special cards at the end).
+
+    random: RandomStream
+        - Random stream used for all the bots random choices
+            (so that games with the same seed can be replayed).
+
+    game_settings: GameSettings
+        - The rules of the game that the bot plays (its words and tables are the ones for these rules).
 
     ran_current_turn_code: bool
         - Whether the initial code of the current turn has run.
@@ -43,15 +62,99 @@ class Bot:
     _difficulty_settings: dict[Difficulty, dict[str, int]]
         - Settings that specify variables for each difficulty level.
 
-    _letter_frequencies: dict[str, int]
-        - Dictionary for the relative frequencies of letters (%).
+    _letter_utilities: dict[str, int]
+        - Dictionary for how useful each letter is (how many edges of
+            the word graph it creates, from the LetterUtility table).
+
+    _bot_words: VocabularyView
+        - All the words the bot can use (a view of the most common words,
+            used like a set, that is resized when the cut-off changes).
+
+    bot_words: VocabularyView
+        - All the words the bot can use (_bot_words, e.g. for a BotBatch).
+
+    _default_settings: dict[Difficulty, dict]
+        - The settings of each difficulty before any changes
+            (where set_difficulty and adapt start from).
+
+    _cards_by_usefulness: list[str]
+        - Every card the bot can hold, ordered from the least useful
+            letter to the most useful one, with the star card last.
+
+    _card_buckets: dict[str, int]
+        - The index of each card's bucket in _card_counts.
+
+    _card_counts: list[int]
+        - Hand index: how many of each card the bot holds,
+            bucketed in the order of _cards_by_usefulness.
+
+    _number_of_cards: int
+        - How many cards the bot holds.
+
+    hand_hash: int
+        - Zobrist hash of the bots hand (updated whenever a card is added
+            or removed), which the pondered moves are looked up with.
+
+    _endgame_solvers: dict[tuple, EndgameSolver]
+        - The endgame solver of each rule profile and difficulty (shared by all bots).
+
+    _opening_books: dict[tuple, OpeningBook | None]
+        - The opening book of each rule profile (shared by all bots, None if it hasn't been built).
+
+    SEARCH_CPU_BUDGET: float
+        - How many seconds of CPU time the search can use in one turn.
+
+    PONDER_SAMPLES: int
+        - How many hands are drawn from the belief to ponder the opponents moves with.
+
+    _value_tables: dict[tuple, ValueTable | None]
+        - The value table learned from self-play for each rule profile
+            (shared by all bots, None if it hasn't been trained).
 
-    _bot_words: set[str]
-        - Set of all the words the bot can use.
+    _threat_tables: dict[tuple, ThreatTable | None]
+        - How many replies each word leaves the opponent for each rule
+            profile (shared by all bots, None if it hasn't been built).
+
+    _vocabularies: dict[int, RankedVocabulary]
+        - All the words ranked from the most common for each word length (shared by all bots).
+
+    _shared_letter_utilities: dict[int, dict[str, int]]
+        - How useful each letter is for each word length (shared by all bots).
+
+    DIFFICULTY_SKILLS: dict[Difficulty, float]
+        - How skilled each difficulty is (0 for easy to 1 for hard): adapt starts
+            from the bots own skill, and moves between the settings of the
+            difficulties on either side of the new skill.
+
+    ADAPTIVE_SKILL_STEP: float
+        - How much more skilled the bot gets (in adapt) for each card the opponent is ahead.
+
+    ADAPTIVE_SETTINGS: tuple[str, ...]
+        - The settings that adapt moves between the easy and the hard settings.
+
+    THREADED_SEARCH: bool
+        - Whether the search runs in a background thread (not in frozen
+            builds, where it runs in slices given to it by advance_search).
+
+    _search: AnytimeSearch | None
+        - The search that runs while the bot is thinking (made the first time it is needed).
+
+    _searching: bool
+        - Whether the search is running for the current turn.
+
+    _pondering: bool
+        - Whether the bot is pondering (searching its replies on the opponents turn).
+
+    _pondered_depth: int
+        - How deep the pondered answer of the current turn was searched (0 if there is none).
+
+    opening_turn: bool
+        - Whether the bots next turn is its first turn after the deal
+            (the only turn that it plays from the opening book).
 
     Methods
     -------
-    play_turn(current_word, current_timer):
+    play_turn(current_word, current_timer, opponent_cards, deck_cards):
         - Handle the bots turn in the game loop.
         - Return the bots answer and the card it used to get that answer
             or return Bot.Output.THINKING if the bot is not ready to
@@ -60,19 +163,76 @@ class Bot:
     end_turn():
         - End the bots turn.
 
+    stop_search():
+        - Stop the bots search and pondering (e.g. when the bot leaves the game)
+            and write the solved endgame positions to their tables.
+
+    ponder(current_word, opponent_cards, belief):
+        - Start working out the replies to the opponents likely moves
+            (on the opponents turn).
+
+    advance_search(microseconds):
+        - Run the search (or pondering) for a slice of time,
+            when it doesn't run in a background thread.
+
     _next_word(current_word):
         - Return the bots answer and the card that it used to
             get that answer (but if no word is found Return None).
 
+    _endgame_move(current_word, opponent_cards, deck_cards, believed_cards):
+        - Return the perfect-play answer and card from the endgame
+            solver (or None if the game is not in the endgame).
+
+    _believed_position(opponent_cards, deck_cards, believed_cards):
+        - Return the opponents hand and the deck as the bot believes
+            they are (drawn from the cards it can't see).
+
+    _book_move(current_word):
+        - Return the answer and card from the opening book
+            (or None if the position is not in the book).
+
+    _value_table_move(current_word, opponent_cards):
+        - Return the answer and card that lead to the highest value
+            in the value table (or None if there is no table).
+
+    _threat_move(current_word, opponent_cards):
+        - Return the answer and card that leave the opponent the fewest
+            replies (or None if there is no threat table).
+
+    _letter_moves(current_word):
+        - Return every answer and card the bot can play with a letter card.
+
+    _start_search(current_word, opponent_cards, current_timer):
+        - Start searching for a better answer while the bot is thinking.
+
+    _finish_search():
+        - Stop the search and use the best answer that it found.
+
+    _get_search():
+        - Return the bots search (made the first time it is needed).
+
+    _use_pondered_move(current_word):
+        - Use the pondered answer if the opponent played
+            one of the moves that were pondered.
+
     letter_frequency_sort(cards_list):
         - Variation of the insertion sort algorithm:
-            Sort cards based on the letter frequency distribution
+            Sort cards based on the letter utility table
             and any Special cards (e.g. Star cards) are placed at
             the end of the sorted list.
 
     discard_card():
         - Discard the worst card from the bot.
 
+    choose_discard():
+        - Return the card that the bot would discard.
+
+    _worst_card():
+        - Return the least useful card in the bots hand.
+
+    _random_card():
+        - Return a random card from the bots hand.
+
     draw_card(card_deck):
         - Draw a card from the deck.
 
@@ -86,14 +246,38 @@ class Bot:
         - Initialize the set of words that the bot can
             use to find a new word.
 
+    update_difficulty_settings(settings):
+        - Change settings of the bots difficulty level.
+
+    set_difficulty(difficulty_level):
+        - Change the bots difficulty level (without making a new bot).
+
+    adapt(score_gap):
+        - Move the bots settings towards easy or hard based on how far the opponent is ahead.
+
+    _get_vocabulary():
+        - Return all the words ranked from the most common (made once for each word length).
+
+    _load_tuned_settings():
+        - Return the settings found by the auto-tuner for each difficulty.
+
     add_card(letter):
         - Add a card to the bots cards.
 
     remove_cards(letter):
         - Remove a card from the bots cards.
 
+    count(letter):
+        - Return how many of a card the bot holds.
+
     won_game():
         - Return whether the bot has won the game.
+
+    __len__():
+        - Return how many cards the bot has (so the bot can be a seat of the game engine, like a Hand).
+
+    __contains__(card):
+        - Return whether the bot has a card.
     """
 
 
@@ -126,8 +310,30 @@ class Bot:
         THINKING: str = "thinking"
 
     game_settings = GameSettings()  # Initiate game settings object to stores game settings constants.
-
-    def __init__(self, difficulty_level: Difficulty, cards: list[str]=None):
+    STAR_CARD = "*"  # The star card (a special card that can replace any letter).
+    # Where solved endgame positions are stored (for each difficulty, word length and maximum amount of cards).
+    ENDGAME_TABLE_FILE_NAME = "data/endgame_table_{difficulty}_{word_length}_{max_cards}.bin"
+    TUNED_SETTINGS_FILE_NAME = "data/bot_difficulty_settings.json"  # Settings written by the auto-tuner (BotTuner.py).
+    _tuned_settings = None  # Settings from the tuned settings file (loaded once and shared by all bots).
+    # Endgame solver of each rule profile and difficulty (shared by all bots, so tables are only loaded once).
+    _endgame_solvers = {}
+    SEARCH_CPU_BUDGET = 2.0  # How many seconds of CPU time the search can use in one turn.
+    PONDER_SAMPLES = 4  # Hands drawn from the belief to ponder with (the opponents likely moves come from all of them).
+    THREADED_SEARCH = not getattr(sys, "frozen", False)  # Frozen builds search in slices of each frame instead.
+    # The tables of the bot are made for the words and the rules of a variant of the game, so each one is kept
+    # for each rule profile (by its rules, see GameSettings.rules) and switching variants doesn't load them again.
+    _opening_books = {}  # Opening book (loaded once and shared by all bots, None if it hasn't been built).
+    _value_tables = {}  # Value table learned from self-play (loaded once and shared by all bots).
+    _threat_tables = {}  # How many replies each word leaves the opponent (loaded once and shared by all bots).
+    # The words only depend on the word length, so the variants with the same word length share these.
+    _vocabularies = {}  # All the words ranked from the most common (made once and shared by all bots).
+    _shared_letter_utilities = {}  # How useful each letter is (counted once and shared by all bots).
+    # How skilled each difficulty is (adapt moves the settings between the easy ones at 0 and the hard ones at 1).
+    DIFFICULTY_SKILLS = {Difficulty.EASY: 0.0, Difficulty.MEDIUM: 0.5, Difficulty.HARD: 1.0}
+    ADAPTIVE_SKILL_STEP = 0.25  # How much more skilled the bot gets for each card that the opponent is ahead.
+    ADAPTIVE_SETTINGS = ("ANSWER_PROBABILITY", "AVERAGE_ANSWER_TIME", "VARIANCE_ANSWER_TIME")
+
+    def __init__(self, difficulty_level: Difficulty, cards: list[str]=None, seed=None, settings: GameSettings = None):
         """
         Construct all the necessary attributes for the bot object.
 
@@ -140,51 +346,127 @@ class Bot:
 
         cards: list[str]
             - The cards that the bot can play.
+
+        seed: RandomStream | int | str | None
+            - The bots random stream (e.g. spawned from the games stream),
+                or the seed of a new one (a random seed by default).
+
+        settings: GameSettings
+            - The rules of the game (e.g. the games object_settings, the rule profile that is picked by default).
         """
+        self.random = RandomStream.of(seed)  # Random stream used for all the bots random choices.
+        self.game_settings = Bot.game_settings if settings is None else settings  # The rules the bot plays by.
         # How difficult the bot is (must be one of Bot.Difficulty.EASY or Bot.Difficulty.MEDIUM or Bot.Difficulty.HARD).
         self._difficulty_level = difficulty_level
         if cards is None:
             cards = []  # If no cards list is given set cards to empty list.
-        self.cards = [card.lower() for card in cards]  # Make sure the bots letter cards in lowercase (to avoid errors).
 
         self.ran_current_turn_code = False  # Initial variable for whether the initial code of the turn has run.
         self.current_turn_will_answer_or_not = False  # Initial variable for whether the bot will answer this turn.
         self.current_turn_answer_time = 0  # Initial variable for how long the bot will take to answer this turn.
         self.current_turn_answer = ""  # Initial variable for the bots answer in this turn.
         self.current_turn_card_used = ""  # Initial variable for the card the bot will play in this turn.
+        self._search = None  # Search that runs while the bot is thinking (made the first time it is needed).
+        self._searching = False  # Whether the search is running for the current turn.
+        self._pondering = False  # Whether the bot is searching its replies on the opponents turn.
+        self._pondered_depth = 0  # How deep the pondered answer of the current turn was searched.
+        self.opening_turn = True  # Whether the next turn is the bots first turn after the deal.
 
         self._difficulty_settings = {  # Dictionary for the settings based on the chosen difficulty mode.
             Bot.Difficulty.EASY: {  # Difficulty mode.
                 "ANSWER_PROBABILITY": 0.9,  # Determines how often the bot plays its turn (doesn't run down the timer).
-                "AVERAGE_ANSWER_TIME": 0.566 * Bot.game_settings.TURN_TIME_LIMIT,  # Mean answer time.
-                "VARIANCE_ANSWER_TIME": 0.133 * Bot.game_settings.TURN_TIME_LIMIT,  # How varied the answer times are.
+                "AVERAGE_ANSWER_TIME": 0.566 * self.game_settings.TURN_TIME_LIMIT,  # Mean answer time.
+                "VARIANCE_ANSWER_TIME": 0.133 * self.game_settings.TURN_TIME_LIMIT,  # How varied the answer times are.
                 # Determines the cut-off that determines which words are included in the bots dictionary of words.
-                "WORD_FREQUENCY_CUTOFF": 5.752713813881526e-06  # (Word frequency means how common the word is).
+                "WORD_FREQUENCY_CUTOFF": 5.752713813881526e-06,  # (Word frequency means how common the word is).
+                # The bot plays perfectly when both hands together have fewer cards than this (0 means never).
+                "ENDGAME_HANDS_THRESHOLD": 0,
+                # How many turns ahead the bot searches while it is thinking (0 means it doesn't search).
+                "SEARCH_DEPTH": 0,
+                "USE_OPENING_BOOK": False,  # Whether the bot plays the replies from the opening book.
+                "PONDER": False,  # Whether the bot works out its replies on the opponents turn.
+                "USE_VALUE_TABLE": False,  # Whether the bot picks its answers with the self-play value table.
+                "USE_THREAT_TABLE": False  # Whether the bot picks the answers that leave the opponent fewest replies.
             },
             Bot.Difficulty.MEDIUM: {
                 "ANSWER_PROBABILITY": 0.95,
-                "AVERAGE_ANSWER_TIME": 0.466 * Bot.game_settings.TURN_TIME_LIMIT,
-                "VARIANCE_ANSWER_TIME": 0.133 * Bot.game_settings.TURN_TIME_LIMIT,
-                "WORD_FREQUENCY_CUTOFF": 2.9838168355859476e-06
+                "AVERAGE_ANSWER_TIME": 0.466 * self.game_settings.TURN_TIME_LIMIT,
+                "VARIANCE_ANSWER_TIME": 0.133 * self.game_settings.TURN_TIME_LIMIT,
+                "WORD_FREQUENCY_CUTOFF": 2.9838168355859476e-06,
+                "ENDGAME_HANDS_THRESHOLD": 4,
+                "SEARCH_DEPTH": 2,
+                "USE_OPENING_BOOK": False,
+                "PONDER": False,
+                "USE_VALUE_TABLE": False,
+                "USE_THREAT_TABLE": False
             },
             Bot.Difficulty.HARD: {
                 "ANSWER_PROBABILITY": 1,  # Hard bot uses Highest answer probability possible
-                "AVERAGE_ANSWER_TIME": 0.266 * Bot.game_settings.TURN_TIME_LIMIT,
-                "VARIANCE_ANSWER_TIME": 0.066 * Bot.game_settings.TURN_TIME_LIMIT,
-                "WORD_FREQUENCY_CUTOFF": 0  # The hard bot doesn't have a cut-off and can use all words.
+                "AVERAGE_ANSWER_TIME": 0.266 * self.game_settings.TURN_TIME_LIMIT,
+                "VARIANCE_ANSWER_TIME": 0.066 * self.game_settings.TURN_TIME_LIMIT,
+                "WORD_FREQUENCY_CUTOFF": 0,  # The hard bot doesn't have a cut-off and can use all words.
+                "ENDGAME_HANDS_THRESHOLD": 5,
+                "SEARCH_DEPTH": 12,
+                "USE_OPENING_BOOK": True,
+                "PONDER": True,
+                "USE_VALUE_TABLE": True,
+                "USE_THREAT_TABLE": True
             }
         }
-        self._letter_frequencies = {  # Dictionary to store all how often each letter is used (%).
-            "a": 8.12, "b": 1.49, "c": 2.71, "d": 4.32, "e": 12.02,
-            "f": 2.30, "g": 2.03, "h": 5.92, "i": 7.31, "j": 0.10,
-            "k": 0.69, "l": 3.98, "m": 2.61, "n": 6.95, "o": 7.68,
-            "p": 1.82, "q": 0.11, "r": 6.02, "s": 6.28, "t": 9.10,
-            "u": 2.88, "v": 1.11, "w": 2.09, "x": 0.17, "y": 2.11,
-            "z": 0.07
-        }
+        # Settings found by the auto-tuner replace the default settings above.
+        for difficulty, tuned_settings in Bot._load_tuned_settings().items():
+            self._difficulty_settings[difficulty].update(tuned_settings)
+        # Copy of the settings before any changes (set_difficulty and adapt start from these).
+        self._default_settings = {difficulty: dict(settings)
+                                  for difficulty, settings in self._difficulty_settings.items()}
+        # Dictionary to store how useful each letter is (how many word graph edges it creates in the game's words).
+        word_length = self.game_settings.WORD_LENGTH
+        if word_length not in Bot._shared_letter_utilities:
+            Bot._shared_letter_utilities[word_length] = LetterUtility.letter_utilities(self.game_settings.ALL_BOT_WORDS,
+                                                                                       word_length)
+        self._letter_utilities = Bot._shared_letter_utilities[word_length]
         self._bot_words = self._get_bot_words()  # Set of all the words the bot can use.
 
-    def play_turn(self, current_word: str, current_timer: int) -> tuple | Output:
+        # Hand index (bucketed counts): the buckets go from the least useful letter to the most useful one,
+        # and the star card gets the last bucket so that it is only ever the worst card when it is the only card left.
+        self._cards_by_usefulness = sorted(self._letter_utilities, key=self._letter_utilities.get)
+        self._cards_by_usefulness.append(Bot.STAR_CARD)
+        self._card_buckets = {card: bucket for bucket, card in enumerate(self._cards_by_usefulness)}
+        self._card_counts = [0] * len(self._cards_by_usefulness)  # How many of each card the bot holds.
+        self._number_of_cards = 0  # How many cards the bot holds.
+        self.hand_hash = 0  # Zobrist hash of the bots hand.
+        self.cards = cards  # Fill the hand index with the starting cards.
+
+    @property
+    def cards(self) -> list[str]:
+        """
+        Return the bots cards (in alphabetical order with
+            special cards at the end).
+        """
+        cards_list = []
+        for card in sorted(self._letter_utilities):  # Letters in alphabetical order.
+            cards_list.extend([card] * self._card_counts[self._card_buckets[card]])
+        cards_list.extend([Bot.STAR_CARD] * self._card_counts[self._card_buckets[Bot.STAR_CARD]])
+        return cards_list
+
+    @cards.setter
+    def cards(self, cards_list: list[str]) -> None:
+        """
+        Replace the bots cards.
+
+        Parameters
+        ----------
+        cards_list: list[str]
+            - The new cards of the bot.
+        """
+        self._card_counts = [0] * len(self._cards_by_usefulness)  # Empty the hand index.
+        self._number_of_cards = 0
+        self.hand_hash = 0
+        for card in cards_list:
+            self.add_card(card)
+
+    def play_turn(self, current_word: str, current_timer: int, opponent_cards: list[str] = None,
+                  deck_cards: list[str] = None, belief: OpponentBelief = None) -> tuple | Output:
         """
         Handle the bots turn in the game loop.
         Return the bots answer and the card it used to get that answer
@@ -198,6 +480,17 @@ class Bot:
 
         current_timer: int
             - How much time has passed since the start of the bots turn.
+
+        opponent_cards: list[str]
+            - The opponents cards (only needed for the endgame solver).
+
+        deck_cards: list[str]
+            - The cards left in the deck (only needed for the endgame solver).
+
+        belief: OpponentBelief
+            - What the bot believes the opponents hand is. When it is given,
+                the endgame solver, the tables and the search play against
+                a hand drawn from the belief instead of the opponents cards.
         """
         # Initial code for the turn (which runs once per turn).
         current_word = current_word.lower()  # Converts current word to lowercase (bot only works with lowercase).
@@ -205,16 +498,42 @@ class Bot:
             self.current_turn_will_answer_or_not = self._will_answer_or_not()  # Whether the bot will answer this turn.
             self.current_turn_answer_time = self._answer_time()  # How long the bot will take to answer this turn.
             # The bots answer in this turn and the card used to get that answer.
-            self.current_turn_answer, self.current_turn_card_used = self._next_word(current_word)
+            self._pondered_depth = 0
+            if self._pondering:  # The opponents turn is over, so stop pondering.
+                self._search.stop()
+                self._pondering = False
+            # The opponents hand as the bot believes it is (a hand drawn from its belief), or their cards.
+            believed_cards = opponent_cards if belief is None else belief.sample_hands(1)[0]
+            endgame_move = self._endgame_move(current_word, opponent_cards, deck_cards,
+                                              None if belief is None else believed_cards)
+            # The opening book only has the replies to the start words, so it is only used on the first turn.
+            book_move = self._book_move(current_word) if endgame_move is None and self.opening_turn else None
+            self.opening_turn = False
+            if endgame_move is not None:  # The game is in the endgame, so the bot plays perfectly.
+                self.current_turn_answer, self.current_turn_card_used = endgame_move
+            elif book_move is not None:  # The position is in the opening book, so no search is needed.
+                self.current_turn_answer, self.current_turn_card_used = book_move
+            else:
+                # The move with the best value in the value table, or the move that leaves the opponent
+                # fewest replies (or the bots usual choice without the tables).
+                self.current_turn_answer, self.current_turn_card_used = (
+                    self._value_table_move(current_word, believed_cards)
+                    or self._threat_move(current_word, believed_cards, belief)
+                    or self._next_word(current_word))
+                # Use the answer that was worked out on the opponents turn (if they played a pondered move).
+                self._use_pondered_move(current_word)
+                # Use the thinking time to search for a better answer (ready when the answer time is reached).
+                self._start_search(current_word, believed_cards, current_timer)
             self.ran_current_turn_code = True  # Tells program that this code has run in this turn.
 
         # Output manager for the loop.
         if not self.current_turn_will_answer_or_not:  # If the bot won't answer this turn.
             return Bot.Output.THINKING  # Program will keep returning Bot.Output.THINKING until the bots turn ends.
-        elif not (Bot.game_settings.TURN_TIME_LIMIT - current_timer) >= self.current_turn_answer_time:
+        elif not (self.game_settings.TURN_TIME_LIMIT - current_timer) >= self.current_turn_answer_time:
             return Bot.Output.THINKING  # When the timer hasn't reached the set time, return Bot.Output.THINKING.
         # When timer reaches the time set by the bot to answer.
-        elif self.current_turn_answer is None:  # If the bot didn't find an answer.
+        self._finish_search()  # Use the best answer that the search found while the bot was thinking.
+        if self.current_turn_answer is None:  # If the bot didn't find an answer.
             return Bot.Output.THINKING
         else:  # When the bot has an answer and the timer is has reached the set time.
             return self.current_turn_answer, self.current_turn_card_used  # Returns the bots answer & the card it used.
@@ -224,6 +543,23 @@ class Bot:
         End the bots turn.
         """
         self.ran_current_turn_code = False
+        if self._searching:  # The turn ended before the bot answered.
+            self._search.stop()
+            self._searching = False
+
+    def stop_search(self) -> None:
+        """
+        Stop the bots search and pondering (and wait for the search thread
+            to finish), e.g. when the bot leaves the game, and write the
+            endgame positions that were solved to their tables.
+        """
+        if self._search is not None:
+            self._search.stop()
+        self._searching, self._pondering = False, False
+        # The endgame positions solved so far are written to their tables (once, instead of after every solve).
+        for solver in Bot._endgame_solvers.values():
+            solver.save_table()
+        return None
 
     def _next_word(self, current_word: str) -> tuple:
         """
@@ -236,13 +572,13 @@ class Bot:
             - The current word in the game that the bot must change.
         """
         # Declaring variables
-        alphabet = self._letter_frequencies.keys()  # All english letters (from keys of _letter_frequencies dictionary).
+        alphabet = self._letter_utilities.keys()  # All english letters (from keys of _letter_utilities dictionary).
         star_card = "*"  # variable to define the star card.
         star_card_word = ""  # Initialize a variable for the answer that uses the star card.
         neighbor_suggestions = []  # Word suggestions (neighbor is a word with 1 letter changed from the current word).
         cards_list = self.cards  # The bots cards.
         if self._difficulty_level == Bot.Difficulty.HARD:  # If the bot is in hard mode.
-            # Sort cards by least frequency to use hard cards first.
+            # Sort cards by least utility to use hard cards first.
             cards_list = self.letter_frequency_sort(cards_list)
 
         # Getting neighbor suggestions.
@@ -282,7 +618,7 @@ class Bot:
         if neighbor_suggestions:  # Suggestions are found (meaning if the neighbor_suggestions list is not empty).
             match self._difficulty_level:  # Check difficulty level of the bot, and run the code that matches it.
                 case Bot.Difficulty.EASY | Bot.Difficulty.MEDIUM:  # If bot in easy or medium modes.
-                    random_index = random.randint(0, len(neighbor_suggestions) - 1)  # Get random suggestion index.
+                    random_index = self.random.randint(0, len(neighbor_suggestions) - 1)  # Get random suggestion index.
                     next_word = neighbor_suggestions[random_index]  # Choose random suggestion.
                     return next_word
                 case Bot.Difficulty.HARD:  # When the bot is in hard mode.
@@ -297,11 +633,333 @@ class Bot:
         else:  # If the bot failed to find a valid word using its cards
             return None, None  # one none for the word and the other for the letter used
 
+    def _endgame_move(self, current_word: str, opponent_cards: list[str] | None, deck_cards: list[str] | None,
+                      believed_cards: list[str] | None = None) -> tuple | None:
+        """
+        Return the perfect-play answer and card from the endgame solver
+            (or None if the game is not in the endgame, or the position
+            can't be solved).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+
+        opponent_cards: list[str] | None
+            - The opponents cards (None if they are not known).
+
+        deck_cards: list[str] | None
+            - The cards left in the deck (None if they are not known).
+
+        believed_cards: list[str] | None
+            - The opponents hand as the bot believes it is (None to use their cards).
+        """
+        threshold = self._difficulty_settings[self._difficulty_level]["ENDGAME_HANDS_THRESHOLD"]
+        if opponent_cards is None or deck_cards is None:  # The solver needs to know every card.
+            return None
+        if self._number_of_cards + len(opponent_cards) >= threshold:  # Not in the endgame yet.
+            return None
+        if believed_cards is not None:  # Solve the position the bot believes in (with the same cards in play).
+            opponent_cards, deck_cards = self._believed_position(opponent_cards, deck_cards, believed_cards)
+
+        key = (self.game_settings.rules, self._difficulty_level)
+        solver = Bot._endgame_solvers.get(key)
+        if solver is None:  # First endgame of this difficulty and rule profile (load the solved positions).
+            solver = EndgameSolver(self.game_settings.ALL_BOT_WORDS,
+                                   Bot.ENDGAME_TABLE_FILE_NAME.format(difficulty=self._difficulty_level.value,
+                                                                      word_length=self.game_settings.WORD_LENGTH,
+                                                                      max_cards=self.game_settings.MAX_CARDS),
+                                   self.game_settings)
+            Bot._endgame_solvers[key] = solver
+        # The bots current words (its vocabulary changes with set_difficulty and adapt).
+        return solver.best_move(current_word, self.cards, opponent_cards, deck_cards, self._bot_words,
+                                self._bot_words.checksum)
+
+    def _believed_position(self, opponent_cards: list[str], deck_cards: list[str],
+                           believed_cards: list[str]) -> tuple[list[str], list[str]]:
+        """
+        Return the opponents hand and the deck as the bot believes they are.
+            Both are drawn from one pool of the cards the bot can't see (the
+            opponents cards and the deck), so the believed hand keeps the
+            opponents hand size and the cards in play add up to the game's
+            cards: the believed cards that are in the pool are kept, the rest
+            of the hand is filled from the pool at random, and the deck is
+            what is left of the pool.
+
+        Parameters
+        ----------
+        opponent_cards: list[str]
+            - The opponents cards.
+
+        deck_cards: list[str]
+            - The cards left in the deck.
+
+        believed_cards: list[str]
+            - The opponents hand drawn from the bots belief.
+        """
+        pool = list(opponent_cards) + list(deck_cards)  # Every card that the bot can't see.
+        hand = []
+        for card in believed_cards:
+            if card in pool and len(hand) < len(opponent_cards):
+                pool.remove(card)
+                hand.append(card)
+        while len(hand) < len(opponent_cards):  # Cards the belief has that aren't left in the game.
+            hand.append(pool.pop(self.random.randrange(len(pool))))
+        return hand, pool
+
+    def _book_move(self, current_word: str) -> tuple[str, str] | None:
+        """
+        Return the answer and card from the opening book (or None if the
+            bot doesn't use the book, or the position is not in the book).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+        """
+        if not self._difficulty_settings[self._difficulty_level]["USE_OPENING_BOOK"]:
+            return None
+        rules = self.game_settings.rules
+        if rules not in Bot._opening_books:  # First lookup of the rule profile (read the book file once).
+            Bot._opening_books[rules] = OpeningBook.load(self.game_settings.ALL_BOT_WORDS, self.game_settings)
+        opening_book = Bot._opening_books[rules]
+        if opening_book is None:  # The book hasn't been built for the current words and settings.
+            return None
+
+        book_move = opening_book.lookup(current_word, self.cards)
+        if book_move is None or book_move[0] not in self._bot_words:  # Not in the book (or the bot can't play it).
+            return None
+        return book_move
+
+    def _value_table_move(self, current_word: str, opponent_cards: list[str] | None) -> tuple[str, str] | None:
+        """
+        Return the letter move (answer and card) that leads to the position
+            with the highest value in the value table (or None if the bot
+            doesn't use the table, the table hasn't been trained, or the
+            bot has no letter move).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+
+        opponent_cards: list[str] | None
+            - The opponents cards (only how many there are is used).
+        """
+        if not self._difficulty_settings[self._difficulty_level]["USE_VALUE_TABLE"] or opponent_cards is None:
+            return None
+        rules = self.game_settings.rules
+        if rules not in Bot._value_tables:  # First lookup of the rule profile (map the table file once).
+            Bot._value_tables[rules] = ValueTable.load(self.game_settings.ALL_BOT_WORDS, self._letter_utilities,
+                                                       self.game_settings)
+        value_table = Bot._value_tables[rules]
+        if value_table is None:  # The table hasn't been trained for the current words and settings.
+            return None
+
+        cards_list = self.cards
+        hand_size_difference = (self._number_of_cards - 1) - len(opponent_cards)  # After the bot plays a card.
+        best_move, best_value = None, -1.0
+        for new_word, card in self._letter_moves(current_word):
+            cards_left = list(cards_list)
+            cards_left.remove(card)
+            value = value_table.value(new_word, hand_size_difference, value_table.hand_utility(cards_left))
+            if value > best_value:
+                best_move, best_value = (new_word, card), value
+        return best_move
+
+    def _threat_move(self, current_word: str, opponent_cards: list[str] | None,
+                     belief: OpponentBelief = None) -> tuple[str, str] | None:
+        """
+        Return the letter move (answer and card) that is most likely to force
+            the opponent to take a penalty, and then leaves them the fewest
+            replies (from the threat table), or None if the bot doesn't use
+            the table, the table hasn't been built (and there is no belief),
+            or the bot has no letter move.
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+
+        opponent_cards: list[str] | None
+            - The opponents cards (only how many there are is used).
+
+        belief: OpponentBelief
+            - What the bot believes the opponents hand is (the chance of a
+                penalty comes from the belief instead of the table when it is given).
+        """
+        if not self._difficulty_settings[self._difficulty_level]["USE_THREAT_TABLE"] or opponent_cards is None:
+            return None
+        rules = self.game_settings.rules
+        if rules not in Bot._threat_tables:  # First lookup of the rule profile (map the table file once).
+            Bot._threat_tables[rules] = ThreatTable.load(self.game_settings.ALL_BOT_WORDS, self.game_settings)
+        threat_table = Bot._threat_tables[rules]
+        if threat_table is None and belief is None:  # No table for the current words and settings, and no belief.
+            return None
+
+        hand_size = len(opponent_cards)
+        best_move, best_threat = None, None
+        for new_word, card in self._letter_moves(current_word):  # Least useful cards first (they win ties).
+            penalty_probability = (threat_table.penalty_probability(new_word, hand_size) if belief is None
+                                   else 1 - belief.move_probability(new_word))
+            replies = 0 if threat_table is None else threat_table.expected_replies(new_word, hand_size)
+            threat = (penalty_probability, -replies)
+            if best_threat is None or threat > best_threat:
+                best_move, best_threat = (new_word, card), threat
+        return best_move
+
+    def _letter_moves(self, current_word: str) -> list[tuple[str, str]]:
+        """
+        Return every answer and card that the bot can play with a letter
+            card (from its least useful letter to its most useful one).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+        """
+        moves = []
+        for card in self.letter_frequency_sort(sorted(set(self.cards) - {Bot.STAR_CARD})):  # Each letter the bot holds.
+            for j in range(len(current_word)):  # Every word the letter can make.
+                new_word = current_word[:j] + card + current_word[j + 1:]
+                if new_word in self._bot_words and new_word != current_word:
+                    moves.append((new_word, card))
+        return moves
+
+    def _start_search(self, current_word: str, opponent_cards: list[str] | None, current_timer: int) -> None:
+        """
+        Start searching for a better answer in the background, for as long
+            as the bot is going to think this turn (its answer time).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+
+        opponent_cards: list[str] | None
+            - The opponents cards, or the hand the bot believes they have (None if neither is known).
+
+        current_timer: int
+            - The turn timer (as given to play_turn).
+        """
+        max_depth = self._difficulty_settings[self._difficulty_level]["SEARCH_DEPTH"]
+        thinking_time = self.current_turn_answer_time - (self.game_settings.TURN_TIME_LIMIT - current_timer)
+        if (not max_depth or opponent_cards is None or not self.current_turn_will_answer_or_not
+                or self.current_turn_card_used in (None, Bot.STAR_CARD) or thinking_time <= 0):
+            return None  # Nothing to search (or no time to search it).
+
+        self._get_search().start(current_word, self.cards, opponent_cards, max_depth,
+                                 thinking_time, Bot.SEARCH_CPU_BUDGET)
+        self._searching = True
+        return None
+
+    def _finish_search(self) -> None:
+        """
+        Stop the search and use the best answer that it found
+            (the answer from _next_word is kept if the search found none).
+        """
+        if not self._searching:
+            return None
+        self._search.stop()
+        self._searching = False
+        # Only use the answer of the search if it searched deeper than the pondered answer.
+        if self._search.best_move is not None and self._search.completed_depth > self._pondered_depth:
+            self.current_turn_answer, self.current_turn_card_used = self._search.best_move
+        return None
+
+    def _get_search(self) -> AnytimeSearch:
+        """
+        Return the bots search (made the first time it is needed).
+        """
+        if self._search is None:
+            self._search = AnytimeSearch(self._bot_words, self.game_settings.ALL_BOT_WORDS, self._letter_utilities,
+                                         Bot.THREADED_SEARCH, self.game_settings)
+        return self._search
+
+    def ponder(self, current_word: str, opponent_cards: list[str] = None, belief: OpponentBelief = None) -> None:
+        """
+        Start working out the bots replies to the opponents likely moves
+            in the background (called on the opponents turn, and only
+            starts once per turn). The most common words that the
+            opponent can make with their cards are searched first.
+
+        Parameters
+        ----------
+        current_word: str
+            - The word that the opponent must change.
+
+        opponent_cards: list[str]
+            - The opponents cards (not needed when a belief is given).
+
+        belief: OpponentBelief
+            - What the bot believes the opponents hand is. When it is given,
+                the moves of hands drawn from the belief are pondered
+                instead of the moves of the opponents cards.
+        """
+        settings = self._difficulty_settings[self._difficulty_level]
+        if self._pondering or not settings["PONDER"] or not settings["SEARCH_DEPTH"]:
+            return None
+        if belief is not None:  # The hands the bot believes the opponent might have.
+            opponent_hands = belief.sample_hands(Bot.PONDER_SAMPLES)
+        elif opponent_cards is not None:
+            opponent_hands = [opponent_cards]
+        else:  # Nothing is known about the opponents hand.
+            return None
+
+        search = self._get_search()
+        word_frequencies = self.game_settings.WORD_FREQUENCIES
+        opponent_moves = {}  # Each new word the opponent might make, the card and the hand it is made with.
+        for opponent_hand in opponent_hands:
+            for new_word, card in search.moves(current_word, opponent_hand):
+                opponent_moves.setdefault(new_word, (card, opponent_hand))
+        positions = []
+        for new_word in sorted(opponent_moves, key=lambda word: word_frequencies.get(word, 0), reverse=True):
+            card, opponent_hand = opponent_moves[new_word]
+            opponent_cards_after = list(opponent_hand)
+            opponent_cards_after.remove(next(other for other in opponent_cards_after if other.lower() == card))
+            positions.append((new_word, self.cards, opponent_cards_after))
+        search.start_pondering(positions, settings["SEARCH_DEPTH"],
+                               self.game_settings.TURN_TIME_LIMIT, Bot.SEARCH_CPU_BUDGET)
+        self._pondering = True
+        return None
+
+    def advance_search(self, microseconds: float) -> None:
+        """
+        Run the search (or pondering) for a slice of time, when it doesn't
+            run in a background thread (e.g. with the time left in each frame).
+
+        Parameters
+        ----------
+        microseconds: float
+            - How long the search can run for.
+        """
+        if self._search is not None:
+            self._search.advance(microseconds)
+        return None
+
+    def _use_pondered_move(self, current_word: str) -> None:
+        """
+        Use the answer that was worked out on the opponents turn,
+            if the opponent played one of the pondered moves.
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+        """
+        if self._search is None:
+            return None
+        key = AnytimeSearch.position_key(current_word, self.hand_hash)
+        pondered_move = self._search.pondered_moves.get(key)
+        if pondered_move is not None:
+            (self.current_turn_answer, self.current_turn_card_used), self._pondered_depth = pondered_move
+        return None
+
     def letter_frequency_sort(self, cards_list: list[str]) -> list[str]:
         """
         Variation of the insertion sort algorithm:
-            Sort cards based on the letter frequency distribution
-            in the English language, and any Special cards
+            Sort cards based on the letter utility table (how many
+            word graph edges each letter creates), and any Special cards
             (e.g. Star cards) are placed at the end of the sorted list.
 
         Parameters
@@ -310,7 +968,7 @@ class Bot:
             - List of cards (letters and special cards).
         """
         letter_cards, special_cards = [], []  # Initiate empty lists to separate the letter cards from special ones.
-        alphabet = self._letter_frequencies.keys()  # All english letters (from keys of _letter_frequencies dictionary).
+        alphabet = self._letter_utilities.keys()  # All english letters (from keys of _letter_utilities dictionary).
         for card in cards_list:  # Loop through cards.
             if card in alphabet:  # If a card is a letter.
                 letter_cards.append(card.lower())  # Add it to the letter_cards & make it lowercase for consistency.
@@ -321,8 +979,8 @@ class Bot:
         for i in range(1, len(letter_cards)):  # Loops from the 2nd position to the end.
             key = letter_cards[i]  # Current letter that is being inserted into position.
             j = i - 1  # Previous index.
-            # Loop to find position of the current letter (by comparing letter frequencies).
-            while j >= 0 and self._letter_frequencies[key] < self._letter_frequencies[letter_cards[j]]:
+            # Loop to find position of the current letter (by comparing letter utilities).
+            while j >= 0 and self._letter_utilities[key] < self._letter_utilities[letter_cards[j]]:
                 letter_cards[j + 1] = letter_cards[j]  # Move card at index j forward.
                 j -= 1  # Move j index back.
             letter_cards[j + 1] = key  # Insert card in correct position.
@@ -334,31 +992,57 @@ class Bot:
         """
         Discard a card from the bot.
         """
-        alphabet = self._letter_frequencies.keys()  # All english letters (from keys of _letter_frequencies dictionary).
+        card_to_remove = self.choose_discard()  # The card that the bot picks to discard.
+        if card_to_remove is not None:
+            self.remove_cards(card_to_remove)  # Remove the card from the bots cards.
+        return None
+
+    def choose_discard(self) -> str | None:
+        """
+        Return the card that the bot would discard (without removing it),
+            or None if the bot has no cards.
+        """
+        if not self._number_of_cards:  # The bot has no cards to discard.
+            return None
 
         if self._difficulty_level == Bot.Difficulty.EASY:  # When the bot is in easy mode.
-            card_to_remove_index = random.randint(0, len(self.cards) - 1)  # Pick a random index from the cards list.
-            self.cards.pop(card_to_remove_index)  # Remove the card from the bots cards.
+            card_to_remove = self._random_card()  # Pick a random card from the bots cards.
 
         elif self._difficulty_level in (Bot.Difficulty.MEDIUM, Bot.Difficulty.HARD):  # If bot is in medium or hard mode.
-            worst_card = self.cards[0]  # Initiate variable for the worst card as the bots first card.
-            for card in self.cards:  # Loops through the bots cards.
-                try:  # Tries the following code.
-                    # Checks if the current letter is less common.
-                    if self._letter_frequencies[card] < self._letter_frequencies[worst_card]:  # Breakpoint here
-                        worst_card = card  # Sets the current letter as the worst.
-                except KeyError:
-                    # Runs when the frequency of the star card is checked.
-                    # (Which returns an error because it is not in the _letter_frequencies dictionary).
-                    if worst_card not in alphabet:  # If the initial worst card is a special card.
-                        worst_card = card  # Set the worst card to the current card.
-                    else:  # This case means the current card is a special card.
-                        continue  # Skip the special card and continue the loop.
-            self.cards.remove(worst_card)  # Remove the worst card from bots cards.
+            card_to_remove = self._worst_card()  # Pick the least useful card from the bots cards.
 
         else:  # This case means the bot difficulty level wasn't found.
             raise Exception("\nError: Unknown difficulty mode was set for Bot")
 
+        return card_to_remove
+
+    def _worst_card(self) -> str | None:
+        """
+        Return the least useful card in the bots hand
+            (or None if the bot has no cards).
+
+        The star card has the last bucket of the hand index,
+            so it is only returned when the bot has no letter cards.
+        """
+        for bucket, count in enumerate(self._card_counts):  # Buckets go from the least useful card to the most useful.
+            if count:  # The first bucket that is not empty holds the worst card.
+                return self._cards_by_usefulness[bucket]
+        return None
+
+    def _random_card(self) -> str | None:
+        """
+        Return a random card from the bots hand
+            (or None if the bot has no cards).
+
+        Every card in the hand is equally likely to be picked.
+        """
+        if not self._number_of_cards:
+            return None
+        card_number = self.random.randrange(self._number_of_cards)  # Pick which card (counting through the buckets).
+        for bucket, count in enumerate(self._card_counts):
+            if card_number < count:  # The picked card is in this bucket.
+                return self._cards_by_usefulness[bucket]
+            card_number -= count
         return None
 
     def _will_answer_or_not(self) -> bool:
@@ -371,7 +1055,7 @@ class Bot:
         """
         # Gets the answer probability from settings based on the difficulty.
         answer_probability = self._difficulty_settings[self._difficulty_level]["ANSWER_PROBABILITY"]
-        random_probability = random.random()  # Gets random number between 0 and 1.
+        random_probability = self.random.random()  # Gets random number between 0 and 1.
         # Check if the random number is within the range of the answer probability (i.e. between 0 & the probability).
         if random_probability < answer_probability:
             return True
@@ -387,27 +1071,139 @@ class Bot:
         # Gets the variance based on the chosen difficulty.
         variance_answer_time = self._difficulty_settings[self._difficulty_level]["VARIANCE_ANSWER_TIME"]
         # Randomly setting the answer time based on a normal distribution.
-        answer_time = random.normalvariate(average_answer_time, variance_answer_time)
+        answer_time = self.random.normalvariate(average_answer_time, variance_answer_time)
         if answer_time <= 3:  # Avoiding bot from answering too fast.
             return 3
         # Avoiding answer_time going over the time limit (subtracting 1 to give leeway to answer).
-        elif answer_time >= Bot.game_settings.TURN_TIME_LIMIT - 1:
-            return Bot.game_settings.TURN_TIME_LIMIT - 1
+        elif answer_time >= self.game_settings.TURN_TIME_LIMIT - 1:
+            return self.game_settings.TURN_TIME_LIMIT - 1
         else:
             return answer_time
 
-    def _get_bot_words(self) -> set[str]:
+    def _get_bot_words(self) -> VocabularyView:
         """
-        Return the set of words that the bot can use to find a new word.
+        Return the words that the bot can use to find a new word
+            (a view of the words above the frequency cut-off).
         """
-        word_frequencies = Bot.game_settings.WORD_FREQUENCIES  # Dictionary of words and how common they are.
-        all_bot_words = Bot.game_settings.ALL_BOT_WORDS  # All the words that can be played in the game.
+        vocabulary = self._get_vocabulary()  # All the words ranked from the most common.
         # Cut-off that determines which words are included in the bots dictionary of words.
         frequency_cutoff = self._difficulty_settings[self._difficulty_level]["WORD_FREQUENCY_CUTOFF"]
+        # The words above the cut-off are the most common ones, so the view only needs to know how many there are.
+        return vocabulary.view(vocabulary.size_for_cutoff(frequency_cutoff))
+
+    def _get_vocabulary(self) -> RankedVocabulary:
+        """
+        Return all the words ranked from the most common (made the first time it is needed for each word length).
+        """
+        word_length = self.game_settings.WORD_LENGTH
+        if word_length not in Bot._vocabularies:
+            Bot._vocabularies[word_length] = RankedVocabulary(self.game_settings.WORD_FREQUENCIES,
+                                                              self.game_settings.ALL_BOT_WORDS)
+        return Bot._vocabularies[word_length]
+
+    def update_difficulty_settings(self, settings: dict[str, float]) -> None:
+        """
+        Change settings of the bots difficulty level
+            (e.g. to try settings in the auto-tuner).
+
+        Parameters
+        ----------
+        settings: dict[str, float]
+            - The settings to change and their new values.
+        """
+        self._difficulty_settings[self._difficulty_level].update(settings)
+        if "WORD_FREQUENCY_CUTOFF" in settings:  # The bots words depend on the cut-off.
+            # Resize the view (the search holds the same view, so it uses the new words straight away).
+            self._bot_words.size = self._get_vocabulary().size_for_cutoff(settings["WORD_FREQUENCY_CUTOFF"])
+        return None
+
+    @property
+    def difficulty_level(self) -> Difficulty:
+        """
+        Return the bots difficulty level.
+        """
+        return self._difficulty_level
+
+    @property
+    def bot_words(self) -> VocabularyView:
+        """
+        Return the words that the bot can use (a view that follows the bots difficulty).
+        """
+        return self._bot_words
+
+    @property
+    def difficulty_settings(self) -> dict[str, float]:
+        """
+        Return the settings of the bots difficulty level (with any changes from adapt).
+        """
+        return self._difficulty_settings[self._difficulty_level]
+
+    def set_difficulty(self, difficulty_level: Difficulty) -> None:
+        """
+        Change the bots difficulty level, keeping its cards and everything
+            it has loaded (the settings start from the defaults of the level).
+
+        Parameters
+        ----------
+        difficulty_level: Difficulty
+            - The new difficulty level.
+        """
+        self.stop_search()  # Stop searching with the old settings.
+        self._difficulty_level = difficulty_level
+        self._difficulty_settings[difficulty_level] = dict(self._default_settings[difficulty_level])
+        self._bot_words.size = self._get_bot_words().size  # Resize the view to the cut-off of the new level.
+        return None
+
+    def adapt(self, score_gap: int) -> None:
+        """
+        Adapt the bot to how the game is going (e.g. called every turn):
+            the further the opponent is ahead, the closer the answer
+            probability, answer times and vocabulary are to the hard
+            settings (and the further behind, the closer to the easy ones).
+            With no score gap the bot has the settings of its own level.
 
-        # Filter function that removes uncommon (under the frequency cutoff) based on the difficulty setting.
-        bot_words = set((filter(lambda word: word_frequencies[word] > frequency_cutoff, all_bot_words)))
-        return bot_words
+        Parameters
+        ----------
+        score_gap: int
+            - How far the opponent is ahead: the bots cards minus the opponents
+                cards (both sides are trying to get rid of their cards).
+        """
+        skill = Bot.DIFFICULTY_SKILLS[self._difficulty_level] + Bot.ADAPTIVE_SKILL_STEP * score_gap
+        skill = min(max(skill, 0.0), 1.0)
+        # The two difficulties on either side of the skill (so a score gap of 0 gives the bots own settings).
+        levels = sorted(Bot.DIFFICULTY_SKILLS, key=Bot.DIFFICULTY_SKILLS.get)
+        lower = max((level for level in levels if Bot.DIFFICULTY_SKILLS[level] <= skill), key=Bot.DIFFICULTY_SKILLS.get)
+        upper = min((level for level in levels if Bot.DIFFICULTY_SKILLS[level] >= skill), key=Bot.DIFFICULTY_SKILLS.get)
+        skill_range = Bot.DIFFICULTY_SKILLS[upper] - Bot.DIFFICULTY_SKILLS[lower]
+        weight = (skill - Bot.DIFFICULTY_SKILLS[lower]) / skill_range if skill_range else 0.0
+        low, high = self._default_settings[lower], self._default_settings[upper]
+
+        # Settings in between the settings of the two difficulties.
+        settings = {name: low[name] + weight * (high[name] - low[name]) for name in Bot.ADAPTIVE_SETTINGS}
+        # Vocabulary size in between their vocabularies (only the size of the view changes).
+        vocabulary = self._get_vocabulary()
+        low_size = vocabulary.size_for_cutoff(low["WORD_FREQUENCY_CUTOFF"])
+        high_size = vocabulary.size_for_cutoff(high["WORD_FREQUENCY_CUTOFF"])
+        vocabulary_size = round(low_size + weight * (high_size - low_size))
+        settings["WORD_FREQUENCY_CUTOFF"] = vocabulary.cutoff_for_size(vocabulary_size)
+        self.update_difficulty_settings(settings)
+        return None
+
+    @staticmethod
+    def _load_tuned_settings() -> dict:
+        """
+        Return the settings found by the auto-tuner for each difficulty
+            (or an empty dictionary if the bot has not been tuned).
+        """
+        if Bot._tuned_settings is None:  # Only read the file once.
+            try:
+                with open(Bot.TUNED_SETTINGS_FILE_NAME, "r") as file:
+                    tuned_settings = json.load(file)
+                Bot._tuned_settings = {Bot.Difficulty(difficulty): settings
+                                       for difficulty, settings in tuned_settings.items()}
+            except FileNotFoundError:  # The bot has not been tuned, so the default settings are used.
+                Bot._tuned_settings = {}
+        return Bot._tuned_settings
 
     def add_card(self, letter: str) -> None:
         """
@@ -418,7 +1214,14 @@ class Bot:
         letter: str
             - The letter of the card.
         """
-        self.cards.append(letter.lower())  # Add card to bots card list.
+        card = letter.lower()  # Make sure the bots letter cards are in lowercase (to avoid errors).
+        if card not in self._card_buckets:  # Edge case where an unknown card is given to the bot.
+            raise Exception("\nError: Unknown card was given to Bot")
+        bucket = self._card_buckets[card]
+        self.hand_hash = ZobristHash.add_card(self.hand_hash, ZobristHash.BOT, GameSettings.card_index(card),
+                                              self._card_counts[bucket])
+        self._card_counts[bucket] += 1  # Add card to the bots hand index.
+        self._number_of_cards += 1
         return None
 
     def remove_cards(self, letter: str) -> None:
@@ -430,12 +1233,42 @@ class Bot:
         letter: str
             - The letter of the card.
         """
-        if letter.lower() in self.cards:  # Makes sure the letter is in the cards list.
-            self.cards.remove(letter.lower())  # Remove the card.
+        card = letter.lower()
+        bucket = self._card_buckets.get(card)  # The bucket of the card in the hand index.
+        if bucket is not None and self._card_counts[bucket]:  # Makes sure the bot has the card.
+            self.hand_hash = ZobristHash.remove_card(self.hand_hash, ZobristHash.BOT, GameSettings.card_index(card),
+                                                     self._card_counts[bucket])
+            self._card_counts[bucket] -= 1  # Remove the card.
+            self._number_of_cards -= 1
         return None
 
+    def count(self, letter: str) -> int:
+        """
+        Return how many of a card the bot holds (like Hand.count).
+
+        Parameters
+        ----------
+        letter: str
+            - The letter of the card.
+        """
+        bucket = self._card_buckets.get(letter.lower())
+        return 0 if bucket is None else self._card_counts[bucket]
+
     def won_game(self) -> bool:
         """
         Return whether the bot has won the game.
         """
-        return len(self.cards) == 0  # The winner is announced when they finish all their cards.
\ No newline at end of file
+        return self._number_of_cards == 0  # The winner is announced when they finish all their cards.
+
+    def __len__(self) -> int:
+        """
+        Return how many cards the bot has.
+        """
+        return self._number_of_cards
+
+    def __contains__(self, card: str) -> bool:
+        """
+        Return whether the bot has a card.
+        """
+        bucket = self._card_buckets.get(card.lower())  # The bucket of the card in the hand index.
+        return bucket is not None and self._card_counts[bucket] > 0
\ No newline at end of file
@@ -0,0 +1,503 @@
+"""
+Anytime iterative-deepening search for the bot (runs while the bot is "thinking"),
+in a background thread or in slices of each frame.
+"""
+
+
+# Importing libraries and modules.
+import threading
+import time
+
+from GameSettings import GameSettings
+from WordGraph import WordGraph
+from ZobristHash import ZobristHash
+
+
+class _SearchStopped(Exception):
+    """
+    Raised inside the search when its time or CPU budget runs out.
+    """
+
+
+class AnytimeSearch:
+    """
+    Searches the bots moves with depth-limited alpha-beta negamax, one
+        depth deeper at a time, in a background thread. The best move of
+        the deepest search that finished is kept, so whenever the bot has
+        to answer, it answers with the best move that it has found so far.
+
+    The search is written as generators that pause when their slice of time
+        runs out, so where threads can't be used (threaded is False), the
+        search runs in the calling thread a slice at a time: advance is
+        called with the time that is left in each frame, and the search
+        carries on from where the last slice paused.
+
+    Both hands are known to the search. A side without a move draws a
+        penalty card (an unknown card that the search can't play), and
+        star card moves are not searched (they make a new random word).
+    Positions are scored for the side to move by the difference in hand
+        sizes, plus how useful the cards that are left are.
+
+    Attributes
+    ----------
+    CHECK_INTERVAL: int
+        - How many positions are searched between checks of the time budget.
+
+    SLICE_CHECK_INTERVAL: int
+        - How many positions are searched between checks of the end of a slice
+            (small, so a slice never runs far past its end).
+
+    USEFULNESS_WEIGHT: float
+        - How much the usefulness of the cards in the hands adds to the score
+            (less than one card, so hand sizes always matter more).
+
+    best_move: tuple[str, str] | None
+        - The best word and card found so far (None until depth 1 finishes).
+
+    completed_depth: int
+        - The depth of the deepest search that finished.
+
+    pondered_moves: dict[int, tuple[tuple[str, str], int]]
+        - Best move and completed depth of each position searched while
+            pondering (by the Zobrist hash of the word and the bot cards).
+
+    _graph: WordGraph
+        - Graph of all the words that can be played.
+
+    _bot_words: set[str]
+        - The words that the bot can play.
+
+    _card_values: list[float]
+        - How useful each card is (0 to 1, by card index).
+
+    _threaded: bool
+        - Whether the search runs in a background thread (or in slices).
+
+    _thread: threading.Thread | None
+        - The thread that is running the search.
+
+    _steps: Generator | None
+        - The search that is paused between slices (when it isn't threaded).
+
+    _slice_deadline: float
+        - When the current slice ends (time.perf_counter).
+
+    _paused_cpu_time: float
+        - CPU time that the calling thread used between slices (it doesn't
+            count towards the CPU budget of the search).
+
+    _stop_event: threading.Event
+        - Set to stop the search.
+
+    Methods
+    -------
+    start(current_word, bot_cards, opponent_cards, max_depth, time_budget, cpu_budget):
+        - Start searching a position in a background thread.
+
+    start_pondering(positions, max_depth, time_budget, cpu_budget):
+        - Start searching likely next positions in a background thread.
+
+    advance(microseconds):
+        - Run the search for a slice of time (when it isn't threaded).
+
+    stop():
+        - Stop the search (or pondering) and wait for the thread to finish.
+
+    position_key(current_word, bot_hand_hash):
+        - Return the key of a position in pondered_moves (its Zobrist hash).
+
+    moves(current_word, cards):
+        - Return the word and card of every move a hand can play on a word.
+
+    search(current_word, bot_cards, opponent_cards, max_depth, time_budget, cpu_budget):
+        - Search a position in the calling thread and return the best move.
+    """
+
+    CHECK_INTERVAL = 256
+    SLICE_CHECK_INTERVAL = 16
+    USEFULNESS_WEIGHT = 0.5
+
+    _WIN = 1000.0
+    _STAR = GameSettings.card_index(GameSettings.STAR_CARD)
+
+    game_settings = GameSettings()
+
+    def __init__(self, bot_words: set[str], all_words: set[str], letter_utilities: dict[str, int],
+                 threaded: bool = True, settings: GameSettings = None):
+        """
+        Construct all the necessary attributes for the AnytimeSearch object.
+
+        Parameters
+        ----------
+        bot_words: set[str]
+            - The words that the bot can play.
+
+        all_words: set[str]
+            - All the words that can be played (by either side).
+
+        letter_utilities: dict[str, int]
+            - How useful each letter is (from LetterUtility).
+
+        threaded: bool
+            - Whether to search in a background thread (or in slices with advance).
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        self.game_settings = AnytimeSearch.game_settings if settings is None else settings
+        self._graph = WordGraph(all_words)
+        self._bot_words = bot_words
+        highest_utility = max(letter_utilities.values()) or 1
+        self._card_values = [letter_utilities.get(letter, 0) / highest_utility for letter in GameSettings.ALPHABET]
+        self._card_values.append(1.0)  # The star card can be any letter.
+
+        self.best_move = None
+        self.completed_depth = 0
+        self.pondered_moves = {}
+        self._threaded = threaded
+        self._thread = None
+        self._steps = None
+        self._stop_event = threading.Event()
+        self._slice_deadline = float("inf")
+        self._paused_cpu_time = 0.0
+        self._slice_end_cpu_time = 0.0
+        self._deadline = 0.0
+        self._cpu_deadline = 0.0
+        self._nodes = 0
+        self._hands = [[], []]
+        self._hand_sizes = [0, 0]
+        self._hand_values = [0.0, 0.0]
+
+    def start(self, current_word: str, bot_cards: list[str], opponent_cards: list[str], max_depth: int,
+              time_budget: float, cpu_budget: float) -> None:
+        """
+        Start searching a position in a background thread, or in slices
+            (best_move is updated each time a depth finishes).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game that the bot must change.
+
+        bot_cards: list[str]
+            - The bots cards.
+
+        opponent_cards: list[str]
+            - The opponents cards.
+
+        max_depth: int
+            - The deepest search (in turns).
+
+        time_budget: float
+            - How many seconds (wall-clock) the search can run for.
+
+        cpu_budget: float
+            - How many seconds of CPU time the search can use.
+        """
+        self._run(self.search_steps(current_word, bot_cards, opponent_cards, max_depth, time_budget, cpu_budget))
+        return None
+
+    def start_pondering(self, positions: list[tuple[str, list[str], list[str]]], max_depth: int,
+                        time_budget: float, cpu_budget: float) -> None:
+        """
+        Start searching likely next positions (e.g. after each move the
+            opponent might play) in a background thread or in slices, one
+            after another, and store their best moves in pondered_moves.
+
+        Parameters
+        ----------
+        positions: list[tuple[str, list[str], list[str]]]
+            - The word, bot cards and opponent cards of each position
+                (the most likely position first).
+
+        max_depth: int
+            - The deepest search (in turns).
+
+        time_budget: float
+            - How many seconds (wall-clock) all the searches can run for.
+
+        cpu_budget: float
+            - How many seconds of CPU time all the searches can use.
+        """
+        self.pondered_moves = {}
+        self._run(self._ponder_steps(positions, max_depth, time.monotonic() + time_budget, cpu_budget))
+        return None
+
+    def _run(self, steps) -> None:
+        """
+        Start running a search: in a background thread, or paused until advance is called.
+        """
+        self.stop()
+        self._stop_event.clear()
+        self._paused_cpu_time = 0.0
+        if self._threaded:
+            self._slice_deadline = float("inf")  # The thread searches without pausing.
+            self._thread = threading.Thread(target=self._finish, args=(steps,), daemon=True)
+            self._thread.start()
+        else:
+            self._steps = steps
+            self._slice_end_cpu_time = time.thread_time()
+        return None
+
+    @staticmethod
+    def _finish(steps) -> None:
+        """
+        Run a search until it is done (it never pauses, as its slice never ends).
+        """
+        for _ in steps:
+            pass
+        return None
+
+    def advance(self, microseconds: float) -> bool:
+        """
+        Run the paused search for a slice of time, and return whether it
+            is still running (e.g. called with the time that is left in a frame).
+
+        Parameters
+        ----------
+        microseconds: float
+            - How long the slice is.
+        """
+        if self._steps is None:
+            return False
+        # CPU time that was used outside the search since the last slice is not part of its budget.
+        self._paused_cpu_time += time.thread_time() - self._slice_end_cpu_time
+        self._slice_deadline = time.perf_counter() + microseconds / 1_000_000
+        try:
+            next(self._steps)
+        except StopIteration:  # The search is done.
+            self._steps = None
+        self._slice_end_cpu_time = time.thread_time()
+        return self._steps is not None
+
+    def _cpu_time(self) -> float:
+        """
+        Return the CPU time that the search has used (of the thread it runs in).
+        """
+        return time.thread_time() - self._paused_cpu_time
+
+    def _ponder_steps(self, positions: list[tuple[str, list[str], list[str]]], max_depth: int,
+                      deadline: float, cpu_budget: float):
+        """
+        Search each position until the budget runs out (pauses at the end of each slice).
+        """
+        cpu_deadline = self._cpu_time() + cpu_budget  # CPU time is measured for the thread that searches.
+        for position_number, (current_word, bot_cards, opponent_cards) in enumerate(positions):
+            time_left, cpu_time_left = deadline - time.monotonic(), cpu_deadline - self._cpu_time()
+            if self._stop_event.is_set() or time_left <= 0 or cpu_time_left <= 0:
+                break
+            # The budget left is shared out between the positions left (time a search doesn't use carries over).
+            positions_left = len(positions) - position_number
+            move = yield from self.search_steps(current_word, bot_cards, opponent_cards, max_depth,
+                                                time_left / positions_left, cpu_time_left / positions_left)
+            if move is not None:
+                key = self.position_key(current_word, ZobristHash.hash_hand(ZobristHash.BOT, bot_cards))
+                self.pondered_moves[key] = (move, self.completed_depth)
+        return None
+
+    def moves(self, current_word: str, cards: list[str]) -> list[tuple[str, str]]:
+        """
+        Return the new word and the card of every move that a hand
+            can play on a word (without star card moves).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word.
+
+        cards: list[str]
+            - The cards of the hand.
+        """
+        letters = {card.lower() for card in cards}
+        return [(new_word, letter) for _, letter, new_word in self._graph.neighbors(current_word.lower())
+                if letter in letters]
+
+    @staticmethod
+    def position_key(current_word: str, bot_hand_hash: int) -> int:
+        """
+        Return the key of a position in pondered_moves: the Zobrist hash of
+            the word and the bots hand (the bot keeps the hash of its hand up
+            to date as it changes, so no cards are sorted or joined). The
+            opponents hand is not part of the key, as the bot can't see it
+            (the positions are searched with hands it believes they have).
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word.
+
+        bot_hand_hash: int
+            - Zobrist hash of the bots cards (e.g. Bot.hand_hash).
+        """
+        return ZobristHash.hash_word(current_word.lower()) ^ bot_hand_hash
+
+    def stop(self) -> None:
+        """
+        Stop the search (or pondering) and wait for the thread to finish.
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        if self._steps is not None:  # Close the paused search (its moves are undone as it closes).
+            self._steps.close()
+            self._steps = None
+        return None
+
+    def search(self, current_word: str, bot_cards: list[str], opponent_cards: list[str], max_depth: int,
+               time_budget: float, cpu_budget: float) -> tuple[str, str] | None:
+        """
+        Search a position with iterative deepening in the calling thread
+            and return the best word and card (or None if the bot has no
+            letter move, or depth 1 didn't finish in time).
+
+        Parameters
+        ----------
+        Same as start.
+        """
+        self._slice_deadline = float("inf")
+        self._paused_cpu_time = 0.0
+        self._finish(self.search_steps(current_word, bot_cards, opponent_cards, max_depth, time_budget, cpu_budget))
+        return self.best_move
+
+    def search_steps(self, current_word: str, bot_cards: list[str], opponent_cards: list[str], max_depth: int,
+                     time_budget: float, cpu_budget: float):
+        """
+        Generator that searches a position with iterative deepening,
+            pauses (yields) at the end of each slice, and returns the best
+            word and card (like search).
+
+        Parameters
+        ----------
+        Same as start.
+        """
+        self.best_move, self.completed_depth = None, 0
+        self._deadline = time.monotonic() + time_budget
+        self._cpu_deadline = self._cpu_time() + cpu_budget
+        self._nodes = 0
+        self._hands = [self._counts(bot_cards), self._counts(opponent_cards)]
+        self._hand_sizes = [len(bot_cards), len(opponent_cards)]
+        self._hand_values = [sum(count * value for count, value in zip(hand, self._card_values))
+                             for hand in self._hands]
+
+        current_word = current_word.lower()
+        for depth in range(1, max_depth + 1):
+            try:
+                value, move = yield from self._negamax(current_word, 0, depth, -self._WIN - 1, self._WIN + 1,
+                                                       self.best_move)
+            except _SearchStopped:  # The budget ran out, so this depth is not used.
+                break
+            if move is None:  # The bot has no letter move.
+                break
+            self.best_move = move[0], GameSettings.ALPHABET[move[1]]
+            self.completed_depth = depth
+            if abs(value) >= self._WIN:  # The result of the game is already known.
+                break
+        return self.best_move
+
+    @staticmethod
+    def _counts(cards: list[str]) -> list[int]:
+        """
+        Return how many of each card there are in a list of cards (by card index).
+        """
+        counts = [0] * (len(GameSettings.ALPHABET) + 1)
+        for card in cards:
+            counts[GameSettings.card_index(card.lower())] += 1
+        return counts
+
+    def _check_budget(self) -> bool:
+        """
+        Stop the search if it was stopped, or its time or CPU budget ran out,
+            and return whether the current slice has ended (so the search pauses).
+        """
+        self._nodes += 1
+        if self._nodes % self.CHECK_INTERVAL == 0:
+            if (self._stop_event.is_set() or time.monotonic() >= self._deadline
+                    or self._cpu_time() >= self._cpu_deadline):
+                raise _SearchStopped()
+        return self._nodes % self.SLICE_CHECK_INTERVAL == 0 and time.perf_counter() >= self._slice_deadline
+
+    def _evaluate(self, side: int) -> float:
+        """
+        Return the score of the position for the side to move.
+        """
+        other = 1 - side
+        score = self._hand_sizes[other] - self._hand_sizes[side]
+        score += self.USEFULNESS_WEIGHT * (self._hand_values[side] / max(self._hand_sizes[side], 1)
+                                           - self._hand_values[other] / max(self._hand_sizes[other], 1))
+        return score
+
+    def _negamax(self, word: str, side: int, depth: int, alpha: float, beta: float,
+                 first_move: tuple | None = None):
+        """
+        Generator that returns the score of the position for the side to
+            move and its best move (new word and card index), and pauses
+            whenever the current slice ends.
+
+        Parameters
+        ----------
+        word: str
+            - The current word.
+
+        side: int
+            - The side to move (0 for the bot, 1 for the opponent).
+
+        depth: int
+            - How many more turns to search.
+
+        alpha: float
+            - The score that the side to move is already sure of.
+
+        beta: float
+            - The score above which the other side won't allow this position.
+
+        first_move: tuple | None
+            - A move to search first (the best move of the last depth).
+        """
+        if self._check_budget():
+            yield  # The slice has ended, so pause until the next one.
+        if depth == 0:
+            return self._evaluate(side), None
+
+        hand = self._hands[side]
+        moves = [(new_word, ord(letter) - 97) for _, letter, new_word in self._graph.neighbors(word)
+                 if hand[ord(letter) - 97] and (side == 1 or new_word in self._bot_words)]
+        # Try the least useful cards first (they are usually the best ones to play).
+        moves.sort(key=lambda move: self._card_values[move[1]])
+        if first_move is not None:
+            first_move = (first_move[0], GameSettings.card_index(first_move[1]))
+            if first_move in moves:
+                moves.remove(first_move)
+                moves.insert(0, first_move)
+
+        if not moves:  # No move, so the side to move draws a penalty card.
+            if self._hand_sizes[side] + 1 >= self.game_settings.MAX_CARDS:  # Reaching the maximum amount loses.
+                return -self._WIN, None
+            self._hand_sizes[side] += 1
+            try:
+                child_value, _ = yield from self._negamax(word, 1 - side, depth - 1, -beta, -alpha)
+            finally:
+                self._hand_sizes[side] -= 1
+            return -child_value, None
+
+        best_value, best_move = -self._WIN - 1, None
+        for new_word, card in moves:
+            if self._hand_sizes[side] == 1:  # Playing the last card wins the game.
+                return self._WIN, (new_word, card)
+            # Apply the move.
+            hand[card] -= 1
+            self._hand_sizes[side] -= 1
+            self._hand_values[side] -= self._card_values[card]
+            try:
+                child_value, _ = yield from self._negamax(new_word, 1 - side, depth - 1, -beta, -alpha)
+            finally:  # Undo the move (also when the search is stopped).
+                hand[card] += 1
+                self._hand_sizes[side] += 1
+                self._hand_values[side] += self._card_values[card]
+
+            if -child_value > best_value:
+                best_value, best_move = -child_value, (new_word, card)
+            alpha = max(alpha, best_value)
+            if alpha >= beta:  # The other side won't allow this position.
+                break
+        return best_value, best_move
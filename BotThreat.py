@@ -0,0 +1,263 @@
+"""
+Threat table: how many replies each word leaves the opponent, and how likely they are to be forced to take a penalty.
+
+Run this file to build the table for the current words and settings:
+
+    python BotThreat.py
+"""
+
+
+# Importing libraries and modules.
+import struct
+import time
+import zlib
+from math import comb
+
+import numpy as np
+
+from GameSettings import GameSettings
+from WordGraph import WordGraph
+
+
+class ThreatTable:
+    """
+    For each word (by word id) and each opponent hand size: the expected
+        number of replies (words the opponent can change it into) and the
+        probability that the opponent has no reply (so they must draw a
+        penalty card), for a hand dealt from a deck made by Game.card_stack.
+
+    A deck from Game.card_stack has LETTER_CARDS random letters and
+        STAR_CARD_DRAWS cards from Game.star_card (a star card 8 in 11
+        times, or an "e", "a" or "t"), shuffled, so a hand of h cards has
+        k of the STAR_CARD_DRAWS star_card cards
+        (hypergeometric), and each card is independent given k. A reply
+        can be played with its letter or with a star card, so both
+        numbers are exact sums over k (no sampling is needed), and the
+        whole table is built at once with array operations.
+
+    A key file beside the table holds the rules and a checksum of the
+        words it was built for, and load returns None when they don't
+        match the current ones (so the table must be built again).
+
+    Attributes
+    ----------
+    FILE_NAME: str
+        - The file that the table is stored in.
+
+    KEY_FILE_NAME: str
+        - The file that the rules and the words checksum of the table are stored in.
+
+    EXPECTED_REPLIES: int
+        - Index of the expected number of replies in the last axis of the table.
+
+    PENALTY_PROBABILITY: int
+        - Index of the probability of a forced penalty in the last axis of the table.
+
+    table: np.ndarray
+        - The threat of each word (words x hand sizes 1 to MAX_CARDS x 2).
+
+    game_settings: GameSettings
+        - The rules that the table is for.
+
+    _word_ids: dict[str, int]
+        - The id of each word (its index in the sorted words).
+
+    Methods
+    -------
+    build(words, settings):
+        - Return the table for a list of words and the rules of a game.
+
+    expected_replies(word, hand_size):
+        - Return the expected number of replies the opponent has to a word.
+
+    penalty_probability(word, hand_size):
+        - Return the probability that the opponent has no reply to a word.
+
+    save():
+        - Save the table to its file.
+
+    load(words, settings):
+        - Return the table from its file (or None if it is missing or out of date).
+    """
+
+    FILE_NAME = "data/threat_table.npy"
+    KEY_FILE_NAME = "data/threat_table.key"
+    EXPECTED_REPLIES = 0
+    PENALTY_PROBABILITY = 1
+
+    _STAR_CARD_LETTERS = "eat"  # Letters that Game.star_card gives (1 in 11 times each).
+    _STAR_CARD_LETTER_PROBABILITY = 1 / 11
+
+    # Key file: magic, version, the rules (GameSettings.rules), number of words and checksum of the words.
+    _HEADER = struct.Struct("<4sB6HII")
+    _MAGIC = b"WTHR"
+    _VERSION = 1
+
+    game_settings = GameSettings()
+
+    def __init__(self, table: np.ndarray, words, settings: GameSettings = None):
+        """
+        Construct all the necessary attributes for the ThreatTable object.
+
+        Parameters
+        ----------
+        table: np.ndarray
+            - The threat of each word (words x hand sizes x 2).
+
+        words: Iterable[str]
+            - All the words that can be played.
+
+        settings: GameSettings
+            - The rules that the table is for (the rule profile that is picked by default).
+        """
+        self.table = table
+        self.game_settings = ThreatTable.game_settings if settings is None else settings
+        self._word_ids = {word: word_id for word_id, word in enumerate(sorted(words))}
+
+    @staticmethod
+    def build(words, settings: GameSettings = None) -> "ThreatTable":
+        """
+        Return the table for a list of words and the rules of a game.
+
+        Parameters
+        ----------
+        words: Iterable[str]
+            - All the words that can be played (by the opponent).
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        settings = ThreatTable.game_settings if settings is None else settings
+        words = sorted(words)
+        graph = WordGraph(words)
+        alphabet = GameSettings.ALPHABET
+        # Letters of each word's replies (words x letters): how many replies use each letter.
+        reply_letters = np.zeros((len(words), len(alphabet)), dtype=np.int64)
+        for word_id, word in enumerate(words):
+            for _, letter, _ in graph.neighbors(word):
+                if letter in alphabet:
+                    reply_letters[word_id, ord(letter) - 97] += 1
+        has_letter = reply_letters > 0
+        star_card_letters = np.array([letter in ThreatTable._STAR_CARD_LETTERS for letter in alphabet])
+
+        hand_sizes = np.arange(1, settings.MAX_CARDS + 1)
+        # Cards in a deck from Game.card_stack, and the ones that come from Game.star_card.
+        draws = settings.STAR_CARD_DRAWS
+        deck_size = settings.LETTER_CARDS + draws
+        table = np.zeros((len(words), len(hand_sizes), 2), dtype=np.float32)
+        for hand_index, hand_size in enumerate(hand_sizes):
+            # Probability of a hand with k cards from Game.star_card (hypergeometric).
+            k = np.arange(min(draws, hand_size) + 1)
+            k_probabilities = np.array([comb(draws, amount) * comb(deck_size - draws, hand_size - amount)
+                                        for amount in k]) / comb(deck_size, hand_size)
+
+            # Probability that the hand has none of the letters (and no star card), for a set of
+            # letters with some letters from Game.star_card and some others.
+            def no_card_probability(letters, star_card_letters_in_set):
+                letter_card_misses = (1 - letters / len(alphabet))[..., None] ** (hand_size - k)
+                star_card_misses = (((len(ThreatTable._STAR_CARD_LETTERS) - star_card_letters_in_set)
+                                     * ThreatTable._STAR_CARD_LETTER_PROBABILITY)[..., None] ** k)
+                return (letter_card_misses * star_card_misses) @ k_probabilities
+
+            # Each reply can be played with its letter or a star card (so the expected replies add up by letter).
+            one_letter_miss = no_card_probability(np.ones(len(alphabet)), star_card_letters.astype(np.float64))
+            table[:, hand_index, ThreatTable.EXPECTED_REPLIES] = reply_letters @ (1 - one_letter_miss)
+            # The opponent is forced to take a penalty when they have none of the reply letters and no star card.
+            forced = no_card_probability(has_letter.sum(axis=1).astype(np.float64),
+                                         (has_letter & star_card_letters).sum(axis=1).astype(np.float64))
+            # A star card is no help when the word has no replies at all.
+            forced[~has_letter.any(axis=1)] = 1.0
+            table[:, hand_index, ThreatTable.PENALTY_PROBABILITY] = forced
+        return ThreatTable(table, words, settings)
+
+    def _lookup(self, word: str, hand_size: int, index: int) -> float | None:
+        """
+        Return one number of the table for a word and a hand size (or None if the word is not in the table).
+        """
+        word_id = self._word_ids.get(word.lower())
+        if word_id is None:
+            return None
+        hand_size = min(max(hand_size, 1), self.table.shape[1])
+        return float(self.table[word_id, hand_size - 1, index])
+
+    def expected_replies(self, word: str, hand_size: int) -> float | None:
+        """
+        Return the expected number of replies that an opponent with a
+            random hand has to a word (or None if the word is not in the table).
+
+        Parameters
+        ----------
+        word: str
+            - The word that the opponent has to change.
+
+        hand_size: int
+            - How many cards the opponent holds.
+        """
+        return self._lookup(word, hand_size, ThreatTable.EXPECTED_REPLIES)
+
+    def penalty_probability(self, word: str, hand_size: int) -> float | None:
+        """
+        Return the probability that an opponent with a random hand has no
+            reply to a word (or None if the word is not in the table).
+
+        Parameters
+        ----------
+        word: str
+            - The word that the opponent has to change.
+
+        hand_size: int
+            - How many cards the opponent holds.
+        """
+        return self._lookup(word, hand_size, ThreatTable.PENALTY_PROBABILITY)
+
+    @staticmethod
+    def _header(words: list[str], settings: GameSettings) -> bytes:
+        """
+        Return the key of the table for a sorted list of words and the rules of a game.
+        """
+        return ThreatTable._HEADER.pack(ThreatTable._MAGIC, ThreatTable._VERSION, *settings.rules,
+                                        len(words), zlib.crc32("\n".join(words).encode()))
+
+    def save(self) -> None:
+        """
+        Save the table to its file (and its key to the key file).
+        """
+        np.save(ThreatTable.FILE_NAME, self.table)
+        with open(ThreatTable.KEY_FILE_NAME, "wb") as file:
+            file.write(ThreatTable._header(list(self._word_ids), self.game_settings))  # The word ids are in the order of the sorted words.
+        return None
+
+    @staticmethod
+    def load(words, settings: GameSettings = None) -> "ThreatTable | None":
+        """
+        Return the table from its file as a memory-mapped array (or None if
+            it is missing or was built for other words or rules).
+
+        Parameters
+        ----------
+        words: Iterable[str]
+            - All the words that can be played.
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        settings = ThreatTable.game_settings if settings is None else settings
+        words = sorted(words)
+        try:
+            with open(ThreatTable.KEY_FILE_NAME, "rb") as file:
+                if file.read() != ThreatTable._header(words, settings):  # Built for other words or rules.
+                    return None
+            table = np.load(ThreatTable.FILE_NAME, mmap_mode="r")
+        except FileNotFoundError:  # The table has not been built yet.
+            return None
+        if table.shape != (len(words), settings.MAX_CARDS, 2):  # Built for other words or rules.
+            return None
+        return ThreatTable(table, words, settings)
+
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+    threat_table = ThreatTable.build(ThreatTable.game_settings.ALL_BOT_WORDS)
+    threat_table.save()
+    print(f"Saved the threat table {threat_table.table.shape} to {ThreatTable.FILE_NAME} "
+          f"in {time.perf_counter() - start_time:.1f}s")
@@ -0,0 +1,326 @@
+"""
+Auto-tuner for the bots difficulty settings.
+
+Plays batches of headless games (on every core) between the bot and a
+    reference player, and searches for the settings of each difficulty
+    that give the target win rate. Run this file to tune the bot:
+
+    python BotTuner.py --easy 0.35 --medium 0.5 --hard 0.65
+
+    (add --rules=<profile> to tune on a variant of the game, e.g. --rules=blitz).
+"""
+
+
+# Importing libraries and modules.
+import argparse
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+
+from BotFunctions import Bot
+from GameEngine import GameEngine, Move
+from GameFunctions import Game
+from GameSettings import GameSettings
+from RandomStream import RandomStream
+
+
+_worker_game = None  # Game object of each worker process (so the words are only loaded once per worker).
+
+
+class BotTuner:
+    """
+    Tunes ANSWER_PROBABILITY and WORD_FREQUENCY_CUTOFF of each difficulty
+        with successive halving: many candidate settings play a few games
+        each, the best third (closest to the target win rate) play three
+        times as many games in the next round, and so on until one is left.
+
+    The answer time settings only change how long the bot waits before it
+        answers (it always answers before the time limit), so they don't
+        change who wins and are not tuned.
+
+    Attributes
+    ----------
+    REFERENCE_PLAYER_SETTINGS: dict[str, float]
+        - Settings of the reference player (a bot that plays like an
+            average human: it sometimes runs out of time and only knows
+            the most common words).
+
+    REFERENCE_PLAYER_VOCABULARY: float
+        - The fraction of the words (most common first) that the reference player knows.
+
+    MAX_TURNS: int
+        - Turns after which a game is stopped and counted as a draw.
+
+    GAMES_PER_TASK: int
+        - How many games a worker plays in one task.
+
+    game_settings: GameSettings
+        - The rules that the games are played with (the workers keep
+            these rules even if another profile is picked).
+
+    _workers: int
+        - How many worker processes play the games.
+
+    _seed: int
+        - Seed of the candidates and the games (so a tuning run can be repeated).
+
+    _word_frequencies: list[float]
+        - Frequencies of all the words the bot can play (from least to most common).
+
+    Methods
+    -------
+    frequency_cutoff(vocabulary_fraction):
+        - Return the word frequency cut-off that keeps the most common
+            fraction of the words.
+
+    win_rate(difficulty, settings, games):
+        - Return the win rate of the bot with some settings against the reference player.
+
+    tune(difficulty, target_win_rate, candidates, first_round_games):
+        - Return the settings of a difficulty that are closest to the target win rate.
+
+    save(tuned_settings):
+        - Write the tuned settings to the bots tuned settings file.
+    """
+
+    REFERENCE_PLAYER_SETTINGS = {"ANSWER_PROBABILITY": 0.85}
+    REFERENCE_PLAYER_VOCABULARY = 0.3
+    MAX_TURNS = 300
+    GAMES_PER_TASK = 10
+
+    game_settings = GameSettings()
+
+    def __init__(self, workers: int = None, seed: int = 0, settings: GameSettings = None):
+        """
+        Construct all the necessary attributes for the BotTuner object.
+
+        Parameters
+        ----------
+        workers: int
+            - How many worker processes play the games (every core by default).
+
+        seed: int
+            - Seed of the candidates and the games.
+
+        settings: GameSettings
+            - The rules that the games are played with (the rule profile that is picked by default).
+        """
+        self.game_settings = BotTuner.game_settings if settings is None else settings
+        self._workers = workers or os.cpu_count() or 1
+        self._seed = seed
+        word_frequencies = self.game_settings.WORD_FREQUENCIES
+        self._word_frequencies = sorted(word_frequencies[word] for word in self.game_settings.ALL_BOT_WORDS)
+
+    def frequency_cutoff(self, vocabulary_fraction: float) -> float:
+        """
+        Return the word frequency cut-off that keeps the most common
+            fraction of the words (the bot uses words above the cut-off).
+
+        Parameters
+        ----------
+        vocabulary_fraction: float
+            - The fraction of the words to keep (between 0 and 1).
+        """
+        dropped_words = round((1 - vocabulary_fraction) * len(self._word_frequencies))
+        if dropped_words <= 0:
+            return 0
+        return self._word_frequencies[dropped_words - 1]
+
+    def _reference_settings(self) -> dict[str, float]:
+        """
+        Return the settings of the reference player.
+        """
+        reference_settings = dict(BotTuner.REFERENCE_PLAYER_SETTINGS)
+        reference_settings["WORD_FREQUENCY_CUTOFF"] = self.frequency_cutoff(BotTuner.REFERENCE_PLAYER_VOCABULARY)
+        return reference_settings
+
+    def _win_rates(self, pool: Pool, difficulty: Bot.Difficulty, candidates: list[dict],
+                   games: int, round_number: int) -> list[float]:
+        """
+        Return the win rate of each candidate (all the games of all
+            the candidates are split into tasks for the worker processes).
+        """
+        tasks = []
+        for candidate_number, settings in enumerate(candidates):
+            for first_game in range(0, games, BotTuner.GAMES_PER_TASK):
+                seed = f"{self._seed}-{difficulty.value}-{round_number}-{candidate_number}-{first_game}"
+                tasks.append((candidate_number, difficulty.value, settings, self._reference_settings(), seed,
+                              min(BotTuner.GAMES_PER_TASK, games - first_game)))
+
+        scores = [0.0] * len(candidates)
+        for candidate_number, score in pool.imap_unordered(_play_games, tasks):
+            scores[candidate_number] += score
+        return [score / games for score in scores]
+
+    def win_rate(self, difficulty: Bot.Difficulty, settings: dict[str, float], games: int) -> float:
+        """
+        Return the win rate of the bot with some settings against the reference player.
+
+        Parameters
+        ----------
+        difficulty: Bot.Difficulty
+            - The difficulty of the bot.
+
+        settings: dict[str, float]
+            - The settings to change from the bots settings.
+
+        games: int
+            - How many games to play.
+        """
+        with Pool(self._workers, initializer=_init_worker, initargs=(self.game_settings.profile,)) as pool:
+            return self._win_rates(pool, difficulty, [settings], games, 0)[0]
+
+    def tune(self, difficulty: Bot.Difficulty, target_win_rate: float, candidates: int = 27,
+             first_round_games: int = 20) -> tuple[dict[str, float], float]:
+        """
+        Return the settings of a difficulty that are closest to the
+            target win rate, and the win rate that they got.
+
+        Parameters
+        ----------
+        difficulty: Bot.Difficulty
+            - The difficulty to tune.
+
+        target_win_rate: float
+            - The win rate against the reference player to aim for.
+
+        candidates: int
+            - How many candidate settings to start with.
+
+        first_round_games: int
+            - How many games each candidate plays in the first round.
+        """
+        candidate_random = random.Random(f"{self._seed}-{difficulty.value}")
+        settings = []
+        for candidate_number in range(candidates):
+            # Stratified samples, so the candidates cover the whole range of both settings.
+            answer_probability = 0.5 + 0.5 * (candidate_number + candidate_random.random()) / candidates
+            vocabulary_fraction = candidate_random.uniform(0.05, 1)
+            settings.append({"ANSWER_PROBABILITY": round(answer_probability, 3),
+                             "WORD_FREQUENCY_CUTOFF": self.frequency_cutoff(vocabulary_fraction)})
+
+        games, round_number = first_round_games, 0
+        with Pool(self._workers, initializer=_init_worker, initargs=(self.game_settings.profile,)) as pool:
+            while True:
+                win_rates = self._win_rates(pool, difficulty, settings, games, round_number)
+                ranking = sorted(range(len(settings)), key=lambda number: abs(win_rates[number] - target_win_rate))
+                print(f"[{difficulty.value}] round {round_number}: {len(settings)} candidates x {games} games, "
+                      f"best win rate {win_rates[ranking[0]]:.3f}")
+                if len(settings) == 1:
+                    return settings[0], win_rates[0]
+                # Keep the best third of the candidates, and give them three times as many games.
+                settings = [settings[number] for number in ranking[:max(1, len(settings) // 3)]]
+                games *= 3
+                round_number += 1
+
+    @staticmethod
+    def save(tuned_settings: dict[Bot.Difficulty, dict[str, float]]) -> None:
+        """
+        Write the tuned settings to the bots tuned settings file
+            (keeping the settings of difficulties that were not tuned).
+
+        Parameters
+        ----------
+        tuned_settings: dict[Bot.Difficulty, dict[str, float]]
+            - The tuned settings of each difficulty.
+        """
+        try:
+            with open(Bot.TUNED_SETTINGS_FILE_NAME, "r") as file:
+                all_settings = json.load(file)
+        except FileNotFoundError:  # First tuning run.
+            all_settings = {}
+        for difficulty, settings in tuned_settings.items():
+            all_settings[difficulty.value] = settings
+        with open(Bot.TUNED_SETTINGS_FILE_NAME, "w") as file:
+            json.dump(all_settings, file, indent=4)
+        return None
+
+
+def _init_worker(profile: str) -> None:
+    """
+    Load the game words once in each worker process, with the rules of a profile
+        (the workers' settings keep them, whatever profile is picked in the process).
+
+    Parameters
+    ----------
+    profile: str
+        - The rule profile of the games.
+    """
+    global _worker_game
+    _worker_game = Game(settings=GameSettings(profile))
+    Bot._tuned_settings = {}  # Candidates are compared to the default settings, not to an older tuning run.
+    return None
+
+
+def _play_games(task: tuple) -> tuple[int, float]:
+    """
+    Play a batch of games between a candidate bot and the reference player
+        (in a worker process), and return the candidate number and its score
+        (1 for each win and 0.5 for each draw).
+    """
+    candidate_number, difficulty_value, settings, reference_settings, seed, games = task
+    _worker_game.random = RandomStream(seed)  # The game and the bots use streams of this seed (repeatable batches).
+    score = 0.0
+    for _ in range(games):
+        # New bots for every game, so nothing of a game (e.g. the opening turn) carries over to the next one.
+        bot_stream, reference_player_stream = _worker_game.random.spawn(2)
+        bot = Bot(Bot.Difficulty(difficulty_value), seed=bot_stream, settings=_worker_game.object_settings)
+        bot.update_difficulty_settings(settings)
+        reference_player = Bot(Bot.Difficulty.MEDIUM, seed=reference_player_stream,
+                               settings=_worker_game.object_settings)
+        reference_player.update_difficulty_settings(reference_settings)
+        score += _play_game(bot, reference_player)
+    return candidate_number, score
+
+
+def _play_game(bot: Bot, reference_player: Bot) -> float:
+    """
+    Play one headless game with the game engine (the same rules as the
+        game window) and return 1 if the bot wins, 0 if it loses and 0.5
+        for a draw.
+    """
+    engine = GameEngine(hands=[bot, reference_player], game=_worker_game)
+    for _ in range(BotTuner.MAX_TURNS):
+        seat = engine.side
+        player = engine.hands[seat]
+        output = player.play_turn(engine.word, 0)  # No time has passed (the time only matters to the window).
+        player.end_turn()
+
+        if output == Bot.Output.THINKING:  # The player didn't answer, so they get a penalty card.
+            engine.timeout()
+        else:
+            engine.apply(Move(*output))
+
+        # Every few valid answers the player discards a card.
+        while engine.discards_earned[seat] and engine.winner is None:
+            if not engine.discard(seat, player.choose_discard()):
+                break
+        if engine.winner is not None:
+            return 1.0 if engine.winner == 0 else 0.0
+    return 0.5
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the bots difficulty settings to target win rates.")
+    for difficulty_name, default_win_rate in (("easy", 0.35), ("medium", 0.5), ("hard", 0.65)):
+        parser.add_argument(f"--{difficulty_name}", type=float, default=default_win_rate,
+                            help=f"target win rate of the {difficulty_name} bot against the reference player")
+    parser.add_argument("--candidates", type=int, default=27, help="candidate settings in the first round")
+    parser.add_argument("--games", type=int, default=20, help="games per candidate in the first round")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (every core by default)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the candidates and the games")
+    parser.add_argument("--rules", default=GameSettings.DEFAULT_PROFILE, choices=list(GameSettings.profiles()),
+                        help="rule profile that the games are played with")
+    arguments = parser.parse_args()
+
+    tuner = BotTuner(arguments.workers, arguments.seed, GameSettings(arguments.rules))
+    start_time = time.perf_counter()
+    results = {}
+    for tuned_difficulty in Bot.Difficulty:
+        results[tuned_difficulty], win_rate = tuner.tune(tuned_difficulty, getattr(arguments, tuned_difficulty.value),
+                                                         arguments.candidates, arguments.games)
+        print(f"[{tuned_difficulty.value}] {results[tuned_difficulty]} (win rate {win_rate:.3f})")
+    BotTuner.save(results)
+    print(f"Saved to {Bot.TUNED_SETTINGS_FILE_NAME} in {time.perf_counter() - start_time:.1f}s")
@@ -0,0 +1,545 @@
+"""
+Value table for the bot: how often a position is won, learned from self-play.
+
+Run this file to train the table for the current words and settings:
+
+    python BotValueTable.py --games 1000000 --generations 4
+"""
+
+
+# Importing libraries and modules.
+import argparse
+import struct
+import time
+import zlib
+from multiprocessing import Pool
+
+import numpy as np
+
+from BotBelief import OpponentBelief
+from GameFunctions import Game
+from GameSettings import GameSettings
+from LetterUtility import LetterUtility
+
+
+_worker_trainer = None  # Trainer of each worker process (so the words are only loaded once per worker).
+
+
+class ValueTable:
+    """
+    How often the player who just played wins the game, for each position
+        after a move: the word they made, the difference in hand sizes
+        (their hand size minus their opponents) and how useful the cards
+        left in their hand are (the mean letter utility, in buckets).
+
+    The table is a float32 array (words x hand size differences x utility
+        buckets) saved with np.save, and loaded as a memory-mapped array,
+        so loading it is instant and a position is scored with one lookup
+        (the bot plays the move that leads to the highest value).
+
+    The table must be trained again after the words or settings change:
+        a key file beside the table holds the rules and a checksum of the
+        words it was trained for, and load returns None when they don't
+        match the current ones.
+
+    Attributes
+    ----------
+    FILE_NAME: str
+        - The file that the table is stored in.
+
+    KEY_FILE_NAME: str
+        - The file that the rules and the words checksum of the table are stored in.
+
+    UTILITY_BUCKETS: int
+        - How many buckets the mean letter utility of a hand is split into.
+
+    table: np.ndarray
+        - The value of each position (words x hand size differences x utility buckets).
+
+    game_settings: GameSettings
+        - The rules that the table was trained for.
+
+    _word_ids: dict[str, int]
+        - The id of each word (its index in the sorted words).
+
+    _card_values: dict[str, float]
+        - How useful each card is (0 to 1, like AnytimeSearch).
+
+    Methods
+    -------
+    shape(amount_of_words, settings):
+        - Return the shape of the table for an amount of words and the rules of a game.
+
+    card_values(letter_utilities):
+        - Return how useful each card is (0 to 1).
+
+    index(word_id, hand_size_difference, hand_utility, settings):
+        - Return the index of a position in the table (works on arrays).
+
+    hand_utility(cards):
+        - Return the mean usefulness of the cards in a hand.
+
+    value(word, hand_size_difference, hand_utility):
+        - Return the value of a position (one array lookup).
+
+    save():
+        - Save the table to its file.
+
+    load(words, letter_utilities, settings):
+        - Return the table from its file (or None if it is missing or out of date).
+    """
+
+    FILE_NAME = "data/bot_value_table.npy"
+    KEY_FILE_NAME = "data/bot_value_table.key"
+    UTILITY_BUCKETS = 8
+
+    # Key file: magic, version, the rules (GameSettings.rules), number of words and checksum of the words.
+    _HEADER = struct.Struct("<4sB6HII")
+    _MAGIC = b"WVAL"
+    _VERSION = 1
+
+    game_settings = GameSettings()
+
+    def __init__(self, table: np.ndarray, words, letter_utilities: dict[str, int], settings: GameSettings = None):
+        """
+        Construct all the necessary attributes for the ValueTable object.
+
+        Parameters
+        ----------
+        table: np.ndarray
+            - The value of each position (in the shape from ValueTable.shape).
+
+        words: Iterable[str]
+            - All the words that can be played.
+
+        letter_utilities: dict[str, int]
+            - How useful each letter is (from LetterUtility).
+
+        settings: GameSettings
+            - The rules that the table was trained for (the rule profile that is picked by default).
+        """
+        self.table = table
+        self.game_settings = ValueTable.game_settings if settings is None else settings
+        self._word_ids = {word: word_id for word_id, word in enumerate(sorted(words))}
+        self._card_values = self.card_values(letter_utilities)
+
+    @staticmethod
+    def shape(amount_of_words: int, settings: GameSettings = None) -> tuple[int, int, int]:
+        """
+        Return the shape of the table for an amount of words and the rules of a game.
+
+        Parameters
+        ----------
+        amount_of_words: int
+            - How many words can be played.
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        max_difference = (ValueTable.game_settings if settings is None else settings).MAX_CARDS - 1
+        return amount_of_words, 2 * max_difference + 1, ValueTable.UTILITY_BUCKETS
+
+    @staticmethod
+    def card_values(letter_utilities: dict[str, int]) -> dict[str, float]:
+        """
+        Return how useful each card is (0 to 1, the star card is 1 because it can be any letter).
+
+        Parameters
+        ----------
+        letter_utilities: dict[str, int]
+            - How useful each letter is (from LetterUtility).
+        """
+        highest_utility = max(letter_utilities.values()) or 1
+        card_values = {letter: letter_utilities.get(letter, 0) / highest_utility for letter in GameSettings.ALPHABET}
+        card_values[GameSettings.STAR_CARD] = 1.0
+        return card_values
+
+    @staticmethod
+    def index(word_id, hand_size_difference, hand_utility, settings: GameSettings = None):
+        """
+        Return the index (word id, difference and utility bucket) of a
+            position in the table (works on numbers and on numpy arrays).
+
+        Parameters
+        ----------
+        word_id: int | np.ndarray
+            - The id of the word that was made.
+
+        hand_size_difference: int | np.ndarray
+            - The hand size of the player who made it minus their opponents.
+
+        hand_utility: float | np.ndarray
+            - The mean usefulness (0 to 1) of the cards left in their hand.
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        max_difference = (ValueTable.game_settings if settings is None else settings).MAX_CARDS - 1
+        difference = np.clip(hand_size_difference, -max_difference, max_difference) + max_difference
+        bucket = np.clip((np.asarray(hand_utility) * ValueTable.UTILITY_BUCKETS).astype(np.int64),
+                         0, ValueTable.UTILITY_BUCKETS - 1)
+        return word_id, difference, bucket
+
+    def hand_utility(self, cards) -> float:
+        """
+        Return the mean usefulness (0 to 1) of the cards in a hand (0 for an empty hand).
+
+        Parameters
+        ----------
+        cards: Iterable[str]
+            - The cards of the hand.
+        """
+        values = [self._card_values[card.lower()] for card in cards]
+        return sum(values) / len(values) if values else 0.0
+
+    def value(self, word: str, hand_size_difference: int, hand_utility: float) -> float:
+        """
+        Return how often the player who made a word wins from the position
+            (0.5 for a word that is not in the table).
+
+        Parameters
+        ----------
+        word: str
+            - The word that was made.
+
+        hand_size_difference: int
+            - The hand size of the player who made it minus their opponents.
+
+        hand_utility: float
+            - The mean usefulness (from hand_utility) of the cards left in their hand.
+        """
+        word_id = self._word_ids.get(word.lower())
+        if word_id is None:
+            return 0.5
+        return float(self.table[self.index(word_id, hand_size_difference, hand_utility, self.game_settings)])
+
+    @staticmethod
+    def _header(words: list[str], settings: GameSettings) -> bytes:
+        """
+        Return the key of the table for a sorted list of words and the rules of a game.
+        """
+        return ValueTable._HEADER.pack(ValueTable._MAGIC, ValueTable._VERSION, *settings.rules,
+                                       len(words), zlib.crc32("\n".join(words).encode()))
+
+    def save(self) -> None:
+        """
+        Save the table to its file (and its key to the key file).
+        """
+        np.save(ValueTable.FILE_NAME, self.table.astype(np.float32))
+        with open(ValueTable.KEY_FILE_NAME, "wb") as file:
+            file.write(ValueTable._header(list(self._word_ids), self.game_settings))  # The word ids are in the order of the sorted words.
+        return None
+
+    @staticmethod
+    def load(words, letter_utilities: dict[str, int], settings: GameSettings = None) -> "ValueTable | None":
+        """
+        Return the table from its file as a memory-mapped array (or None if
+            it is missing or was trained for other words or rules).
+
+        Parameters
+        ----------
+        words: Iterable[str]
+            - All the words that can be played.
+
+        letter_utilities: dict[str, int]
+            - How useful each letter is (from LetterUtility).
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        settings = ValueTable.game_settings if settings is None else settings
+        words = sorted(words)
+        try:
+            with open(ValueTable.KEY_FILE_NAME, "rb") as file:
+                if file.read() != ValueTable._header(words, settings):  # Trained for other words or rules.
+                    return None
+            table = np.load(ValueTable.FILE_NAME, mmap_mode="r")
+        except FileNotFoundError:  # The table has not been trained yet.
+            return None
+        if table.shape != ValueTable.shape(len(words), settings):  # Trained for other words or rules.
+            return None
+        return ValueTable(table, words, letter_utilities, settings)
+
+
+class ValueTableTrainer:
+    """
+    Trains the value table with self-play: batches of headless games are
+        played at once with array operations (like BotBatch), with both
+        sides playing the move with the highest value in the current table
+        (or a random move, to explore). Every position after a move is
+        counted, with whether the player who made it won the game, and the
+        table is the smoothed win rate of each position.
+
+    The rules are the same as the game window (and BotTuner), except that
+        penalty cards are drawn from the deck composition (not from one
+        deck), and a discard is always the least useful card.
+
+    Attributes
+    ----------
+    MAX_TURNS: int
+        - Turns after which a game is stopped (and not counted).
+
+    EXPLORATION: float
+        - Probability that a player plays a random move instead of the best one.
+
+    _word_length: int
+        - The length of the words in the game.
+
+    _shape: tuple[int, int, int]
+        - The shape of the value table.
+
+    _word_codes: np.ndarray
+        - Sorted base-26 codes of the words that can be played.
+
+    _code_word_ids: np.ndarray
+        - The table word id of each code in _word_codes.
+
+    _place_values: np.ndarray
+        - Value of a letter in each position of a word code.
+
+    _card_values: np.ndarray
+        - How useful each card is (by card index).
+
+    _start_words: np.ndarray
+        - Letter numbers of the words that a game can start with.
+
+    _random: np.random.Generator
+        - Random generator of the games.
+
+    Methods
+    -------
+    play(games, table, seed):
+        - Play a batch of games and return how often each position was
+            seen and won.
+
+    train(games, generations, workers, seed, batch_size):
+        - Return a value table trained with self-play.
+    """
+
+    MAX_TURNS = 300
+    EXPLORATION = 0.1
+
+    _STAR = GameSettings.card_index(GameSettings.STAR_CARD)
+
+    game_settings = GameSettings()
+
+    def __init__(self):
+        """
+        Construct all the necessary attributes for the ValueTableTrainer object.
+        """
+        words = sorted(self.game_settings.ALL_BOT_WORDS)
+        self._word_length = self.game_settings.WORD_LENGTH
+        self._shape = ValueTable.shape(len(words), self.game_settings)
+        self._place_values = 26 ** np.arange(self._word_length - 1, -1, -1, dtype=np.int64)
+
+        # Only words of the letters a to z can be made with the cards.
+        playable_words = [(word_id, word) for word_id, word in enumerate(words)
+                          if word.isascii() and word.isalpha()]
+        codes = self._encode([word for _, word in playable_words]) @ self._place_values
+        order = np.argsort(codes)
+        self._word_codes = codes[order]
+        self._code_word_ids = np.array([word_id for word_id, _ in playable_words], dtype=np.int64)[order]
+
+        card_values = ValueTable.card_values(LetterUtility.letter_utilities(words, self._word_length))
+        self._card_values = np.array([card_values[card] for card in GameSettings.CARDS])
+        self._start_words = self._encode([word for word in Game().start_words() if word.isascii() and word.isalpha()])
+        self._random = np.random.default_rng()
+
+    def _encode(self, words: list[str]) -> np.ndarray:
+        """
+        Return the letter numbers (0-25) of a list of words.
+        """
+        letters = np.frombuffer("".join(words).encode(), dtype=np.uint8).reshape(-1, self._word_length)
+        return letters.astype(np.int64) - 97
+
+    def _draw_cards(self, amount: int) -> np.ndarray:
+        """
+        Return cards (by card index) drawn from the deck composition.
+        """
+        return self._random.choice(len(self._card_values), size=amount, p=OpponentBelief.deck_probabilities(self.game_settings))
+
+    def play(self, games: int, table: np.ndarray, seed: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Play a batch of games at once and return how often each position
+            (flat table index) was seen, and how often it was won.
+
+        Parameters
+        ----------
+        games: int
+            - How many games to play.
+
+        table: np.ndarray
+            - The value table that the players use to pick their moves.
+
+        seed: str
+            - Seed of the games.
+        """
+        self._random = np.random.default_rng(list(seed.encode()))
+        rows = np.arange(games)
+        letters = np.arange(len(GameSettings.ALPHABET))
+        flat_table = table.reshape(-1)
+
+        # Deal the start words and hands (hands are card counts: games x side x card index).
+        words = self._start_words[self._random.integers(len(self._start_words), size=games)]
+        hands = np.zeros((games, 2, len(self._card_values)), dtype=np.int64)
+        for side in (0, 1):
+            for _ in range(self.game_settings.START_CARDS_AMOUNT):
+                hands[rows, side, self._draw_cards(games)] += 1
+        sizes = hands.sum(axis=2)
+        valid_answers = np.zeros((games, 2), dtype=np.int64)
+        side = self._random.integers(2, size=games)
+        winner = np.full(games, -1)
+        seen_positions, movers = [], []
+
+        for _ in range(self.MAX_TURNS):
+            playing = winner < 0
+            if not playing.any():
+                break
+            hand = hands[rows, side]
+            other = 1 - side
+
+            # Every word one letter away: (game, position, letter).
+            codes = words @ self._place_values
+            new_codes = codes[:, None, None] + (letters - words[:, :, None]) * self._place_values[None, :, None]
+            found = np.searchsorted(self._word_codes, new_codes).clip(max=len(self._word_codes) - 1)
+            is_word = (self._word_codes[found] == new_codes) & (letters != words[:, :, None])
+            word_ids = self._code_word_ids[found]
+
+            letter_move = is_word & (hand[:, None, :len(letters)] > 0)
+            has_letter_move = letter_move.any(axis=(1, 2))
+            # A star card can be any letter (so it can make any of the words), but is only played without a letter move.
+            star_move = ~has_letter_move & (hand[:, self._STAR] > 0) & is_word.any(axis=(1, 2))
+
+            # Value of every move for the player who makes it (after the card they play leaves their hand).
+            size_after = np.maximum(sizes[rows, side] - 1, 0)
+            played_values = np.where(has_letter_move[:, None], self._card_values[None, :len(letters)],
+                                     self._card_values[self._STAR])
+            utility_after = (hand @ self._card_values)[:, None] - played_values
+            utility_after /= np.maximum(size_after, 1)[:, None]
+            _, difference, bucket = ValueTable.index(
+                word_ids, (size_after - sizes[rows, other])[:, None, None], utility_after[:, None, :],
+                self.game_settings)
+            values = flat_table[np.ravel_multi_index((word_ids, difference, bucket), self._shape)]
+            exploring = self._random.random(games) < self.EXPLORATION
+            values = np.where(exploring[:, None, None], self._random.random(values.shape), values)
+            choices = np.where(has_letter_move[:, None, None], letter_move, is_word)
+            best = np.where(choices, values, -1.0).reshape(games, -1).argmax(axis=1)
+            position, letter = np.divmod(best, len(letters))
+            moved = playing & (has_letter_move | star_move)
+            card = np.where(has_letter_move, letter, self._STAR)
+
+            # Play the moves.
+            moved_rows = rows[moved]
+            hands[moved_rows, side[moved], card[moved]] -= 1
+            sizes[moved_rows, side[moved]] -= 1
+            words[moved_rows, position[moved]] = letter[moved]
+            seen_positions.append(np.where(moved, np.ravel_multi_index(
+                (word_ids[rows, position, letter], difference[:, 0, 0], bucket[rows, 0, letter]), self._shape), -1))
+            movers.append(side.copy())
+            winner[moved & (sizes[rows, side] == 0)] = side[moved & (sizes[rows, side] == 0)]
+
+            # Every 3 valid answers the least useful card is discarded (the star card is kept for last).
+            valid_answers[moved_rows, side[moved]] += 1
+            discarding = moved & (winner < 0) & (valid_answers[rows, side] % 3 == 0)
+            discard_values = np.where(hands[rows, side] > 0, self._card_values, np.inf)
+            discard_values[:, self._STAR] = np.where(hands[rows, side, self._STAR] > 0, 2.0, np.inf)
+            discarded = discard_values.argmin(axis=1)
+            hands[rows[discarding], side[discarding], discarded[discarding]] -= 1
+            sizes[rows[discarding], side[discarding]] -= 1
+            winner[discarding & (sizes[rows, side] == 0)] = side[discarding & (sizes[rows, side] == 0)]
+
+            # A star card makes a new word.
+            new_word = star_move & playing
+            words[new_word] = self._start_words[self._random.integers(len(self._start_words), size=new_word.sum())]
+
+            # A player without a move draws a penalty card (and loses when they reach the maximum).
+            penalty = playing & ~moved
+            hands[rows[penalty], side[penalty], self._draw_cards(penalty.sum())] += 1
+            sizes[rows[penalty], side[penalty]] += 1
+            losing = penalty & (sizes[rows, side] >= self.game_settings.MAX_CARDS)
+            winner[losing] = other[losing]
+            side = np.where(playing, other, side)
+
+        # Count every position of the finished games, and whether the player who made it won.
+        seen = np.zeros(int(np.prod(self._shape)), dtype=np.int64)
+        won = np.zeros_like(seen)
+        finished = winner >= 0
+        for positions, mover in zip(seen_positions, movers):
+            counted = finished & (positions >= 0)
+            seen += np.bincount(positions[counted], minlength=len(seen))
+            won += np.bincount(positions[counted & (mover == winner)], minlength=len(won))
+        return seen, won
+
+    def train(self, games: int, generations: int, workers: int = None, seed: int = 0,
+              batch_size: int = 4096) -> ValueTable:
+        """
+        Return a value table trained with self-play: each generation plays
+            with the table of the last one (the first plays with an even table).
+
+        Parameters
+        ----------
+        games: int
+            - How many games to play in each generation.
+
+        generations: int
+            - How many times the table is trained again from its own games.
+
+        workers: int
+            - How many worker processes play the games (every core by default).
+
+        seed: int
+            - Seed of the games.
+
+        batch_size: int
+            - How many games a worker plays at once.
+        """
+        seen = np.zeros(int(np.prod(self._shape)), dtype=np.int64)
+        won = np.zeros_like(seen)
+        table = np.full(self._shape, 0.5, dtype=np.float32)
+        with Pool(workers, initializer=_init_worker) as pool:
+            for generation in range(generations):
+                tasks = [(min(batch_size, games - first_game), table, f"{seed}/{generation}/{first_game}")
+                         for first_game in range(0, games, batch_size)]
+                for batch_seen, batch_won in pool.imap_unordered(_play_batch, tasks):
+                    seen += batch_seen
+                    won += batch_won
+                # Smoothed win rate (positions that were never seen stay at 0.5).
+                table = ((won + 1) / (seen + 2)).astype(np.float32).reshape(self._shape)
+                print(f"generation {generation}: {np.count_nonzero(seen)} positions seen")
+        return ValueTable(table, self.game_settings.ALL_BOT_WORDS,
+                          LetterUtility.letter_utilities(self.game_settings.ALL_BOT_WORDS, self._word_length),
+                          self.game_settings)
+
+
+def _init_worker() -> None:
+    """
+    Make the trainer once in each worker process.
+    """
+    global _worker_trainer
+    _worker_trainer = ValueTableTrainer()
+    return None
+
+
+def _play_batch(task: tuple) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Play a batch of self-play games (in a worker process).
+    """
+    games, table, seed = task
+    return _worker_trainer.play(games, table, seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the bots value table with self-play.")
+    parser.add_argument("--games", type=int, default=1_000_000, help="self-play games in each generation")
+    parser.add_argument("--generations", type=int, default=4, help="times the table is trained from its own games")
+    parser.add_argument("--batch-size", type=int, default=4096, help="games that a worker plays at once")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (every core by default)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the games")
+    arguments = parser.parse_args()
+
+    start_time = time.perf_counter()
+    value_table = ValueTableTrainer().train(arguments.games, arguments.generations, arguments.workers,
+                                            arguments.seed, arguments.batch_size)
+    value_table.save()
+    print(f"Saved the value table {value_table.table.shape} to {ValueTable.FILE_NAME} "
+          f"in {time.perf_counter() - start_time:.1f}s")
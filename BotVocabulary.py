@@ -0,0 +1,184 @@
+"""
+The bots vocabulary: all the words ranked from the most common to the least common,
+    with views of the most common words that can grow or shrink without being rebuilt.
+"""
+
+
+# Importing libraries.
+import zlib
+from bisect import bisect_right
+
+
+class RankedVocabulary:
+    """
+    All the words that can be played, ranked from the most common to the
+        least common (ties in alphabetical order). The words above a
+        frequency cut-off are always the first words in the ranking, so
+        a vocabulary is only a size (a view of the first words), and
+        changing the cut-off only changes the size of the view.
+
+    Attributes
+    ----------
+    words: list[str]
+        - The words (from the most common to the least common).
+
+    _ranks: dict[str, int]
+        - The rank of each word (0 for the most common word).
+
+    _frequencies: list[float]
+        - The frequency of each word (from the least common to the most common).
+
+    _checksums: dict[int, int]
+        - Checksum of the most common words for each size that has been asked for.
+
+    Methods
+    -------
+    size_for_cutoff(frequency_cutoff):
+        - Return how many words are more common than a frequency cut-off.
+
+    cutoff_for_size(size):
+        - Return the frequency cut-off that keeps (at most) the most common words.
+
+    view(size):
+        - Return a view of the most common words.
+
+    checksum(size):
+        - Return a checksum of the most common words (worked out once for each size).
+    """
+
+    def __init__(self, word_frequencies: dict[str, float], words):
+        """
+        Construct all the necessary attributes for the RankedVocabulary object.
+
+        Parameters
+        ----------
+        word_frequencies: dict[str, float]
+            - How common each word is.
+
+        words: Iterable[str]
+            - The words to rank (all the words that can be played).
+        """
+        self.words = sorted(words, key=lambda word: (-word_frequencies[word], word))
+        self._ranks = {word: rank for rank, word in enumerate(self.words)}
+        self._frequencies = [word_frequencies[word] for word in reversed(self.words)]
+        self._checksums = {}
+
+    def size_for_cutoff(self, frequency_cutoff: float) -> int:
+        """
+        Return how many words are more common than a frequency cut-off
+            (the size of the vocabulary with that cut-off).
+
+        Parameters
+        ----------
+        frequency_cutoff: float
+            - Words with a frequency above this are in the vocabulary.
+        """
+        return len(self._frequencies) - bisect_right(self._frequencies, frequency_cutoff)
+
+    def cutoff_for_size(self, size: int) -> float:
+        """
+        Return the frequency cut-off that keeps the most common words
+            (fewer words if words with the same frequency are split).
+
+        Parameters
+        ----------
+        size: int
+            - How many words to keep.
+        """
+        if size >= len(self._frequencies):  # Every word is kept.
+            return 0
+        return self._frequencies[len(self._frequencies) - 1 - size]  # Frequency of the most common word left out.
+
+    def view(self, size: int) -> "VocabularyView":
+        """
+        Return a view of the most common words.
+
+        Parameters
+        ----------
+        size: int
+            - How many words are in the view.
+        """
+        return VocabularyView(self, size)
+
+    def checksum(self, size: int) -> int:
+        """
+        Return a checksum of the most common words (e.g. to tell whether a table
+            was made for the same words). It is only worked out the first time
+            a size is asked for, so it costs nothing when the size comes back.
+
+        Parameters
+        ----------
+        size: int
+            - How many of the most common words are in the checksum.
+        """
+        if size not in self._checksums:
+            self._checksums[size] = zlib.crc32("\n".join(self.words[:size]).encode())
+        return self._checksums[size]
+
+
+class VocabularyView:
+    """
+    The most common words of a ranked vocabulary (used like a set of words).
+        A word is in the view if its rank is less than the size of the
+        view, so checking a word is one dictionary lookup, and changing
+        the size (e.g. every turn) doesn't copy or filter any words.
+        Everything that holds the view (e.g. the bots search) sees the
+        new size straight away.
+
+    Attributes
+    ----------
+    size: int
+        - How many of the most common words are in the view.
+
+    checksum: int
+        - Checksum of the words in the view (from the ranked vocabulary).
+
+    _vocabulary: RankedVocabulary
+        - The ranked vocabulary that the view is of.
+
+    _ranks: dict[str, int]
+        - The rank of each word (from the ranked vocabulary).
+    """
+
+    __slots__ = ("size", "_vocabulary", "_ranks")
+
+    def __init__(self, vocabulary: RankedVocabulary, size: int):
+        """
+        Construct all the necessary attributes for the VocabularyView object.
+
+        Parameters
+        ----------
+        vocabulary: RankedVocabulary
+            - The ranked vocabulary that the view is of.
+
+        size: int
+            - How many of the most common words are in the view.
+        """
+        self._vocabulary = vocabulary
+        self._ranks = vocabulary._ranks
+        self.size = size
+
+    def __contains__(self, word: str) -> bool:
+        """
+        Return whether a word is in the view.
+        """
+        return self._ranks.get(word, self.size) < self.size
+
+    def __len__(self) -> int:
+        """
+        Return how many words are in the view.
+        """
+        return self.size
+
+    def __iter__(self):
+        """
+        Return an iterator over the words in the view (from the most common).
+        """
+        return iter(self._vocabulary.words[:self.size])
+
+    @property
+    def checksum(self) -> int:
+        """
+        Return a checksum of the words in the view (the same for views of the same size).
+        """
+        return self._vocabulary.checksum(self.size)
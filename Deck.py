@@ -0,0 +1,180 @@
+"""
+The deck of cards: a preallocated array with a draw cursor, and a discard pile that becomes the deck when it runs out.
+"""
+
+
+class Deck:
+    """
+    The cards left to draw and the cards that have been played. Both piles
+        are arrays with room for every card of the game (made once), so
+        drawing moves the cursor of the draw pile, discarding writes at the
+        end of the discard pile, and when the draw pile runs out the two
+        arrays swap and the new draw pile is shuffled in place, so no list
+        is made or copied while a game is played (however long it is).
+
+    Cards are drawn from the end of the draw pile (like list.pop()), so a
+        deck made from a list draws the same cards in the same order.
+
+    A snapshot of the deck is only its arrays and counts (O(1)). Drawing
+        never writes to the arrays, and discarding only writes after the
+        discarded cards, so a snapshot stays valid along the game it was
+        taken in (e.g. for undo and redo, or a depth-first search). Only
+        when the draw pile runs out after a snapshot was taken are new
+        arrays made (once), so the snapshot keeps the arrays it refers to.
+
+    Attributes
+    ----------
+    _draw_pile: list[str | None]
+        - The draw pile (the cards to draw are before the cursor).
+
+    _cursor: int
+        - How many cards are left to draw.
+
+    _discard_pile: list[str | None]
+        - The discard pile (the discarded cards are before the discard count).
+
+    _discard_count: int
+        - How many cards have been discarded.
+
+    _random: RandomStream
+        - Random stream used to shuffle the deck.
+
+    _shared: bool
+        - Whether a snapshot refers to the arrays (so they must not be shuffled).
+
+    Methods
+    -------
+    draw():
+        - Draw a card (or None if there are no cards left).
+
+    discard(card):
+        - Put a played card on the discard pile.
+
+    shuffle():
+        - Shuffle the cards left to draw (in place).
+
+    discard_pile():
+        - Return the cards on the discard pile.
+
+    snapshot():
+        - Return the state of the deck (O(1)).
+
+    restore(state):
+        - Go back to a state of the deck.
+    """
+
+    def __init__(self, cards: list[str], random, capacity: int = None):
+        """
+        Construct all the necessary attributes for the Deck object.
+
+        Parameters
+        ----------
+        cards: list[str]
+            - The cards of the deck (drawn from the end).
+
+        random: RandomStream
+            - Random stream used to shuffle the deck (e.g. the games stream).
+
+        capacity: int
+            - How many cards the game has in total (the cards of the deck by default).
+        """
+        capacity = len(cards) if capacity is None else max(capacity, len(cards))
+        self._draw_pile = list(cards) + [None] * (capacity - len(cards))
+        self._cursor = len(cards)
+        self._discard_pile = [None] * capacity
+        self._discard_count = 0
+        self._random = random
+        self._shared = False
+
+    def __len__(self) -> int:
+        """
+        Return how many cards are left to draw.
+        """
+        return self._cursor
+
+    def __iter__(self):
+        """
+        Return an iterator over the cards left to draw (the next card last).
+        """
+        return iter(self._draw_pile[:self._cursor])
+
+    def __repr__(self) -> str:
+        """
+        Return the cards left to draw (for printing).
+        """
+        return repr(self._draw_pile[:self._cursor])
+
+    def draw(self) -> str | None:
+        """
+        Draw a card (the discard pile is shuffled into the deck when it
+            runs out), or return None if there are no cards left.
+        """
+        if not self._cursor:
+            if not self._discard_count:  # Every card is in a hand.
+                return None
+            if self._shared:  # A snapshot refers to the arrays, so the new piles get new arrays.
+                capacity = len(self._discard_pile)
+                self._draw_pile = self._discard_pile[:self._discard_count] + [None] * (capacity - self._discard_count)
+                self._discard_pile = [None] * capacity
+                self._shared = False
+            else:
+                # The discard pile becomes the draw pile (and the empty draw pile becomes the discard pile).
+                self._draw_pile, self._discard_pile = self._discard_pile, self._draw_pile
+            self._cursor, self._discard_count = self._discard_count, 0
+            self.shuffle()
+        self._cursor -= 1
+        return self._draw_pile[self._cursor]
+
+    def discard(self, card: str) -> None:
+        """
+        Put a played card on the discard pile.
+
+        Parameters
+        ----------
+        card: str
+            - The card that was played.
+        """
+        if self._discard_count == len(self._discard_pile):  # More cards than the game started with.
+            self._discard_pile = self._discard_pile + [None]
+            self._draw_pile = self._draw_pile + [None]
+        self._discard_pile[self._discard_count] = card
+        self._discard_count += 1
+        return None
+
+    def shuffle(self) -> None:
+        """
+        Shuffle the cards left to draw in place (Fisher-Yates, like Game.fisher_shuffle).
+        """
+        if self._shared:  # A snapshot refers to the draw pile, so it is copied first (the discard pile stays shared).
+            self._draw_pile = self._draw_pile[:]
+        cards = self._draw_pile
+        for i in range(self._cursor - 1, 0, -1):
+            j = self._random.randint(0, i)
+            cards[i], cards[j] = cards[j], cards[i]
+        return None
+
+    def discard_pile(self) -> list[str]:
+        """
+        Return the cards on the discard pile (the last discarded card last).
+        """
+        return self._discard_pile[:self._discard_count]
+
+    def snapshot(self) -> tuple:
+        """
+        Return the state of the deck (its arrays and counts, O(1)).
+        """
+        self._shared = True
+        return self._draw_pile, self._cursor, self._discard_pile, self._discard_count
+
+    def restore(self, state: tuple) -> None:
+        """
+        Go back to a state of the deck (from snapshot).
+
+        Parameters
+        ----------
+        state: tuple
+            - The state of the deck.
+        """
+        self._draw_pile, self._cursor, self._discard_pile, self._discard_count = state
+        self._shared = True
+        return None
@@ -0,0 +1,157 @@
+"""
+Batches of shuffled decks (with the starting hands dealt) for simulations, made with NumPy array operations.
+"""
+
+
+# Importing libraries and modules.
+import numpy as np
+
+from GameSettings import GameSettings
+
+
+class DeckBatch:
+    """
+    Makes many decks at once, the same way as Game.card_stack (33 letters
+        and 7 cards from Game.star_card with the classic rules, with the
+        games letter weights, shuffled), as a (decks x 40) uint8 array of
+        card indexes (like GameSettings.card_index). Each row is a deck in draw order: the
+        first START_CARDS_AMOUNT cards are the hand of seat 0, the next
+        ones the hand of seat 1, and the rest are drawn in order. So a
+        batch of K games is set up with a few array operations (no Python
+        loop over the games or the cards).
+
+    Attributes
+    ----------
+    CARDS: np.ndarray
+        - The card of each card index (to turn rows back into cards).
+
+    game_settings: GameSettings
+        - The rules of the game that the decks are made for (its settings).
+
+    letter_cards: int
+        - How many cards of the deck are letters (from the games rules).
+
+    star_card_draws: int
+        - How many cards of the deck come from Game.star_card (from the games rules).
+
+    _letter_indexes: np.ndarray
+        - The card index of each letter that can be drawn.
+
+    _letter_probabilities: np.ndarray
+        - The probability of each letter.
+
+    _star_card_indexes: np.ndarray
+        - The card index of each card that Game.star_card gives.
+
+    _star_card_probabilities: np.ndarray
+        - The probability of each card that Game.star_card gives.
+
+    _generator: np.random.Generator
+        - Seeded random generator of the batches.
+
+    Methods
+    -------
+    generate(decks):
+        - Return a batch of shuffled decks (in draw order).
+
+    hands(batch, seat):
+        - Return the starting hand of a seat in every deck of a batch.
+
+    draw_piles(batch, seats):
+        - Return the cards left to draw after the hands are dealt.
+
+    deck_cards(row):
+        - Return a deck of a batch as cards for GameEngine (drawn from the end).
+    """
+
+    CARDS = np.array(list(GameSettings.CARDS))
+
+    def __init__(self, game, seed=None):
+        """
+        Construct all the necessary attributes for the DeckBatch object.
+
+        Parameters
+        ----------
+        game: Game
+            - The game whose card weights and rules are used (its letter sampler,
+                star card sampler and the amount of each kind of card).
+
+        seed: int | None
+            - Seed of the batches (a number from the games random stream by default).
+        """
+        self.game_settings = game.object_settings
+        self.letter_cards = self.game_settings.LETTER_CARDS
+        self.star_card_draws = self.game_settings.STAR_CARD_DRAWS
+        self._letter_indexes, self._letter_probabilities = DeckBatch._distribution(game.letter_sampler)
+        self._star_card_indexes, self._star_card_probabilities = DeckBatch._distribution(game.star_card_sampler)
+        if seed is None:
+            seed = game.random.getrandbits(64)
+        self._generator = np.random.default_rng(seed)
+
+    @staticmethod
+    def _distribution(sampler) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the card indexes and the probabilities of an AliasSampler's cards.
+        """
+        indexes = np.array([GameSettings.card_index(card) for card in sampler.items], dtype=np.uint8)
+        probabilities = np.array([sampler.probability(card) for card in sampler.items])
+        return indexes, probabilities / probabilities.sum()
+
+    def generate(self, decks: int) -> np.ndarray:
+        """
+        Return a batch of shuffled decks as a (decks x 40) uint8 array of card indexes (in draw order).
+
+        Parameters
+        ----------
+        decks: int
+            - How many decks to make.
+        """
+        batch = np.empty((decks, self.letter_cards + self.star_card_draws), dtype=np.uint8)
+        batch[:, :self.letter_cards] = self._generator.choice(
+            self._letter_indexes, size=(decks, self.letter_cards), p=self._letter_probabilities)
+        batch[:, self.letter_cards:] = self._generator.choice(
+            self._star_card_indexes, size=(decks, self.star_card_draws), p=self._star_card_probabilities)
+        self._generator.permuted(batch, axis=1, out=batch)  # Shuffle every deck (in place).
+        return batch
+
+    def hands(self, batch: np.ndarray, seat: int) -> np.ndarray:
+        """
+        Return the starting hand of a seat in every deck of a batch (a view, decks x START_CARDS_AMOUNT).
+
+        Parameters
+        ----------
+        batch: np.ndarray
+            - A batch from generate.
+
+        seat: int
+            - The seat (hands are dealt to seat 0 first).
+        """
+        hand_size = self.game_settings.START_CARDS_AMOUNT
+        return batch[:, seat * hand_size:(seat + 1) * hand_size]
+
+    def draw_piles(self, batch: np.ndarray, seats: int = 2) -> np.ndarray:
+        """
+        Return the cards left to draw in every deck of a batch after the hands are dealt (a view, in draw order).
+
+        Parameters
+        ----------
+        batch: np.ndarray
+            - A batch from generate.
+
+        seats: int
+            - How many seats were dealt a hand.
+        """
+        return batch[:, seats * self.game_settings.START_CARDS_AMOUNT:]
+
+    @staticmethod
+    def deck_cards(row: np.ndarray) -> list[str]:
+        """
+        Return a deck of a batch as a list of cards drawn from the end
+            (like Game.card_stack, e.g. for GameEngine's deck).
+
+        Parameters
+        ----------
+        row: np.ndarray
+            - One deck of a batch.
+        """
+        return DeckBatch.CARDS[row[::-1]].tolist()
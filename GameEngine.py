@@ -0,0 +1,486 @@
+"""
+Headless game engine: the rules of the game without any user interface
+    (the game window and the command line game are front-ends of it).
+"""
+
+
+# Importing libraries and modules.
+from typing import NamedTuple
+
+from Deck import Deck
+from GameFunctions import Game
+from GameSettings import GameSettings
+from GameState import GameState
+from Hand import Hand
+from TurnScheduler import TurnScheduler
+from WordGraph import WordGraph
+from ZobristHash import ZobristHash
+
+
+class Move(NamedTuple):
+    """
+    A move: the new word and the card that was played to make it
+        (a star card move has the star card in the changed position, e.g. "c*t").
+    """
+    word: str
+    card: str
+
+
+class Step(NamedTuple):
+    """
+    What happened in a step of the game.
+
+    valid: bool
+        - Whether the move was valid (False for an invalid move or a timeout).
+
+    penalty_card: str | None
+        - The penalty card that the player drew (None if they didn't draw one).
+    """
+    valid: bool
+    penalty_card: str | None
+
+
+class GameEngine:
+    """
+    The state and rules of a game: the deck and the discard pile, each
+        player's hand, the current word and the player to move. The
+        front-ends only turn their input into moves (apply) and timeouts
+        (timeout), and show the state, so games can be played headless
+        (e.g. thousands of simulated games a second, or profiling the rules).
+
+    Rules:
+        - A move changes one letter of the current word into another word,
+            with a card of the new letter (or a star card, which makes a
+            new start word).
+        - An invalid move or a timeout gives the player a penalty card.
+        - Played cards go to the discard pile, which is shuffled into the
+            deck when the deck runs out.
+        - Every DISCARD_EVERY valid moves a player may discard a card.
+        - A player who plays their last card wins, and a player who holds
+            MAX_CARDS cards is out of the game (their cards go to the
+            discard pile); the last player left wins.
+        - Games have 2 to MAX_SEATS seats (humans and bots in any mix),
+            playing in seat order, with a card stack for every two seats.
+
+    Attributes
+    ----------
+    STAR_CARD: str
+        - The star card (can replace any letter).
+
+    DISCARD_EVERY: int
+        - How many valid moves a player makes to earn a discard.
+
+    MAX_SEATS: int
+        - The most seats a game can have.
+
+    game: Game
+        - Words and random choices of the game (deck, start words and coin flip).
+
+    game_settings: GameSettings
+        - The rules of the game (the games settings, from its rule profile).
+
+    deck: Deck
+        - The cards left to draw and the discard pile (the cards that have been played).
+
+    hands: list
+        - The hand of each seat (Hand, or any object with the same methods, like Bot).
+
+    word: str
+        - The current word.
+
+    side: int
+        - The seat of the player to move.
+
+    valid_moves: list[int]
+        - How many valid moves each seat has made.
+
+    discards_earned: list[int]
+        - How many discards each seat has earned and not used yet.
+
+    winner: int | None
+        - The seat that won (None while the game is going).
+
+    turns: TurnScheduler
+        - The order of the seats still playing.
+
+    log: MoveLog | None
+        - The log that every step of the game is added to (None if the game isn't logged).
+
+    position_hash: int
+        - Zobrist hash of the word, the hands and the seat to move (ZobristHash.hash_game).
+            It is updated with every change of the game instead of being made
+            again, so caches can key on it.
+
+    _words: set[str]
+        - All the words that can be played.
+
+    _graph: WordGraph
+        - Graph of all the words that can be played.
+
+    _hand_states: list[tuple[str, ...] | None]
+        - The cards of each seat as a tuple (None after the hand changed),
+            so a snapshot only remakes the tuples of the hands that changed.
+
+    Methods
+    -------
+    legal_moves():
+        - Return every valid move of the player to move.
+
+    apply(move):
+        - Play a move for the player to move (an invalid move gets a penalty).
+
+    timeout():
+        - The player to move runs out of time (they get a penalty).
+
+    discard(seat, card):
+        - Discard a card that a seat has earned.
+
+    shuffle():
+        - Shuffle the cards left to draw.
+
+    draw():
+        - Draw a card from the deck.
+
+    snapshot():
+        - Return the state of the game (immutable, O(1) after a move).
+
+    restore(state):
+        - Go back to a state of the game.
+    """
+
+    STAR_CARD = "*"
+    DISCARD_EVERY = 3
+    MAX_SEATS = 8
+
+    _shared_words = {}  # The words of the last game of each word length, their set and their graph.
+
+    def __init__(self, seed=None, hands: list = None, game: Game = None, first_side: int = None,
+                 deck: list[str] = None, log=None, state: GameState = None):
+        """
+        Construct all the necessary attributes for the GameEngine object,
+            deal the hands and pick the start word (or carry on from a state).
+
+        Parameters
+        ----------
+        seed: RandomStream | int | str | None
+            - Seed of the game (ignored when a game is given).
+
+        hands: list
+            - The hand of each seat (two new hands by default, at most
+                MAX_SEATS). They are dealt START_CARDS_AMOUNT cards each.
+
+        game: Game
+            - The Game to use (e.g. to share its words between many engines).
+                Its settings are the rules of the game.
+
+        first_side: int
+            - The seat that moves first (a coin flip by default, or a random seat for more than two seats).
+
+        deck: list[str]
+            - The cards of the deck, drawn from the end (a new Game.card_stack for
+                every two seats by default), e.g. a deck of a DeckBatch made for many games at once.
+
+        log: MoveLog
+            - The log to add every step of the game to (the game isn't logged by default).
+
+        state: GameState
+            - A state to carry on from (e.g. of a saved match) instead of dealing
+                the hands (no cards are drawn and the random stream isn't used).
+        """
+        self.game = Game(seed) if game is None else game
+        self.game_settings = self.game.object_settings
+        # Engines that share words share their word set and graph (built once for each variant of the game).
+        word_length = self.game_settings.WORD_LENGTH
+        if GameEngine._shared_words.get(word_length, (None,))[0] is not self.game.words:
+            GameEngine._shared_words[word_length] = (self.game.words, set(self.game.words), WordGraph(self.game.words))
+        _, self._words, self._graph = GameEngine._shared_words[word_length]
+        self.hands = [Hand(), Hand()] if hands is None else hands
+        if not 2 <= len(self.hands) <= self.MAX_SEATS:
+            raise ValueError(f"A game has 2 to {self.MAX_SEATS} seats (not {len(self.hands)}).")
+        self.log = log
+        self.turns = TurnScheduler(len(self.hands))
+        self.valid_moves = [0] * len(self.hands)
+        self.discards_earned = [0] * len(self.hands)
+        self.winner = None
+        self._hand_states = [None] * len(self.hands)
+        if state is not None:  # Carry on from the state (its deck, hands and word).
+            self.deck = Deck([], self.game.random)
+            self.restore(state)
+            return
+
+        random_state = self.game.random.getstate() if log is not None else None
+        if deck is None:
+            cards = []
+            for _ in range((len(self.hands) + 1) // 2):  # A card stack for every two seats.
+                cards += self.game.card_stack()
+        else:
+            cards = deck
+        if log is not None:
+            log.begin(self, first_side, cards, deck is None, random_state)
+        self.deck = Deck(cards, self.game.random)
+        for hand in self.hands:
+            for _ in range(self.game_settings.START_CARDS_AMOUNT):
+                hand.add_card(self.draw())
+        self.word = self.game.word_generator()
+        if first_side is None:
+            if len(self.hands) == 2:
+                first_side = 0 if self.game.coin_flip() == "Head" else 1
+            else:
+                first_side = self.game.random.randrange(len(self.hands))
+        self.side = first_side
+        self.position_hash = ZobristHash.hash_game(self.word, [hand.cards for hand in self.hands], self.side)
+
+    def draw(self) -> str | None:
+        """
+        Draw a card from the deck (the discard pile is shuffled into the
+            deck when it runs out), or None if there are no cards left.
+        """
+        return self.deck.draw()
+
+    def _hash_card(self, seat: int, card: str, added: bool) -> None:
+        """
+        Update the position hash before a card is added to or removed from a hand.
+
+        Parameters
+        ----------
+        seat: int
+            - The seat of the hand.
+
+        card: str
+            - The card.
+
+        added: bool
+            - Whether the card is added (or else removed).
+        """
+        count_before = self.hands[seat].count(card)
+        update = ZobristHash.add_card if added else ZobristHash.remove_card
+        self.position_hash = update(self.position_hash, ZobristHash.seat_owner(seat),
+                                    GameSettings.card_index(card), count_before)
+        return None
+
+    def legal_moves(self) -> list[Move]:
+        """
+        Return every valid move of the player to move.
+        """
+        hand = self.hands[self.side]
+        has_star_card = self.STAR_CARD in hand
+        moves, star_patterns = [], set()
+        has_letter = {}  # Whether the hand has each letter (checked once per letter).
+        for position, letter, new_word in self._graph.neighbors(self.word):
+            if letter not in has_letter:
+                has_letter[letter] = letter in hand
+            if has_letter[letter]:
+                moves.append(Move(new_word, letter))
+            if has_star_card:
+                star_patterns.add(self.word[:position] + self.STAR_CARD + self.word[position + 1:])
+        moves.extend(Move(pattern, self.STAR_CARD) for pattern in sorted(star_patterns))
+        return moves
+
+    def _is_valid(self, move: Move) -> bool:
+        """
+        Return whether a move is valid for the player to move.
+        """
+        word, card = move.word.lower(), move.card.lower()
+        if len(word) != len(self.word) or card not in self.hands[self.side]:
+            return False
+        changed = [position for position in range(len(word)) if word[position] != self.word[position]]
+        if len(changed) != 1:
+            return False
+        position = changed[0]
+        if card == self.STAR_CARD:  # Some letter in the star card's position must make a word.
+            return (word[position] == self.STAR_CARD
+                    and any(new_word_position == position
+                            for new_word_position, _, _ in self._graph.neighbors(self.word)))
+        return word[position] == card and word in self._words
+
+    def apply(self, move: Move, seconds: float = None) -> Step:
+        """
+        Play a move for the player to move, and pass the turn
+            (an invalid move gets a penalty card, like a timeout).
+
+        Parameters
+        ----------
+        move: Move
+            - The new word and the card that was played.
+
+        seconds: float
+            - How long the player took (for the log).
+        """
+        if self.winner is not None:
+            raise ValueError("The game is over.")
+        if not self._is_valid(move):
+            return self._penalty(True, seconds)
+
+        hand = self.hands[self.side]
+        card = move.card.lower()
+        self._hash_card(self.side, card, False)
+        slot = hand.remove_cards(card)
+        self._hand_states[self.side] = None
+        self.deck.discard(card)
+        new_word = move.word.lower()
+        position = next(i for i in range(len(new_word)) if new_word[i] != self.word[i])
+        if self.log is not None:
+            self.log.add_event(self.log.MOVE, self.side, card, position, slot, seconds)
+        if card == self.STAR_CARD:  # A star card makes a new start word.
+            new_word = self.game.word_generator()
+            self.position_hash ^= ZobristHash.hash_word(self.word) ^ ZobristHash.hash_word(new_word)
+        else:
+            self.position_hash = ZobristHash.change_letter(self.position_hash, position,
+                                                           GameSettings.card_index(self.word[position]),
+                                                           GameSettings.card_index(card))
+        self.word = new_word
+        self.valid_moves[self.side] += 1
+        if self.valid_moves[self.side] % self.DISCARD_EVERY == 0:
+            self.discards_earned[self.side] += 1
+        if len(hand) == 0:  # Playing the last card wins the game.
+            self.winner = self.side
+        self._next_side()
+        return Step(True, None)
+
+    def timeout(self, seconds: float = None) -> Step:
+        """
+        The player to move runs out of time (or doesn't change the word),
+            so they get a penalty card and the turn passes.
+
+        Parameters
+        ----------
+        seconds: float
+            - How long the player took (for the log).
+        """
+        if self.winner is not None:
+            raise ValueError("The game is over.")
+        return self._penalty(False, seconds)
+
+    def _penalty(self, invalid: bool, seconds: float = None) -> Step:
+        """
+        Give the player to move a penalty card and pass the turn.
+
+        Parameters
+        ----------
+        invalid: bool
+            - Whether the penalty is for an invalid move (or else for a timeout).
+
+        seconds: float
+            - How long the player took (for the log).
+        """
+        hand = self.hands[self.side]
+        penalty_card = self.draw()
+        if penalty_card is not None:
+            self._hash_card(self.side, penalty_card, True)
+            hand.add_card(penalty_card)
+            self._hand_states[self.side] = None
+        if self.log is not None:
+            self.log.add_event(self.log.INVALID if invalid else self.log.TIMEOUT, self.side, penalty_card,
+                               seconds=seconds)
+        if len(hand) >= self.game_settings.MAX_CARDS:  # Holding the maximum amount of cards loses.
+            self._knock_out(self.side)
+        self._next_side()
+        return Step(False, penalty_card)
+
+    def _knock_out(self, seat: int) -> None:
+        """
+        Take a seat out of the game. The last seat left wins, and while
+            the game goes on the seat's cards go to the discard pile.
+
+        Parameters
+        ----------
+        seat: int
+            - The seat.
+        """
+        self.turns.remove(seat)
+        self.winner = self.turns.last_seat()
+        if self.winner is None:
+            hand = self.hands[seat]
+            for card in hand.cards:
+                self._hash_card(seat, card, False)
+                hand.remove_cards(card)
+                self.deck.discard(card)
+            self._hand_states[seat] = None
+        return None
+
+    def _next_side(self) -> None:
+        """
+        Pass the turn to the next seat still playing.
+        """
+        next_side = self.turns.next_seat(self.side)
+        self.position_hash = ZobristHash.change_seat(self.position_hash, self.side, next_side)
+        self.side = next_side
+        return None
+
+    def discard(self, seat: int, card: str) -> bool:
+        """
+        Discard a card that a seat has earned (it goes to the discard pile),
+            and return whether it was discarded.
+
+        Parameters
+        ----------
+        seat: int
+            - The seat that discards.
+
+        card: str
+            - The card to discard.
+        """
+        hand = self.hands[seat]
+        card = card.lower()
+        if not self.discards_earned[seat] or not self.turns.active[seat] or card not in hand:
+            return False
+        self._hash_card(seat, card, False)
+        slot = hand.remove_cards(card)
+        self._hand_states[seat] = None
+        self.deck.discard(card)
+        self.discards_earned[seat] -= 1
+        if self.log is not None:
+            self.log.add_event(self.log.DISCARD, seat, card, slot=slot)
+        if len(hand) == 0 and self.winner is None:  # Discarding the last card also wins.
+            self.winner = seat
+        return True
+
+    def shuffle(self) -> None:
+        """
+        Shuffle the cards left to draw (e.g. between turns).
+        """
+        self.deck.shuffle()
+        if self.log is not None:
+            self.log.add_event(self.log.SHUFFLE, self.side)
+        return None
+
+    def snapshot(self) -> GameState:
+        """
+        Return the state of the game as an immutable GameState. The hands
+            that didn't change since the last snapshot keep their tuples
+            and the deck keeps its arrays, so after a move only the hand
+            that played is made again.
+
+        The random stream is not part of the state, so the cards drawn
+            after going back to a state (once the deck is reshuffled) and
+            the start words of star cards can differ.
+        """
+        hand_states = self._hand_states
+        for seat, hand_state in enumerate(hand_states):
+            if hand_state is None:
+                hand_states[seat] = tuple(self.hands[seat].cards)
+        return GameState(self.word, self.side, self.winner, tuple(hand_states), tuple(self.valid_moves),
+                         tuple(self.discards_earned), self.deck.snapshot(), self.turns.active, self.position_hash)
+
+    def restore(self, state: GameState) -> None:
+        """
+        Go back to a state of the game (from snapshot). Only the hands
+            that are different in the state are dealt again.
+
+        Parameters
+        ----------
+        state: GameState
+            - The state of the game.
+        """
+        for seat, cards in enumerate(state.hands):
+            if self._hand_states[seat] is not cards:
+                self.hands[seat].cards = list(cards)
+                self._hand_states[seat] = cards
+        self.word, self.side, self.winner = state.word, state.side, state.winner
+        self.position_hash = state.position_hash
+        self.valid_moves = list(state.valid_moves)
+        self.discards_earned = list(state.discards_earned)
+        self.deck.restore(state.deck)
+        if state.active is not self.turns.active:
+            self.turns.restore(state.active)
+        return None
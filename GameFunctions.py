@@ -1,10 +1,12 @@
 # Functions class game created by Raghad Aljubran (5635869).
 
 #importing built-in libraries
-import random
 import string
 #importing custom module
+from AliasSampler import AliasSampler
 from GameSettings import GameSettings
+from RandomStream import RandomStream
+from WordGraph import WordGraph
 
 # Class Queue to be used in the class Game.
 class Queue:
@@ -57,27 +59,63 @@ class Game:
 
         8,9-( partition),(quicksort): algorithm to sort player cards.
 
-        10-(word_generator): generates a word for the game and uses (valid_transformations)
-            to check if the word can be changed 4 or more.
+        10-(word_generator): generates a word for the game from the start words pool
+            (words that can be changed 4 or more).
 
         11-(check_exists): checks if the word that the player changed is in the words list
             and it handel both word with a star and word without a star.
 
         12-(coin_flip) : decide who play first human or bot.
 
+        13-(start_words): returns the pool of words that a game can start with
+            (built once from the word graph).
+
+        14-(use_letter_weights): changes how likely each letter is in the stack
+            (the letters are drawn with an alias sampler, O(1) per card).
+
     """
 
+    # How likely star_card is to give each card (a star card 8 in 11 times, or a useful letter).
+    STAR_CARD_WEIGHTS = {"*": 8, "e": 1, "a": 1, "t": 1}
+
+    # The words of each word length (filtered once, and shared by every game of that length).
+    _lexicons = {}
+    # The start words of the last words of each word length (the words and their pool).
+    _start_word_pools = {}
+
     # Initializes the Game class.
-    def __init__(self):
+    def __init__(self, seed=None, words=None, settings=None):
         """
         For storing the three letter words by using filter.
+        The seed (a number, or a RandomStream) makes the game's random
+            choices repeatable; without one a random seed is used.
+        The words can be given (e.g. from a saved game) so that
+            the words file isn't loaded again.
+        The settings are the rules of the game (the rule profile that
+            is picked when the game is made by default). The words of each
+            word length are only loaded once, so games of a variant that
+            has already been played are made without reading the file.
         """
-        # Creating an object for game settings class
-        self.object_settings=GameSettings()
-        # Lode all the words in english from a file by calling load letter words function.
-        self.words = self.load_letter_words("data/words_alpha.txt")
-        # Filter out only the three letters words.
-        self.words = list((filter(lambda word:len(word) ==self.object_settings.WORD_LENGTH,self.words)))
+        # Random stream used for all the random choices of the game (shuffles, cards, words and coin flips).
+        self.random = RandomStream.of(seed)
+        # Creating an object for game settings class (it keeps the rules of the game if another profile is picked).
+        self.object_settings=GameSettings(GameSettings.profile) if settings is None else settings
+        if words is not None:
+            self.words = list(words)
+        else:
+            word_length = self.object_settings.WORD_LENGTH
+            if word_length not in Game._lexicons:
+                # Lode all the words in english from a file by calling load letter words function.
+                all_words = self.load_letter_words("data/words_alpha.txt")
+                # Filter out only the words of the word length (e.g. three letters words).
+                Game._lexicons[word_length] = list((filter(lambda word:len(word) ==word_length,all_words)))
+            self.words = Game._lexicons[word_length]
+        # Pool of words that a game can start with (built the first time it is needed).
+        self.start_word_pool = None
+        # Samplers for the cards of the stack: the letters (every letter is as likely by default)
+        # and the cards that star_card gives.
+        self.letter_sampler = AliasSampler(dict.fromkeys(string.ascii_lowercase, 1))
+        self.star_card_sampler = AliasSampler(self.STAR_CARD_WEIGHTS)
 
 
     # Loading the words from a file with error handel.
@@ -141,7 +179,7 @@ class Game:
         Shuffles a list using fisher algorithm.
         """
         for i in range(len(cards) - 1,0,-1):
-            j = random.randint(0,i)
+            j = self.random.randint(0,i)
             cards[i],cards[j] = cards[j],cards[i]
         return cards
 
@@ -150,34 +188,31 @@ class Game:
         """
         Returns a star card or a useful letter random for the stack.
         """
-        value = random.randint(0,10)
-        if value <=7:
-            return "*"
-        else:
-            l=random.randint(1,3)
-            if l == 1:
-                return "e"
-            elif l == 2:
-                return "a"
-            else:
-                return "t"
+        return self.star_card_sampler.sample(self.random)
 
-    # Function will return a list of 40 cards shuffled.
+    # Function will return a list of 40 cards shuffled (with the classic rules).
     def card_stack(self):
         """
         Generate a stack of 40 cards uses two functions
-            (fisher_shuffle and star_card).
+            (fisher_shuffle and star_card). The amount of cards
+            comes from the rules (LETTER_CARDS and STAR_CARD_DRAWS).
         """
-        letters = list(string.ascii_lowercase)
-        list_range = range(0,len(letters))
-        cards = []
-        for i in range(0,33):
-            random_letter = random.choice(letters)
-            cards.append(random_letter)
-        for i in range(0,7):
-            cards.append(self.star_card())  # it adds a * card you might  get * or useful letter
+        letter_cards = self.object_settings.LETTER_CARDS
+        # 33 letters, then 7 cards from star_card (you might get * or a useful letter), each filled in one call.
+        cards = self.letter_sampler.sample_many(self.random, letter_cards)
+        self.star_card_sampler.sample_many(self.random, self.object_settings.STAR_CARD_DRAWS, cards, letter_cards)
         return self.fisher_shuffle(cards)
 
+    # Change how likely each letter is in the stack (e.g. by how common it is, or its letter utility).
+    def use_letter_weights(self,letter_weights):
+        """
+        Changes how likely each letter is to be drawn for the stack.
+            The weights don't have to add up to 1 (the default is every
+            letter the same). Tables built for the default stack (like the
+            bot's threat table) assume every letter is as likely.
+        """
+        self.letter_sampler = AliasSampler(letter_weights)
+
     # Sorting player cards in alphabet order using quick sort algorithm(need to be called in the main loop every time a new letter is added).
     def partition(self,list1,low,high):
         """
@@ -209,16 +244,47 @@ class Game:
     # Generate a three letter random word.
     def word_generator(self):
         """
-        Generates a word for the game and uses (valid_transformations)
-            to check if the word can be changed 4 or more.
+        Generates a word for the game from the start words pool
+            (words that can be changed 4 or more).
         """
-        vowels ='aeiou'  # List of vowels.
-        while True:
-            random_word = random.choice(self.words)
-            if random_word[1] in vowels:
-                word_check=self.valid_transformations(random_word)
-                if len(word_check) >=4:
-                    return random_word
+        return self.random.choice(self.start_words())
+
+    # Build the pool of start words once, using the connected groups of the word graph.
+    def start_words(self):
+        """
+        Returns the pool of words that a game can start with: words with a vowel
+            in the middle whose group of connected words (all the words that
+            valid_transformations would find) has 4 or more other words.
+        """
+        if self.start_word_pool is None:
+            # Games with the same words share their pool (it is built once for each variant).
+            words, pool = Game._start_word_pools.get(self.object_settings.WORD_LENGTH, (None, None))
+            if words is self.words:
+                self.start_word_pool = pool
+                return pool
+            vowels ='aeiou'  # List of vowels.
+            graph = WordGraph(self.words)
+            group_sizes = {}  # Size of the connected group of each word.
+            for word in graph.words:
+                if word in group_sizes:
+                    continue
+                # BFS through the group of the word (using class queue).
+                queue = Queue()
+                queue.append(word)
+                group = [word]
+                visited = {word}
+                while queue:
+                    for _, _, neighbor in graph.neighbors(queue.popleft()):
+                        if neighbor not in visited:
+                            visited.add(neighbor)
+                            group.append(neighbor)
+                            queue.append(neighbor)
+                for group_word in group:
+                    group_sizes[group_word] = len(group)
+            self.start_word_pool = [word for word in graph.words
+                                    if len(word) > 1 and word[1] in vowels and group_sizes[word] - 1 >= 4]
+            Game._start_word_pools[self.object_settings.WORD_LENGTH] = (self.words, self.start_word_pool)
+        return self.start_word_pool
 
     # Check if the word real or not after the player change it.
     def check_exists(self,player_word,original_word=None):
@@ -246,7 +312,7 @@ class Game:
         """
         Decide who play first human or bot.
         """
-        value = random.randint(0,1)
+        value = self.random.randint(0,1)
         if value == 0:
             return "Head"
         else:
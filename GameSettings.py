@@ -12,8 +12,43 @@ class GameSettings:
     """
     A class that stores the game settings as variables.
 
+    The rules of the game (TURN_TIME_LIMIT, MAX_CARDS, WORD_LENGTH,
+        START_CARDS_AMOUNT, LETTER_CARDS and STAR_CARD_DRAWS) come from a
+        rule profile (a variant of the game, from RULE_PROFILES and the
+        rule profiles file). use_profile picks the profile that every
+        GameSettings object follows, so the whole game switches variant at
+        once, and GameSettings(profile) keeps the rules of one profile
+        (e.g. for a game that is being played while another one is picked).
+        The words file is read once, and the words of each word length are
+        only filtered the first time they are needed, so switching between
+        variants costs nothing after each one has been used.
+
     Attributes
     ----------
+    ALPHABET: str
+        - The letter cards (the star card comes after them).
+
+    STAR_CARD: str
+        - The star card (can replace any letter).
+
+    CARDS: str
+        - Every kind of card, in the order of their card indexes.
+
+    RULE_PROFILES: dict[str, dict[str, int]]
+        - The rules of each variant of the game.
+
+    RULE_NAMES: tuple[str, ...]
+        - The names of the rules that a profile sets.
+
+    DEFAULT_PROFILE: str
+        - The profile that is used until another one is picked.
+
+    RULE_PROFILES_FILE_NAME: str
+        - The name of the file that more profiles can be added in (optional).
+
+    profile: str
+        - The name of the rule profile of the settings.
+
     TURN_TIME_LIMIT: int
         - The maximum amount of time a player can take
             to play their turn.
@@ -27,6 +62,13 @@ class GameSettings:
     START_CARDS_AMOUNT: int
         - How many cards each player starts with.
 
+    LETTER_CARDS: int
+        - How many letter cards a card stack has.
+
+    STAR_CARD_DRAWS: int
+        - How many cards of a card stack come from Game.star_card
+            (a star card or a useful letter).
+
     BOT_WORDS_FILE_NAME: str
         - The name of the file that contains the data
             for word frequencies and the bot's words
@@ -35,12 +77,43 @@ class GameSettings:
         - Words and their relative frequencies in %
             (i.e. how common they are in the English language).
 
+    MOVE_LOG_FILE_NAME: str
+        - The name of the file that the move log of the last game is saved in.
+
+    SAVE_FILE_NAME: str
+        - The name of the file that a match is saved in when the window is closed.
+
     ALL_BOT_WORDS: set[str]
         - All the words that the bot can play.All are of the length
             specified by self.word_length (e.g. 3 letters long)
 
+    rules: tuple[int, ...]
+        - The values of the rules (in the order of RULE_NAMES), to
+            key anything that is built for one variant of the game.
+
+    _profiles: dict[str, dict[str, int]] | None
+        - The profiles with the ones from the rule profiles file (read once).
+
+    _word_frequencies: dict[str, int] | None
+        - The word frequencies (read once for all GameSettings objects).
+
+    _bot_words: dict[int, set[str]]
+        - The bot's words of each word length (filtered once).
+
     Methods
     -------
+    card_index(card):
+        - Return the index of a card (0-25 for letters, 26 for the star card).
+
+    use_profile(profile):
+        - Pick the rule profile that every GameSettings object follows.
+
+    profiles():
+        - Return the rules of every profile (loaded once).
+
+    find_profile(**rules):
+        - Return the name of the profile with some rules (or None).
+
     load_word_frequencies():
         - Return a dictionary of all words and their frequencies
             from the bot's words file (self.words_file_name).
@@ -49,31 +122,171 @@ class GameSettings:
         - Return a set of all the words that the bot is allowed to play.
     """
 
-    def __init__(self):
+    # The cards of the game (a card index is the position of a card in CARDS).
+    ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+    STAR_CARD = "*"
+    CARDS = ALPHABET + STAR_CARD
+
+    # The rules of each variant of the game.
+    RULE_PROFILES = {
+        "classic": {"TURN_TIME_LIMIT": 15, "MAX_CARDS": 15, "WORD_LENGTH": 3, "START_CARDS_AMOUNT": 7,
+                    "LETTER_CARDS": 33, "STAR_CARD_DRAWS": 7},
+        "blitz": {"TURN_TIME_LIMIT": 7, "MAX_CARDS": 15, "WORD_LENGTH": 3, "START_CARDS_AMOUNT": 7,
+                  "LETTER_CARDS": 33, "STAR_CARD_DRAWS": 7},
+        "short_fuse": {"TURN_TIME_LIMIT": 15, "MAX_CARDS": 10, "WORD_LENGTH": 3, "START_CARDS_AMOUNT": 5,
+                       "LETTER_CARDS": 33, "STAR_CARD_DRAWS": 7},
+        "four_letters": {"TURN_TIME_LIMIT": 20, "MAX_CARDS": 15, "WORD_LENGTH": 4, "START_CARDS_AMOUNT": 7,
+                         "LETTER_CARDS": 36, "STAR_CARD_DRAWS": 9},
+    }
+    RULE_NAMES = ("TURN_TIME_LIMIT", "MAX_CARDS", "WORD_LENGTH", "START_CARDS_AMOUNT",
+                  "LETTER_CARDS", "STAR_CARD_DRAWS")
+    DEFAULT_PROFILE = "classic"
+    # The name of the file that more rule profiles can be added in (a JSON dictionary like RULE_PROFILES).
+    RULE_PROFILES_FILE_NAME = "data/rule_profiles.json"
+
+    # The rules of the profile that is being used (changed by use_profile).
+    profile = DEFAULT_PROFILE
+    TURN_TIME_LIMIT = 15  # The maximum amount of time a player can take to play their turn.
+    MAX_CARDS = 15  # The amount of cards that if you exceed, you lose the game.
+    WORD_LENGTH = 3  # The length of the word that the players have to change.
+    START_CARDS_AMOUNT = 7  # How many cards each player starts with.
+    LETTER_CARDS = 33  # How many letter cards a card stack has.
+    STAR_CARD_DRAWS = 7  # How many cards of a card stack come from Game.star_card.
+
+    _profiles = None  # The profiles with the ones from the rule profiles file (loaded once).
+    _word_frequencies = None  # The word frequencies (read once for all the settings objects).
+    _bot_words = {}  # The bot's words of each word length (filtered the first time they are needed).
+
+    def __init__(self, profile: str = None):
         """
         Construct all the necessary attributes for
             the GameSettings object.
+
+        Parameters
+        ----------
+        profile: str
+            - The rule profile to keep (by default the settings follow
+                the profile picked with use_profile, even after it changes).
         """
-        self.TURN_TIME_LIMIT = 15  # The maximum amount of time a player can take to play their turn.
-        self.MAX_CARDS = 15  # The amount of cards that if you exceed, you lose the game.
-        self.WORD_LENGTH = 3  # The length of the word that the players have to change.
-        self.START_CARDS_AMOUNT = 7  # How many cards each player starts with.
+        if profile is not None:  # The rules of this object stay the same when another profile is picked.
+            self.profile = profile
+            self.__dict__.update(GameSettings._profile_rules(profile))
 
         # The name of the file that contains the data for word frequencies and the bot's words.
         self.BOT_WORDS_FILE_NAME = "data/word_frequencies_json.txt"
+        # The name of the file that the move log of the last game is saved in (to replay it).
+        self.MOVE_LOG_FILE_NAME = "data/last_game.wlog"
+        # The name of the file that a match is saved in when the window is closed (to resume it).
+        self.SAVE_FILE_NAME = "data/saved_game.wsav"
         # Dictionary for words & their relative frequencies in % (i.e. how common they are in the English language).
         self.WORD_FREQUENCIES = self.load_word_frequencies()
-        # The set of all words the bot can use (all are of the length specified by word_length e.g. 3 letters long).
-        self.ALL_BOT_WORDS = self.get_all_bot_words()
+
+    @staticmethod
+    def card_index(card: str) -> int:
+        """
+        Return the index of a card (0-25 for letters, 26 for the star card).
+
+        Parameters
+        ----------
+        card: str
+            - The card (a lowercase letter or the star card).
+        """
+        return 26 if card == GameSettings.STAR_CARD else ord(card) - 97
+
+    @property
+    def ALL_BOT_WORDS(self) -> set[str]:
+        """
+        Return the set of all words the bot can use (all are of the length
+            specified by WORD_LENGTH e.g. 3 letters long).
+        """
+        return self.get_all_bot_words()
+
+    @property
+    def rules(self) -> tuple[int, ...]:
+        """
+        Return the values of the rules (in the order of RULE_NAMES).
+        """
+        return tuple(getattr(self, name) for name in GameSettings.RULE_NAMES)
+
+    @staticmethod
+    def use_profile(profile: str) -> None:
+        """
+        Pick the rule profile that every GameSettings object follows
+            (except the ones that were made for a profile).
+
+        Parameters
+        ----------
+        profile: str
+            - The name of the profile.
+        """
+        rules = GameSettings._profile_rules(profile)
+        GameSettings.profile = profile
+        for name, value in rules.items():
+            setattr(GameSettings, name, value)
+        return None
+
+    @staticmethod
+    def profiles() -> dict[str, dict[str, int]]:
+        """
+        Return the rules of every profile: RULE_PROFILES and the ones from
+            the rule profiles file (read once, its rules default to the
+            default profile's).
+        """
+        if GameSettings._profiles is None:  # Only read the file once.
+            profiles = dict(GameSettings.RULE_PROFILES)
+            try:
+                with open(GameSettings.RULE_PROFILES_FILE_NAME, "r") as file:
+                    for name, rules in json.load(file).items():
+                        profiles[name] = {**GameSettings.RULE_PROFILES[GameSettings.DEFAULT_PROFILE], **rules}
+            except FileNotFoundError:  # No profiles were added, so only the built-in profiles are used.
+                pass
+            GameSettings._profiles = profiles
+        return GameSettings._profiles
+
+    @staticmethod
+    def _profile_rules(profile: str) -> dict[str, int]:
+        """
+        Return the rules of a profile (raises ValueError if there is no profile with that name).
+
+        Parameters
+        ----------
+        profile: str
+            - The name of the profile.
+        """
+        profiles = GameSettings.profiles()
+        if profile not in profiles:
+            raise ValueError(f"There is no rule profile called {profile!r} "
+                             f"(the profiles are {', '.join(profiles)}).")
+        return profiles[profile]
+
+    @staticmethod
+    def find_profile(**rules: int) -> str | None:
+        """
+        Return the name of the first profile with some rules (e.g. the
+            rules a game was saved with), or None if no profile has them.
+
+        Parameters
+        ----------
+        rules: int
+            - The rules to match (by name, e.g. WORD_LENGTH=4).
+        """
+        for name, profile_rules in GameSettings.profiles().items():
+            if all(profile_rules[rule] == value for rule, value in rules.items()):
+                return name
+        return None
 
     def load_word_frequencies(self) -> dict[str, int]:
         """
         Return a dictionary of all words and their frequencies
-            from the bot's words file (self.BOT_WORDS_FILE_NAME).
+            from the bot's words file (self.BOT_WORDS_FILE_NAME),
+            read the first time it is needed.
         """
+        if GameSettings._word_frequencies is not None:  # Only read the file once.
+            return GameSettings._word_frequencies
         try:  # Attempt the following code.
             with open(self.BOT_WORDS_FILE_NAME, "r") as file:  # Open the words file in read mode & closes it when done.
                 word_frequencies = json.loads(file.readline())  # Load the file from json format to a python dictionary.
+                GameSettings._word_frequencies = word_frequencies
                 return word_frequencies
         except FileNotFoundError:  # Checks for the error that happens when the program can't find the file.
             # Stop program & show error.
@@ -82,9 +295,13 @@ class GameSettings:
 
     def get_all_bot_words(self) -> set[str]:
         """
-        Return a set of all the words that the bot is allowed to play.
+        Return a set of all the words that the bot is allowed to play
+            (filtered once for each word length).
         """
-        # From the words in the word frequency dictionary, filter out all words that are not of the specified length.
-        # Using a set for faster lookup.
-        words = set((filter(lambda word: len(word) == self.WORD_LENGTH, self.WORD_FREQUENCIES.keys())))
-        return words
\ No newline at end of file
+        words = GameSettings._bot_words.get(self.WORD_LENGTH)
+        if words is None:
+            # From the words in the word frequency dictionary, filter out all words that are not of the specified length.
+            # Using a set for faster lookup.
+            words = set((filter(lambda word: len(word) == self.WORD_LENGTH, self.WORD_FREQUENCIES.keys())))
+            GameSettings._bot_words[self.WORD_LENGTH] = words
+        return words
@@ -0,0 +1,157 @@
+"""
+Immutable snapshots of a game (sharing everything that didn't change), with undo and redo.
+"""
+
+
+# Importing libraries.
+from typing import NamedTuple
+
+
+class GameState(NamedTuple):
+    """
+    An immutable snapshot of a GameEngine. Snapshots share every part
+        that didn't change between them (e.g. the hands that didn't play,
+        and the deck's arrays), so taking one is O(1) after a move and
+        nothing is copied per move.
+
+    word: str
+        - The current word.
+
+    side: int
+        - The seat of the player to move.
+
+    winner: int | None
+        - The seat that won (None while the game is going).
+
+    hands: tuple[tuple[str, ...], ...]
+        - The cards of each seat.
+
+    valid_moves: tuple[int, ...]
+        - How many valid moves each seat has made.
+
+    discards_earned: tuple[int, ...]
+        - How many discards each seat has earned and not used yet.
+
+    deck: tuple
+        - The state of the deck (from Deck.snapshot).
+
+    active: tuple[bool, ...]
+        - Whether each seat is still playing (from TurnScheduler.active).
+
+    position_hash: int
+        - Zobrist hash of the word, the hands and the seat to move (from ZobristHash.hash_game).
+    """
+    word: str
+    side: int
+    winner: int | None
+    hands: tuple
+    valid_moves: tuple
+    discards_earned: tuple
+    deck: tuple
+    active: tuple
+    position_hash: int
+
+
+class GameHistory:
+    """
+    Undo and redo for a GameEngine: a stack of the states before each
+        change, and a stack of the states that were undone. Recording,
+        undoing and redoing a move each take one snapshot and one restore
+        (no lists of the game are copied).
+
+    A change that isn't recorded (e.g. a bot's move) can be undone with
+        the recorded change before it, but the undone states can't be
+        redone past it: redo drops them when the game is no longer in the
+        state that undo (or redo) left it in.
+
+    Attributes
+    ----------
+    engine: GameEngine
+        - The engine whose states are kept.
+
+    _undo_states: list[GameState]
+        - The states before each recorded change (the last one is undone first).
+
+    _redo_states: list[GameState]
+        - The states that were undone (the last one is redone first).
+
+    _restored_state: GameState | None
+        - The state that the last undo or redo went to (redo only goes
+            forward from it).
+
+    Methods
+    -------
+    record():
+        - Keep the current state (call before changing the game).
+
+    undo():
+        - Go back to the state before the last change.
+
+    redo():
+        - Go forward to the state that was last undone.
+    """
+
+    def __init__(self, engine):
+        """
+        Construct all the necessary attributes for the GameHistory object.
+
+        Parameters
+        ----------
+        engine: GameEngine
+            - The engine whose states are kept.
+        """
+        self.engine = engine
+        self._undo_states = []
+        self._redo_states = []
+        self._restored_state = None
+
+    @property
+    def can_undo(self) -> bool:
+        """
+        Return whether there is a change to undo.
+        """
+        return bool(self._undo_states)
+
+    @property
+    def can_redo(self) -> bool:
+        """
+        Return whether there is a change to redo.
+        """
+        return bool(self._redo_states)
+
+    def record(self) -> None:
+        """
+        Keep the current state (call before changing the game). A new
+            change can't be redone past, so the undone states are dropped.
+        """
+        self._undo_states.append(self.engine.snapshot())
+        self._redo_states.clear()
+        return None
+
+    def undo(self) -> bool:
+        """
+        Go back to the state before the last change, and return whether there was one.
+        """
+        if not self._undo_states:
+            return False
+        self._redo_states.append(self.engine.snapshot())
+        self._restored_state = self._undo_states.pop()
+        self.engine.restore(self._restored_state)
+        return True
+
+    def redo(self) -> bool:
+        """
+        Go forward to the state that was last undone, and return whether there was one
+            (there isn't if the game changed without being recorded since the undo).
+        """
+        if not self._redo_states:
+            return False
+        state = self.engine.snapshot()
+        # A snapshot shares the parts that didn't change, so this is quick when the game is where it was left.
+        if state != self._restored_state:  # The game changed since (e.g. a move that wasn't recorded).
+            self._redo_states.clear()
+            return False
+        self._undo_states.append(state)
+        self._restored_state = self._redo_states.pop()
+        self.engine.restore(self._restored_state)
+        return True
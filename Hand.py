@@ -0,0 +1,262 @@
+"""
+A hand of cards as a multiset: how many of each card, and which display slot each card is in.
+"""
+
+
+# Importing modules.
+from GameSettings import GameSettings
+
+
+class Hand:
+    """
+    The cards of a player, kept as the count of each card (indexed like
+        GameSettings.card_index) and a bitmask of the slots that hold a
+        card (with a bitmask of slots for each card), so adding, removing
+        and checking a card are O(1), and going through the cards only
+        visits the slots that hold one. The slots are where the cards are
+        shown (the game window draws slot i in card position i).
+
+    Any object with the same methods can be a seat of the game engine
+        (like Bot, which keeps its cards in buckets of usefulness).
+
+    Attributes
+    ----------
+    CARDS: str
+        - Every card (the letters, then the star card).
+
+    _counts: list[int]
+        - How many of each card the hand holds.
+
+    _slot_cards: list[str | None]
+        - The card in each slot (None for an empty slot).
+
+    _card_slots: list[int]
+        - Bitmask of the slots that hold each card.
+
+    _used_slots: int
+        - Bitmask of the slots that hold a card.
+
+    _size: int
+        - How many cards the hand holds.
+
+    Methods
+    -------
+    add_card(letter, slot):
+        - Add a card to the hand (in the first empty slot by default).
+
+    remove_cards(letter):
+        - Remove a card from the hand (or a star card if the letter isn't in it).
+
+    remove_slot(slot):
+        - Remove the card in a slot.
+
+    card_at(slot):
+        - Return the card in a slot.
+
+    slots():
+        - Return the filled slots and their cards (in slot order).
+
+    empty_slots(slot_count):
+        - Return the empty slots (of the first slots).
+
+    organize():
+        - Move the cards to the first slots (in alphabetical order).
+
+    won_game():
+        - Return whether the hand is empty.
+    """
+
+    CARDS = GameSettings.CARDS
+    _CARD_INDEXES = {card: GameSettings.card_index(card) for card in CARDS}  # Index of each card (lowercase).
+
+    def __init__(self, cards: list[str] = None):
+        """
+        Construct all the necessary attributes for the Hand object.
+
+        Parameters
+        ----------
+        cards: list[str]
+            - The cards in the hand (in slot order, empty by default).
+        """
+        self.cards = [] if cards is None else cards
+
+    def __len__(self) -> int:
+        """
+        Return how many cards the hand holds.
+        """
+        return self._size
+
+    def __contains__(self, card: str) -> bool:
+        """
+        Return whether the hand holds a card.
+        """
+        card_index = Hand._CARD_INDEXES.get(card)
+        return card_index is not None and self._counts[card_index] > 0
+
+    def count(self, card: str) -> int:
+        """
+        Return how many of a card the hand holds.
+
+        Parameters
+        ----------
+        card: str
+            - The card (a lowercase letter or the star card).
+        """
+        return self._counts[Hand._CARD_INDEXES[card]]
+
+    @property
+    def counts(self) -> list[int]:
+        """
+        Return how many of each card the hand holds (indexed like GameSettings.card_index).
+        """
+        return self._counts
+
+    @property
+    def cards(self) -> list[str]:
+        """
+        Return the cards (in alphabetical order with the star cards at the end).
+        """
+        cards_list = []
+        for card, count in zip(Hand.CARDS, self._counts):
+            if count:
+                cards_list.extend(card * count)
+        return cards_list
+
+    @cards.setter
+    def cards(self, cards_list: list[str]) -> None:
+        """
+        Replace the cards (in slot order).
+
+        Parameters
+        ----------
+        cards_list: list[str]
+            - The new cards of the hand.
+        """
+        self._counts = [0] * len(Hand.CARDS)
+        self._slot_cards = []
+        self._card_slots = [0] * len(Hand.CARDS)
+        self._used_slots = 0
+        self._size = 0
+        for card in cards_list:
+            self.add_card(card)
+
+    def add_card(self, letter: str, slot: int = None) -> int:
+        """
+        Add a card to the hand and return its slot.
+
+        Parameters
+        ----------
+        letter: str
+            - The card to add.
+
+        slot: int
+            - The slot to put the card in (the first empty slot by default).
+        """
+        card = letter.lower()
+        card_index = Hand._CARD_INDEXES[card]
+        if slot is None:
+            free_slots = ~self._used_slots & ((1 << len(self._slot_cards)) - 1)
+            # The lowest empty slot (or a new slot after the last one).
+            slot = (free_slots & -free_slots).bit_length() - 1 if free_slots else len(self._slot_cards)
+        elif self._used_slots >> slot & 1:
+            raise ValueError(f"Slot {slot} already holds a card.")
+        if slot >= len(self._slot_cards):
+            self._slot_cards.extend([None] * (slot + 1 - len(self._slot_cards)))
+        self._slot_cards[slot] = card
+        self._card_slots[card_index] |= 1 << slot
+        self._used_slots |= 1 << slot
+        self._counts[card_index] += 1
+        self._size += 1
+        return slot
+
+    def remove_cards(self, letter: str) -> int | None:
+        """
+        Remove a card from the hand (a star card is removed instead if the
+            letter is not in the hand), and return the slot it was in
+            (or None if neither card is in the hand).
+
+        Parameters
+        ----------
+        letter: str
+            - The card to remove.
+        """
+        card = letter.lower()
+        if card not in self:
+            card = GameSettings.STAR_CARD
+            if card not in self:
+                return None
+        card_slots = self._card_slots[Hand._CARD_INDEXES[card]]
+        slot = (card_slots & -card_slots).bit_length() - 1  # The lowest slot that holds the card.
+        self.remove_slot(slot)
+        return slot
+
+    def remove_slot(self, slot: int) -> str | None:
+        """
+        Remove the card in a slot and return it (or None if the slot is empty).
+
+        Parameters
+        ----------
+        slot: int
+            - The slot of the card.
+        """
+        card = self.card_at(slot)
+        if card is None:
+            return None
+        card_index = Hand._CARD_INDEXES[card]
+        self._slot_cards[slot] = None
+        self._card_slots[card_index] &= ~(1 << slot)
+        self._used_slots &= ~(1 << slot)
+        self._counts[card_index] -= 1
+        self._size -= 1
+        return card
+
+    def card_at(self, slot: int) -> str | None:
+        """
+        Return the card in a slot (or None if the slot is empty).
+
+        Parameters
+        ----------
+        slot: int
+            - The slot.
+        """
+        return self._slot_cards[slot] if 0 <= slot < len(self._slot_cards) else None
+
+    def slots(self):
+        """
+        Return an iterator over the filled slots and their cards (in slot order).
+        """
+        used_slots = self._used_slots
+        while used_slots:
+            lowest_slot = used_slots & -used_slots
+            slot = lowest_slot.bit_length() - 1
+            yield slot, self._slot_cards[slot]
+            used_slots ^= lowest_slot
+
+    def empty_slots(self, slot_count: int):
+        """
+        Return an iterator over the empty slots of the first slots.
+
+        Parameters
+        ----------
+        slot_count: int
+            - How many slots there are (e.g. card positions on the screen).
+        """
+        empty = ~self._used_slots & ((1 << slot_count) - 1)
+        while empty:
+            lowest_slot = empty & -empty
+            yield lowest_slot.bit_length() - 1
+            empty ^= lowest_slot
+
+    def organize(self) -> None:
+        """
+        Move the cards to the first slots, in alphabetical order
+            with the star cards at the end.
+        """
+        self.cards = self.cards
+        return None
+
+    def won_game(self) -> bool:
+        """
+        Return whether the hand is empty (the player has won).
+        """
+        return self._size == 0
@@ -0,0 +1,174 @@
+"""
+Letter utility table: how useful each letter card is, measured on the word graph.
+
+Run this file to rebuild the table for the current words and settings.
+"""
+
+
+# Importing libraries and modules.
+import struct
+import zlib
+from array import array
+
+from GameSettings import GameSettings
+from WordGraph import WordGraph
+
+
+class LetterUtility:
+    """
+    Counts, for each letter (of GameSettings.ALPHABET) and each position
+        in the word, how many edges of the word graph the letter creates
+        (i.e. how many moves there are in the game that play that letter
+        in that position).
+
+    The table is stored as a compact array of unsigned ints (one per letter
+        and position) with a header that records the word length and a
+        checksum of the words, so it is rebuilt automatically when the
+        words or the word length change.
+
+    Attributes
+    ----------
+    FILE_NAME: str
+        - The file that the table is stored in (for each word length).
+
+    _tables: dict[bytes, array]
+        - Tables that have already been loaded (by file header).
+
+    Methods
+    -------
+    build(words, word_length):
+        - Return the table for a set of words (counting edges).
+
+    save(table, words, word_length):
+        - Save the table for a set of words to its file.
+
+    load(words, word_length):
+        - Return the table for a set of words from its file
+            (building and saving it if it is missing or out of date).
+
+    letter_utilities(words, word_length):
+        - Return a dictionary of each letter and its total utility
+            (over all positions).
+    """
+
+    FILE_NAME = "data/letter_utility_{word_length}.bin"
+
+    _MAGIC = b"WBLU"
+    _VERSION = 1
+    _HEADER = struct.Struct("<4sBBII")  # Magic, version, word length, amount of words and words checksum.
+    _tables = {}
+
+    @staticmethod
+    def build(words, word_length: int) -> array:
+        """
+        Return the table for a set of words: entry [letter * word_length + position]
+            is how many edges of the word graph play that letter in that position.
+
+        Parameters
+        ----------
+        words: Iterable[str]
+            - The words that can be played.
+
+        word_length: int
+            - The length of the words in the game.
+        """
+        table = array("I", [0] * (len(GameSettings.ALPHABET) * word_length))
+        graph = WordGraph(word for word in words if len(word) == word_length)
+        for word in graph.words:
+            for position, letter, _ in graph.neighbors(word):  # Every move away from this word.
+                letter_index = GameSettings.ALPHABET.find(letter)
+                if letter_index >= 0:
+                    table[letter_index * word_length + position] += 1
+        return table
+
+    @staticmethod
+    def _header(words: list[str], word_length: int) -> bytes:
+        """
+        Return the header of the table file for a sorted list of words.
+        """
+        return LetterUtility._HEADER.pack(LetterUtility._MAGIC, LetterUtility._VERSION, word_length,
+                                          len(words), zlib.crc32("\n".join(words).encode()))
+
+    @staticmethod
+    def save(table: array, words, word_length: int) -> None:
+        """
+        Save the table for a set of words to its file.
+
+        Parameters
+        ----------
+        table: array
+            - The table (from LetterUtility.build).
+
+        words: Iterable[str]
+            - The words that the table was built from.
+
+        word_length: int
+            - The length of the words in the game.
+        """
+        words = sorted(word for word in words if len(word) == word_length)
+        with open(LetterUtility.FILE_NAME.format(word_length=word_length), "wb") as file:
+            file.write(LetterUtility._header(words, word_length))
+            file.write(table.tobytes())
+        return None
+
+    @staticmethod
+    def load(words, word_length: int) -> array:
+        """
+        Return the table for a set of words from its file
+            (building and saving it if it is missing or out of date).
+
+        Parameters
+        ----------
+        words: Iterable[str]
+            - The words that can be played.
+
+        word_length: int
+            - The length of the words in the game.
+        """
+        words = sorted(word for word in words if len(word) == word_length)
+        header = LetterUtility._header(words, word_length)
+        table = LetterUtility._tables.get(header)
+        if table is not None:  # Already loaded in this run.
+            return table
+
+        try:
+            with open(LetterUtility.FILE_NAME.format(word_length=word_length), "rb") as file:
+                if file.read(len(header)) == header:  # Table matches the current words and word length.
+                    table = array("I")
+                    table.frombytes(file.read())
+        except FileNotFoundError:  # Table has not been built yet.
+            pass
+
+        if table is None or len(table) != len(GameSettings.ALPHABET) * word_length:
+            table = LetterUtility.build(words, word_length)
+            LetterUtility.save(table, words, word_length)
+
+        LetterUtility._tables[header] = table
+        return table
+
+    @staticmethod
+    def letter_utilities(words, word_length: int) -> dict[str, int]:
+        """
+        Return a dictionary of each letter and its total utility (over all positions).
+
+        Parameters
+        ----------
+        words: Iterable[str]
+            - The words that can be played.
+
+        word_length: int
+            - The length of the words in the game.
+        """
+        table = LetterUtility.load(words, word_length)
+        return {letter: sum(table[index * word_length:(index + 1) * word_length])
+                for index, letter in enumerate(GameSettings.ALPHABET)}
+
+
+if __name__ == "__main__":
+    # Offline analysis step: rebuild the table for the current words and settings.
+    settings = GameSettings()
+    utility_table = LetterUtility.build(settings.ALL_BOT_WORDS, settings.WORD_LENGTH)
+    LetterUtility.save(utility_table, settings.ALL_BOT_WORDS, settings.WORD_LENGTH)
+    for letter_number, table_letter in enumerate(GameSettings.ALPHABET):
+        print(table_letter, list(utility_table[letter_number * settings.WORD_LENGTH:
+                                               (letter_number + 1) * settings.WORD_LENGTH]))
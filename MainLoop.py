@@ -4,23 +4,29 @@
 # Import time to be able to time players
 import time
 
-# Import functions
+# Import functions and the game settings (the rule profiles).
 from GameFunctions import Game
+from GameSettings import GameSettings
 
-# Import the bot to use as player 2.
+# Import the game engine (the rules of the game) and the hand of cards.
+from GameEngine import GameEngine, Move
+from GameState import GameHistory
+from Hand import Hand
+
+# Import the bot (bots can take any of the seats).
 from BotFunctions import Bot
 
 
-class Player:
+class Player(Hand):
     """
-    A human player that plays against a bot.
+    A human player that plays against other players and bots.
 
     Attributes
     ----------
     name : str
         The player's name.
     cards : list
-        The player's letter cards.
+        The player's letter cards (in alphabetical order).
     used_words : set
         The words that the player has used.
     """
@@ -35,304 +41,207 @@ class Player:
         cards : list
             Player's letter cards, defaults to empty list.
         """
+        super().__init__(cards)
         self.name = name
-        if cards is None:
-            cards = []
-
-        # The player's current stack of cards.
-        self.cards = cards
 
         # A set of the words that have been used by the player.
         self.used_words = set()
 
-    # Add a letter to the player's stack of cards.
-    def add_card(self, letter):
-        """
-        Adds a card to the player's letter cards.
-
-        Parameters
-        ----------
-        letter : str
-            The letter to add to the player's letter cards.
-        """
-        self.cards.append(letter)
-
-    # Remove a letter from the player's cards.
-    def remove_cards(self, letter):
-        """
-        Removes a card from the player's letter cards.
-
-        Parameters
-        ----------
-        letter : str
-            The letter to remove from the player's letter cards.
-        """
 
-        # Make sure the letter exists.
-        if letter in self.cards:
-            self.cards.remove(letter)
-        elif "*" in self.cards:
-            self.cards.remove("*")
+def player_move(current_word, new_word, hand):
+    """
+    Turns the word that the player typed into a move.
 
-    # Checks if the player has used all of their cards.
-    def won_game(self):
-        """
-        Checks if the player has used all of their cards.
+    Parameters
+    ----------
+    current_word : str
+        The word that the player had to change.
+    new_word : str
+        The word that the player typed.
+    hand : Hand
+        The player's hand.
+
+    Returns
+    --------
+    Move:
+        The new word and the card that changes it (a star card is
+        used when the player doesn't have the letter).
+    """
+    new_word = new_word.lower()
+    for i in range(min(len(current_word), len(new_word))):
 
-        Returns
-        --------
-        Bool:
-            True if player has used all of their cards, otherwise False.
-        """
+        # Find the changed letter.
+        if current_word[i] != new_word[i]:
+            changed_letter = new_word[i]
+            if changed_letter not in hand and GameEngine.STAR_CARD in hand:
+                # The star card takes the place of the changed letter.
+                return Move(new_word[:i] + GameEngine.STAR_CARD + new_word[i + 1:], GameEngine.STAR_CARD)
+            return Move(new_word, changed_letter)
+    return Move(new_word, "")
 
-        # The winner is announced when they finish all their cards.
-        return len(self.cards) == 0
-
-# The game setup.
-game = Game()
-deck = game.card_stack()
-used_cards = []
-
-# Pass cards for player 1 and player 2.
-player1_cards = [deck.pop() for _ in range(7)]
-player2_cards = [deck.pop() for _ in range(7)]
-
-# Create player 1 using input name.
-player1 = Player(input("Your name: "), player1_cards)
-
-# Keep asking for a difficulty level until a valid answer is given.
-while True:
-    difficulty_input= input("Your difficulty level (easy/medium/hard): ").lower()
-    if difficulty_input in ["easy" , "medium" , "hard"]:
-        difficulty_enum = Bot.Difficulty[difficulty_input.upper()]
-        break
-    else:
-        print("Invalid choice. Please enter the right difficulty level. ")
-
-# Create a bot player with its cards.
-player2 = Bot(difficulty_enum, player2_cards)
-
-# Start the game.
-# Toss a coin to decide who goes first.
-result = game.coin_flip()
-
-# Determine who goes first based on the result.
-if result == "Head":
-    current_player = player1
-
-    # Player1 starts.
-    print(f"{current_player.name} starts the game!")
-else:
-    current_player = player2
-
-    # The bot starts.
-    print("Bot starts the game!")
-
-# Generate the starting word.
-current_word = game.word_generator().title()
-print(f"The starting word is: {current_word}")
-
-# Main game loop.
-while True:
-
-    # Check if anyone has won.
-    if player1.won_game():
-        # Player1 wins.
-        print(f"{player1.name} won the game!")
-        winner = player1.name
-        break
-    elif player2.won_game():
-        # Bot wins.
-        print("The bot has won the game!")
-        winner = player2
-        break
-    if current_player == player1:
-        print(f"Your current cards: {player1.cards}")
-
-        # Start the timer.
-        start_time = time.time()
-        print(f"{player1.name}, it's your turn. The word is: {current_word}")
-        new_word = input("Enter a new word by changing one letter: ")
-
-        # End the timer.
-        end_time = time.time()
-
-        # Calculate the time taken.
-        time_taken = end_time - start_time
-
-        # Check if the player answered within 15 seconds.
-        if time_taken <= 15:
-
-            # Check if the new word is valid and differs by 1 letter.
-            if (game.check_exists(new_word) and
-                    game.is_one_letter_dif(current_word, new_word)):
-                word_changed = False
-
-                # Go through the letters.
-                for i in range(3) :
-
-                    # Find the changed letter.
-                    if current_word[i] != new_word[i]:
-                        changed_letter = new_word[i]
-
-                        # Check if the player has the letter in their stack.
-                        if changed_letter in player1.cards or "*" in player1.cards:
-                            player1.remove_cards(changed_letter)
-                            game.quicksort(player1.cards)
-                            used_cards.append(changed_letter)
-
-                            # Update the current word.
-                            current_word = new_word
-
-                            # Switch turns.
-                            current_player = player2
-                            print("It is now the bot's turn.")
-
-                            # Add it to used words.
-                            player1.used_words.add(current_word)
-                            word_changed = True
-                            break
-
-                # If no valid change was made, and the deck is empty,
-                # shuffle used cards and put them back into the deck.
-                if not word_changed:
-                    if not deck:
-                        # Shuffle used cards and put them back into the deck.
-                        deck = game.fisher_shuffle(used_cards.copy())
-                        used_cards = []
-
-                    # Give the player a penalty.
-                    player1.add_card(deck.pop())
-                    print(f"{player1.name} got a penalty card.")
-                    game.quicksort(player1.cards)
-
-                    # Switch turns.
-                    current_player = player2
 
+def main():
+    """
+    Sets up a game between players and bots (2 to 8 seats) and plays it on the command line.
+    """
+    # Keep asking for the rules (a rule profile) until a valid answer is given.
+    profiles = list(GameSettings.profiles())
+    while True:
+        profile_input = input(f"The rules ({'/'.join(profiles)}, press enter for "
+                              f"{GameSettings.DEFAULT_PROFILE}): ").strip().lower()
+        if profile_input in profiles or not profile_input:
+            GameSettings.use_profile(profile_input or GameSettings.DEFAULT_PROFILE)
+            break
+        else:
+            print("Invalid choice. Please enter one of the rule profiles. ")
+
+    # The game setup (with the rules that were picked).
+    game = Game()
+
+    # Create the players using the input names.
+    names = [name.strip() for name in input("Player names (separated by commas): ").split(",") if name.strip()]
+    players = [Player(name) for name in names]
+
+    # Keep asking for the amount of bots until a valid answer is given.
+    least_bots = max(2 - len(players), 0)
+    most_bots = GameEngine.MAX_SEATS - len(players)
+    while True:
+        bots_input = input(f"How many bots ({least_bots}-{most_bots}): ")
+        if bots_input.isdigit() and least_bots <= int(bots_input) <= most_bots:
+            bot_amount = int(bots_input)
+            break
+        else:
+            print("Invalid choice. Please enter the right amount of bots. ")
+
+    # Keep asking for a difficulty level until a valid answer is given.
+    while bot_amount:
+        difficulty_input= input("The bots difficulty level (easy/medium/hard): ").lower()
+        if difficulty_input in ["easy" , "medium" , "hard"]:
+            difficulty_enum = Bot.Difficulty[difficulty_input.upper()]
+            break
+        else:
+            print("Invalid choice. Please enter the right difficulty level. ")
+
+    # Create the bot players (each with its own random stream).
+    bot_streams = game.random.spawn(bot_amount)
+    bots = [Bot(difficulty_enum, seed=stream, settings=game.object_settings) for stream in bot_streams]
+    names += [f"Bot {number + 1}" for number in range(bot_amount)]
+
+    # Start the game: the engine passes the cards, picks who goes first and picks the starting word.
+    engine = GameEngine(hands=players + bots, game=game)
+    print(f"{names[engine.side]} starts the game!")
+    print(f"The starting word is: {engine.word.title()}")
+
+    # The states before each of the players turns (typing "undo" takes back to the previous one, and "redo" forward).
+    history = GameHistory(engine)
+
+    # Main game loop.
+    while engine.winner is None:
+        current_word = engine.word
+        seat = engine.side
+        hand = engine.hands[seat]
+        next_hand = engine.hands[engine.turns.next_seat(seat)]
+
+        if not isinstance(hand, Bot):
+            print(f"Your current cards: {hand.cards}")
+
+            # Start the timer.
+            start_time = time.time()
+            print(f"{hand.name}, it's your turn. The word is: {current_word.title()}")
+            if isinstance(next_hand, Bot):
+                # The next bot works out its replies while the player is thinking.
+                next_hand.ponder(current_word, hand.cards)
+            new_word = input("Enter a new word by changing one letter (or \"undo\" or \"redo\"): ")
+
+            # Go back to the previous player's turn.
+            if new_word.lower() == "undo":
+                if not history.undo():
+                    print("There is no turn to undo.")
+                continue
+            # Go forward to the turn that was undone (not once a bot has played since).
+            if new_word.lower() == "redo":
+                if not history.redo():
+                    print("There is no turn to redo.")
+                continue
+            history.record()
+
+            # Calculate the time taken.
+            time_taken = time.time() - start_time
+
+            # Check if the player answered in time.
+            if time_taken > engine.game_settings.TURN_TIME_LIMIT:
+                step = engine.timeout(time_taken)
+                print(f"{hand.name} got a penalty card for taking too long.")
             else:
-                # The player entered an invalid word.
-                if not deck:
-                    # Shuffle used cards and put them back into the deck.
-                    deck = game.fisher_shuffle(used_cards.copy())
-                    used_cards = []
-
-                player1.add_card(deck.pop())
-                print(f"{player1.name} entered an invalid word.")
-                game.quicksort(player1.cards)
+                step = engine.apply(player_move(current_word, new_word, hand), time_taken)
+                if step.valid:
+                    # Add it to used words.
+                    hand.used_words.add(new_word.lower())
+                    print(f"It is now {names[engine.side]}'s turn.")
+                else:
+                    print(f"{hand.name} entered an invalid word and got a penalty card.")
+
+            # Every few valid words the player can discard a card.
+            while engine.discards_earned[seat] and engine.winner is None:
+                card = input(f"Your cards: {hand.cards}. Card to discard (press enter to keep them): ")
+                if not card or not engine.discard(seat, card):
+                    break
+
+        # Bot's turn.
+        else:
+            print(f"{names[seat]}'s current cards: {hand.cards}")
+            print(f"It's {names[seat]}'s turn. The word is: {current_word.title()}")
 
-                # Switch turns.
-                current_player = player2
+            # Timer for the bot.
+            current_timer = 0
 
-        else:
-            # The player took too long.
-            if not deck:
-                # Shuffle used cards and put them back into the deck.
-                deck = game.fisher_shuffle(used_cards.copy())
-                used_cards = []
+            # Get the bot's move (against the seat that plays after it).
+            bot_word = hand.play_turn(current_word, current_timer, next_hand.cards, engine.deck)
 
-            player1.add_card(deck.pop())
-            print(f"{player1.name} got a penalty card for taking too long.")
-            game.quicksort(player1.cards)
-            current_player = player2
+            # If the bot is still thinking (until its time runs out).
+            while bot_word == Bot.Output.THINKING and current_timer < engine.game_settings.TURN_TIME_LIMIT:
 
-    # Bot's turn.
-    elif current_player == player2:
-        print(f"Bot's current cards: {player2.cards}")
-        print(f"It's the bot's turn. The word is: {current_word}")
+                # Wait 1 second.
+                time.sleep(1)
 
-        # Timer for the bot.
-        current_timer = 0
+                # Increase the timer.
+                current_timer += 1
 
-        # Get the bot's move.
-        bot_word = player2.play_turn(current_word, current_timer)
+                # Check again for bot's move.
+                bot_word = hand.play_turn(current_word, current_timer, next_hand.cards, engine.deck)
+            hand.end_turn()
 
-        # If the bot is still thinking.
-        while bot_word == Bot.Output.THINKING:
+            # If bot did not answer, it gets a penalty card.
+            if bot_word == Bot.Output.THINKING:
+                engine.timeout(current_timer)
+                print(f"{names[seat]} failed to change the word and got a penalty card.")
+            else:
+                # Wait a bit to make it feel more natural.
+                time.sleep(0.5)
+                step = engine.apply(Move(*bot_word), current_timer)
+                if step.valid:
+                    print(f"{names[seat]} changed the word to {bot_word[0]}")
+                else:
+                    print(f"{names[seat]} got a penalty card.")
+
+                # Every few valid words the bot discards a card.
+                while engine.discards_earned[seat] and engine.winner is None:
+                    if not engine.discard(seat, hand.choose_discard()):
+                        break
 
-            # Wait 1 second.
-            time.sleep(1)
+        # A seat that holds too many cards is out of the game.
+        if not engine.turns.active[seat] and engine.winner is None:
+            print(f"{names[seat]} holds too many cards and is out of the game!")
+            if isinstance(hand, Bot):  # The bot doesn't play again, so its search thread is stopped.
+                hand.stop_search()
 
-            # Increase the timer.
-            current_timer += 1
+    # The game is over, so no bot keeps searching.
+    for bot in bots:
+        bot.stop_search()
 
-            # Check again for bot's move.
-            bot_word = player2.play_turn(current_word, current_timer)
+    # Announce the winner.
+    print(f"{names[engine.winner]} won the game!")
 
-        # Handles bot_word when it's a tuple.
-        if isinstance(bot_word, tuple):
-            bot_answer, bot_used_card = bot_word
-        else:
-            bot_answer = bot_word
-
-        # If bot did not answer, it gets a penalty card.
-        if not bot_answer:
-            if not deck:
-                # Shuffle used cards and put them back into the deck.
-                deck = game.fisher_shuffle(used_cards.copy())
-                used_cards = []
-
-            player2.add_card(deck.pop())
-            print("The bot failed to change the word.")
-            game.quicksort(player2.cards)
-
-            # Switch turns.
-            current_player = player1
-            player2.end_turn()
-            continue
-
-        # Wait a bit to make it feel more natural.
-        time.sleep(0.5)
-        word_changed = False
-
-        # Check if the word is valid and differs by only 1 letter.
-        if (bot_answer and game.check_exists(bot_answer) and
-                game.is_one_letter_dif(current_word, bot_answer)):
-
-                # Go through the letters.
-            for i in range(3):
-                if current_word[i] != bot_answer[i]:
-                    changed_letter = bot_answer[i]
-
-                    # Check if the bot has the letter in its stack.
-                    if changed_letter in player2.cards or "*" in player2.cards:
-                        player2.remove_cards(changed_letter)
-                        game.quicksort(player2.cards)
-                        used_cards.append(changed_letter)
-
-                        # Update current word.
-                        current_word = bot_answer
-                        print(f"The bot changed the word to {bot_answer} ")
-                        print(f"The current word is: {current_word}")
-                        current_player = player1
-                        player2.end_turn()
-                        word_changed = True
-                        break
 
-            # If no valid change was made, and the deck is empty,
-            # shuffle used cards and put them back into the deck.
-            if not word_changed:
-                if not deck:
-                    deck = game.fisher_shuffle(used_cards.copy())
-                    used_cards = []
-
-                # Give the bot a penalty card.
-                player2.add_card(deck.pop())
-                print("The bot got a penalty card")
-                game.quicksort(player2.cards)
-
-                # Switch turns.
-                current_player = player1
-                player2.end_turn()
-        else:
-            if not deck:
-                deck = game.fisher_shuffle(used_cards.copy())
-                used_cards = []
-
-            # Bot gets a penalty if the word is invalid.
-            player2.add_card(deck.pop())
-            print("Bot got a penalty card.")
-            game.quicksort(player2.cards)
-
-            # Switch turns.
-            current_player = player1
-            player2.end_turn()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
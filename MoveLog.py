@@ -0,0 +1,381 @@
+"""
+Compact binary log of a game (a few bytes per move), and a replay engine that plays a log back through the rules.
+"""
+
+
+# Importing libraries and modules.
+import struct
+
+from GameEngine import GameEngine, Move
+from GameFunctions import Game
+from GameSettings import GameSettings
+from Hand import Hand
+from RandomStream import RandomStream
+
+
+class MoveLog:
+    """
+    The record of a game as bytes: a header with the settings, the seed
+        and the starting deck, then one EVENT_SIZE byte event for each
+        step of the game. A game engine given a log adds an event for
+        every move, timeout, discard and shuffle, so any state of the game
+        can be rebuilt and the result checked by playing the events back
+        (MoveReplay), without keeping or parsing any text.
+
+    Header (HEADER, then the seed, the random state and the deck):
+        - MAGIC, VERSION, the rules (GameSettings.rules, in the order of
+            GameSettings.RULE_NAMES), DISCARD_EVERY, the amount of seats, the seat
+            that moved first (NO_VALUE after a coin flip), flags and the
+            length of the seed key and of the deck.
+        - The seed key of the games random stream (UTF-8).
+        - The state of the random stream (only when it had been used
+            before the game started, RANDOM_STATE_FLAG, e.g. a Game that
+            plays many games).
+        - The starting deck as card indexes (drawn from the end), and
+            whether it was made from the random stream (DEALT_FLAG) or
+            given to the engine.
+
+    Event (EVENT, 4 bytes):
+        - The kind of event (high 4 bits) and the seat (low 4 bits).
+        - The card index (low 5 bits) and the position in the word that
+            the card changed (high 3 bits). For a penalty it is the penalty
+            card (NO_CARD if the deck was empty).
+        - The slot the card was played from (NO_VALUE if it isn't known).
+        - The time the seat took in tenths of a second (NO_VALUE if it isn't known).
+
+    A move is kept as the position and the card instead of the new word:
+        the word before the move and those two give the new word, so one
+        byte is enough and the log doesn't depend on the order of the words.
+
+    Attributes
+    ----------
+    MAGIC: bytes
+        - The first bytes of every log.
+
+    VERSION: int
+        - The version of the format.
+
+    MOVE, INVALID, TIMEOUT, DISCARD, SHUFFLE: int
+        - The kinds of events.
+
+    data: bytearray
+        - The bytes of the log.
+
+    Methods
+    -------
+    begin(engine, first_side, deck, dealt, random_state):
+        - Write the header (called by the engine before it deals).
+
+    add_event(kind, seat, card, position, slot, seconds):
+        - Add an event.
+
+    events():
+        - Return an iterator over the events.
+
+    save(file_name):
+        - Write the log to a file.
+
+    load(file_name):
+        - Read a log from a file.
+    """
+
+    MAGIC = b"WLOG"
+    VERSION = 2
+
+    HEADER = struct.Struct("<4s12BH")
+    EVENT = struct.Struct("<4B")
+    EVENT_SIZE = EVENT.size
+    RANDOM_STATE = struct.Struct("<625I")
+
+    # Kinds of events.
+    MOVE = 0
+    INVALID = 1
+    TIMEOUT = 2
+    DISCARD = 3
+    SHUFFLE = 4
+
+    # Header flags.
+    DEALT_FLAG = 1
+    RANDOM_STATE_FLAG = 2
+
+    NO_VALUE = 0xFF
+    NO_CARD = 0x1F
+    CARDS = GameSettings.CARDS
+
+    def __init__(self, data: bytes = b""):
+        """
+        Construct all the necessary attributes for the MoveLog object.
+
+        Parameters
+        ----------
+        data: bytes
+            - The bytes of a log (an empty log by default, for a game engine to write).
+        """
+        self.data = bytearray(data)
+        self._events_start = self.read_header()["events_start"] if data else 0
+
+    def __len__(self) -> int:
+        """
+        Return how many events the log holds.
+        """
+        return (len(self.data) - self._events_start) // MoveLog.EVENT_SIZE
+
+    def __bytes__(self) -> bytes:
+        """
+        Return the bytes of the log.
+        """
+        return bytes(self.data)
+
+    def begin(self, engine: GameEngine, first_side: int | None, deck: list[str], dealt: bool,
+              random_state: tuple) -> None:
+        """
+        Write the header of the log (the engine calls it before it deals).
+
+        Parameters
+        ----------
+        engine: GameEngine
+            - The engine of the game.
+
+        first_side: int | None
+            - The seat that was picked to move first (None for a coin flip).
+
+        deck: list[str]
+            - The starting deck (drawn from the end).
+
+        dealt: bool
+            - Whether the deck was made from the games random stream.
+
+        random_state: tuple
+            - The state of the games random stream before the deck was made.
+        """
+        settings = engine.game_settings
+        random = engine.game.random
+        seed_key = random.seed_key.encode()
+        # A new game's stream is at the start of its seed, so only the seed
+        # is kept (or else the whole state of the stream).
+        if random.at_start(random_state):
+            random_state = None
+        flags = (MoveLog.DEALT_FLAG if dealt else 0) | (MoveLog.RANDOM_STATE_FLAG if random_state else 0)
+        self.data = bytearray(MoveLog.HEADER.pack(
+            MoveLog.MAGIC, MoveLog.VERSION, *settings.rules, engine.DISCARD_EVERY, len(engine.hands),
+            MoveLog.NO_VALUE if first_side is None else first_side, flags, len(deck), len(seed_key)))
+        self.data += seed_key
+        if random_state:
+            self.data += MoveLog.RANDOM_STATE.pack(*random_state[1])
+        self.data += bytes(MoveLog.CARDS.index(card) for card in deck)
+        self._events_start = len(self.data)
+        return None
+
+    def read_header(self) -> dict:
+        """
+        Return the header of the log as a dictionary (raises ValueError if it isn't a log).
+        """
+        if len(self.data) < MoveLog.HEADER.size:
+            raise ValueError("The data is too short to be a move log.")
+        (magic, version, *rules, discard_every, seats, first_side, flags,
+         deck_size, seed_key_length) = MoveLog.HEADER.unpack_from(self.data)
+        if magic != MoveLog.MAGIC:
+            raise ValueError("The data is not a move log.")
+        if version != MoveLog.VERSION:
+            raise ValueError(f"Move log version {version} is not supported (version {MoveLog.VERSION} is).")
+        offset = MoveLog.HEADER.size
+        seed_key = bytes(self.data[offset:offset + seed_key_length]).decode()
+        offset += seed_key_length
+        random_state = None
+        if flags & MoveLog.RANDOM_STATE_FLAG:
+            random_state = (3, MoveLog.RANDOM_STATE.unpack_from(self.data, offset), None)
+            offset += MoveLog.RANDOM_STATE.size
+        deck = [MoveLog.CARDS[card] for card in self.data[offset:offset + deck_size]]
+        offset += deck_size
+        return {"rules": tuple(rules), "discard_every": discard_every, "seats": seats,
+                "first_side": None if first_side == MoveLog.NO_VALUE else first_side,
+                "dealt": bool(flags & MoveLog.DEALT_FLAG), "seed_key": seed_key,
+                "random_state": random_state, "deck": deck, "events_start": offset}
+
+    def add_event(self, kind: int, seat: int, card: str | None = None, position: int = 0,
+                  slot: int | None = None, seconds: float | None = None) -> None:
+        """
+        Add an event to the log.
+
+        Parameters
+        ----------
+        kind: int
+            - The kind of event (MOVE, INVALID, TIMEOUT, DISCARD or SHUFFLE).
+
+        seat: int
+            - The seat of the event.
+
+        card: str | None
+            - The card that was played or discarded, or the penalty card.
+
+        position: int
+            - The position in the word that the card changed.
+
+        slot: int | None
+            - The slot the card was played from.
+
+        seconds: float | None
+            - The time the seat took.
+        """
+        card_index = MoveLog.NO_CARD if card is None else MoveLog.CARDS.index(card)
+        self.data += MoveLog.EVENT.pack(
+            kind << 4 | seat,
+            position << 5 | card_index,
+            MoveLog.NO_VALUE if slot is None else slot,
+            MoveLog.NO_VALUE if seconds is None else min(int(seconds * 10), MoveLog.NO_VALUE - 1))
+        return None
+
+    def events(self):
+        """
+        Return an iterator over the events as (kind, seat, card, position, slot, tenths of a second),
+            with None for the values that aren't known.
+        """
+        cards = MoveLog.CARDS
+        for head, change, slot, tenths in MoveLog.EVENT.iter_unpack(memoryview(self.data)[self._events_start:]):
+            card_index = change & 0x1F
+            yield (head >> 4, head & 0x0F, None if card_index == MoveLog.NO_CARD else cards[card_index],
+                   change >> 5, None if slot == MoveLog.NO_VALUE else slot,
+                   None if tenths == MoveLog.NO_VALUE else tenths)
+
+    def save(self, file_name: str) -> None:
+        """
+        Write the log to a file.
+
+        Parameters
+        ----------
+        file_name: str
+            - The name of the file.
+        """
+        with open(file_name, "wb") as file:
+            file.write(self.data)
+        return None
+
+    @staticmethod
+    def load(file_name: str) -> "MoveLog":
+        """
+        Read a log from a file.
+
+        Parameters
+        ----------
+        file_name: str
+            - The name of the file.
+        """
+        with open(file_name, "rb") as file:
+            return MoveLog(file.read())
+
+
+class MoveReplay:
+    """
+    Plays logs back through the rules of the game engine, to rebuild the
+        state of a game after any event or to check that a log is a real
+        game (every move valid, every penalty card the same). The words
+        (and their graph) are loaded once for each rule profile that logs
+        are played back with, so replaying a log only costs its events.
+
+    Attributes
+    ----------
+    game: Game
+        - Words of the game (its random stream is replaced by each log's).
+
+    _games: dict[tuple[int, ...], Game]
+        - The Game of each rule profile that has been played back (by its rules).
+
+    Methods
+    -------
+    replay(log, events):
+        - Return the engine after some (or all) of the events of a log.
+
+    verify(log):
+        - Return whether a log plays back exactly as it was recorded.
+    """
+
+    def __init__(self, game: Game = None):
+        """
+        Construct all the necessary attributes for the MoveReplay object.
+
+        Parameters
+        ----------
+        game: Game
+            - Words of the game (loaded once here by default).
+        """
+        self.game = Game() if game is None else game
+        self._games = {self.game.object_settings.rules: self.game}
+
+    def _start(self, log: MoveLog) -> tuple[GameEngine, dict]:
+        """
+        Return a new engine at the start of a logged game, and the header of the log.
+        """
+        header = log.read_header()
+        # The game is played back with the rule profile it was recorded with.
+        profile = GameSettings.find_profile(**dict(zip(GameSettings.RULE_NAMES, header["rules"])))
+        if profile is None:
+            raise ValueError("The log was recorded with rules that are not in any rule profile.")
+        settings = GameSettings(profile)
+        game = self._games.get(settings.rules)
+        if game is None:  # The first log of this profile (its words are loaded once).
+            game = self._games[settings.rules] = Game(settings=settings)
+        random = RandomStream(header["seed_key"])
+        if header["random_state"] is not None:
+            random.setstate(header["random_state"])
+        game.random = random
+        if header["dealt"]:  # The stream moves on as it did when the deck was made (a stack for every two seats).
+            for _ in range((header["seats"] + 1) // 2):
+                game.card_stack()
+        engine = GameEngine(hands=[Hand() for _ in range(header["seats"])], game=game,
+                            first_side=header["first_side"], deck=header["deck"])
+        return engine, header
+
+    @staticmethod
+    def _play(engine: GameEngine, event: tuple) -> bool:
+        """
+        Play an event of a log, and return whether it went as it was recorded.
+        """
+        kind, seat, card, position, _, _ = event
+        if kind == MoveLog.MOVE:
+            word = engine.word
+            return (seat == engine.side
+                    and engine.apply(Move(word[:position] + card + word[position + 1:], card)).valid)
+        if kind == MoveLog.INVALID or kind == MoveLog.TIMEOUT:
+            return seat == engine.side and engine.timeout().penalty_card == card
+        if kind == MoveLog.DISCARD:
+            return engine.discard(seat, card)
+        if kind == MoveLog.SHUFFLE:
+            engine.shuffle()
+            return True
+        return False
+
+    def replay(self, log: MoveLog, events: int = None) -> GameEngine:
+        """
+        Return the engine of a logged game after some of its events
+            (raises ValueError if the log doesn't play back).
+
+        Parameters
+        ----------
+        log: MoveLog
+            - The log of the game.
+
+        events: int
+            - How many events to play (all of them by default).
+        """
+        engine, _ = self._start(log)
+        for number, event in enumerate(log.events()):
+            if events is not None and number >= events:
+                break
+            if not MoveReplay._play(engine, event):
+                raise ValueError(f"Event {number} of the log does not play back: {event}.")
+        return engine
+
+    def verify(self, log: MoveLog) -> bool:
+        """
+        Return whether a log plays back exactly as it was recorded.
+
+        Parameters
+        ----------
+        log: MoveLog
+            - The log of the game.
+        """
+        try:
+            self.replay(log)
+        except ValueError:
+            return False
+        return True
@@ -0,0 +1,326 @@
+"""
+Opening book: the first replies to each start word, ranked by a deep search of many start hands.
+
+Run this file to build the book for the current words and settings:
+
+    python OpeningBook.py --depth 6 --hands 60
+"""
+
+
+# Importing libraries and modules.
+import argparse
+import struct
+import time
+import zlib
+from collections import Counter
+from multiprocessing import Pool
+
+from BotSearch import AnytimeSearch
+from GameFunctions import Game
+from GameSettings import GameSettings
+from LetterUtility import LetterUtility
+from RandomStream import RandomStream
+from WordGraph import WordGraph
+
+
+_worker_builder = None  # Book builder of each worker process (so the words are only loaded once per worker).
+
+
+class OpeningBook:
+    """
+    Stores the best first replies to each start word (from Game.start_words),
+        ranked from the best to the worst by a deep search of many start hands.
+
+    A reply can only be played by a hand that holds its letter, so the reply
+        for a hand is the first ranked reply whose letter is in the hand mask
+        (a bit mask of the letters in the hand). A start word has at most
+        one reply for each way of changing it, so the lookup is a dictionary
+        lookup of the word id and a short scan of bit tests.
+
+    The file has a header (the rules and a checksum of the words), and then
+        for each start word: the word, how many replies it has, and each
+        reply as the reply word id (in the sorted words) and its letter card.
+
+    Attributes
+    ----------
+    FILE_NAME: str
+        - The file that the book is stored in.
+
+    start_words: list[str]
+        - The start words that the book covers (in word id order).
+
+    _start_word_ids: dict[str, int]
+        - The id of each start word.
+
+    _replies: list[list[tuple[int, str, str]]]
+        - The ranked replies of each start word (letter bit, reply word and card).
+
+    Methods
+    -------
+    load(all_words, settings):
+        - Return the book from its file (or None if it is missing or out of date).
+
+    save(all_words, settings):
+        - Save the book to its file.
+
+    lookup(current_word, cards):
+        - Return the book reply (word and card) for a word and a hand, or None.
+
+    hand_mask(cards):
+        - Return the bit mask of the letters in a hand.
+    """
+
+    FILE_NAME = "data/opening_book.bin"
+
+    _MAGIC = b"WBOB"
+    _VERSION = 2
+    # Magic, version, the rules (GameSettings.rules), amount of start words and words checksum.
+    _HEADER = struct.Struct("<4sB6BII")
+    _REPLY = struct.Struct("<HB")  # Reply word id and reply card.
+
+    game_settings = GameSettings()
+
+    def __init__(self, start_words: list[str], replies: list[list[tuple[str, str]]]):
+        """
+        Construct all the necessary attributes for the OpeningBook object.
+
+        Parameters
+        ----------
+        start_words: list[str]
+            - The start words that the book covers.
+
+        replies: list[list[tuple[str, str]]]
+            - The ranked replies (word and card) of each start word.
+        """
+        self.start_words = start_words
+        self._start_word_ids = {word: word_id for word_id, word in enumerate(start_words)}
+        self._replies = [[(self.hand_mask(card), reply, card) for reply, card in word_replies]
+                         for word_replies in replies]
+
+    @staticmethod
+    def hand_mask(cards) -> int:
+        """
+        Return the bit mask of the letters in a hand (bit 0 is "a").
+
+        Parameters
+        ----------
+        cards: Iterable[str]
+            - The cards of the hand (special cards are ignored).
+        """
+        mask = 0
+        for card in cards:
+            letter_number = ord(card.lower()) - 97
+            if 0 <= letter_number < 26:
+                mask |= 1 << letter_number
+        return mask
+
+    def lookup(self, current_word: str, cards) -> tuple[str, str] | None:
+        """
+        Return the book reply (word and card) for a word and a hand,
+            or None if the position is not in the book.
+
+        Parameters
+        ----------
+        current_word: str
+            - The current word in the game.
+
+        cards: Iterable[str]
+            - The cards of the player who has to reply.
+        """
+        word_id = self._start_word_ids.get(current_word.lower())
+        if word_id is None:
+            return None
+        hand_mask = self.hand_mask(cards)
+        for letter_bit, reply, card in self._replies[word_id]:  # From the best reply to the worst.
+            if hand_mask & letter_bit:
+                return reply, card
+        return None
+
+    @staticmethod
+    def _header(all_words: list[str], amount_of_start_words: int, settings: GameSettings) -> bytes:
+        """
+        Return the header of the book file for a sorted list of words and the rules of a game.
+        """
+        return OpeningBook._HEADER.pack(OpeningBook._MAGIC, OpeningBook._VERSION, *settings.rules,
+                                        amount_of_start_words, zlib.crc32("\n".join(all_words).encode()))
+
+    def save(self, all_words, settings: GameSettings = None) -> None:
+        """
+        Save the book to its file.
+
+        Parameters
+        ----------
+        all_words: Iterable[str]
+            - All the words that can be played (reply word ids are indexes of the sorted words).
+
+        settings: GameSettings
+            - The rules that the book was built for (the rule profile that is picked by default).
+        """
+        settings = OpeningBook.game_settings if settings is None else settings
+        all_words = sorted(all_words)
+        word_ids = {word: word_id for word_id, word in enumerate(all_words)}
+        with open(OpeningBook.FILE_NAME, "wb") as file:
+            file.write(self._header(all_words, len(self.start_words), settings))
+            for word, word_replies in zip(self.start_words, self._replies):
+                file.write(word.encode() + bytes([len(word_replies)]))
+                for _, reply, card in word_replies:
+                    file.write(self._REPLY.pack(word_ids[reply], ord(card)))
+        return None
+
+    @staticmethod
+    def load(all_words, settings: GameSettings = None) -> "OpeningBook | None":
+        """
+        Return the book from its file (or None if it is missing
+            or was built for other words or rules).
+
+        Parameters
+        ----------
+        all_words: Iterable[str]
+            - All the words that can be played.
+
+        settings: GameSettings
+            - The rules of the game (the rule profile that is picked by default).
+        """
+        settings = OpeningBook.game_settings if settings is None else settings
+        all_words = sorted(all_words)
+        word_length = settings.WORD_LENGTH
+        try:
+            with open(OpeningBook.FILE_NAME, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:  # The book has not been built yet.
+            return None
+        if len(data) < OpeningBook._HEADER.size:
+            return None
+        amount_of_start_words = OpeningBook._HEADER.unpack_from(data)[-2]
+        if data[:OpeningBook._HEADER.size] != OpeningBook._header(all_words, amount_of_start_words, settings):
+            return None  # Book was built for other words or rules.
+
+        offset = OpeningBook._HEADER.size
+        start_words, replies = [], []
+        for _ in range(amount_of_start_words):
+            start_words.append(data[offset:offset + word_length].decode())
+            amount_of_replies = data[offset + word_length]
+            offset += word_length + 1
+            replies.append([(all_words[reply_id], chr(card)) for reply_id, card in
+                            OpeningBook._REPLY.iter_unpack(data[offset:offset + amount_of_replies
+                                                                * OpeningBook._REPLY.size])])
+            offset += amount_of_replies * OpeningBook._REPLY.size
+        return OpeningBook(start_words, replies)
+
+
+class OpeningBookBuilder:
+    """
+    Builds the opening book offline: for each start word, deals many start
+        hands (and opponent hands) and searches each of them with a deep
+        search. Each reply is ranked by how often the search picked it out
+        of the deals where it could be played.
+
+    Attributes
+    ----------
+    _game: Game
+        - Game used to deal the cards and find the start words.
+
+    _graph: WordGraph
+        - Graph of all the words that can be played.
+
+    _search: AnytimeSearch
+        - The search that picks the replies.
+
+    Methods
+    -------
+    build_word(start_word, seed, hands, depth):
+        - Return the ranked replies of one start word.
+    """
+
+    game_settings = GameSettings()
+
+    def __init__(self):
+        """
+        Construct all the necessary attributes for the OpeningBookBuilder object.
+        """
+        all_words = self.game_settings.ALL_BOT_WORDS
+        self._game = Game()
+        self._graph = WordGraph(all_words)
+        self._search = AnytimeSearch(all_words, all_words,
+                                     LetterUtility.letter_utilities(all_words, self.game_settings.WORD_LENGTH))
+
+    def build_word(self, start_word: str, seed: str, hands: int, depth: int) -> list[tuple[str, str]]:
+        """
+        Return the replies (word and card) of one start word, ranked from the best to the worst.
+
+        Parameters
+        ----------
+        start_word: str
+            - The start word.
+
+        seed: str
+            - Seed of the dealt hands.
+
+        hands: int
+            - How many start hands to deal and search.
+
+        depth: int
+            - How deep to search.
+        """
+        self._game.random = RandomStream(seed)
+        replies = [(new_word, letter) for _, letter, new_word in self._graph.neighbors(start_word)]
+        picked, playable = Counter(), Counter()  # How often each reply was picked, and could be played.
+        for _ in range(hands):
+            deck = self._game.card_stack()
+            hand = [deck.pop() for _ in range(self.game_settings.START_CARDS_AMOUNT)]
+            opponent_hand = [deck.pop() for _ in range(self.game_settings.START_CARDS_AMOUNT)]
+            move = self._search.search(start_word, hand, opponent_hand, depth, float("inf"), float("inf"))
+            if move is None:  # The hand has no letter that can change the word.
+                continue
+            picked[move] += 1
+            for reply in replies:
+                if reply[1] in hand:
+                    playable[reply] += 1
+
+        # Replies that were never picked are left out (the bot searches instead).
+        ranked_replies = [reply for reply in replies if picked[reply]]
+        ranked_replies.sort(key=lambda reply: picked[reply] / playable[reply], reverse=True)
+        return ranked_replies
+
+
+def _init_worker() -> None:
+    """
+    Make the book builder once in each worker process.
+    """
+    global _worker_builder
+    _worker_builder = OpeningBookBuilder()
+    return None
+
+
+def _build_word(task: tuple) -> tuple[int, list[tuple[str, str]]]:
+    """
+    Build the ranked replies of one start word (in a worker process).
+    """
+    word_id, start_word, seed, hands, depth = task
+    return word_id, _worker_builder.build_word(start_word, seed, hands, depth)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the opening book for the current words and settings.")
+    parser.add_argument("--hands", type=int, default=60, help="start hands dealt and searched for each start word")
+    parser.add_argument("--depth", type=int, default=6, help="search depth (in turns)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (every core by default)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the dealt hands")
+    arguments = parser.parse_args()
+
+    start_time = time.perf_counter()
+    builder = OpeningBookBuilder()
+    book_start_words = [word for word in builder._game.start_words() if word.isascii()]  # One byte per letter.
+    tasks = [(word_id, word, f"{arguments.seed}/{word_id}", arguments.hands, arguments.depth)
+             for word_id, word in enumerate(book_start_words)]
+    book_replies = [[] for _ in book_start_words]
+    with Pool(arguments.workers, initializer=_init_worker) as pool:
+        for finished_words, (book_word_id, word_replies) in enumerate(pool.imap_unordered(_build_word, tasks), 1):
+            book_replies[book_word_id] = word_replies
+            if finished_words % 100 == 0:
+                print(f"{finished_words}/{len(tasks)} start words")
+
+    book = OpeningBook(book_start_words, book_replies)
+    book.save(OpeningBookBuilder.game_settings.ALL_BOT_WORDS, OpeningBookBuilder.game_settings)
+    print(f"Saved {sum(map(len, book_replies))} replies for {len(book_start_words)} start words "
+          f"to {OpeningBook.FILE_NAME} in {time.perf_counter() - start_time:.1f}s")
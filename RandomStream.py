@@ -0,0 +1,104 @@
+"""
+Seedable random number streams (one for each Game and Bot) that can spawn independent child streams.
+"""
+
+
+# Importing libraries.
+import random
+
+
+class RandomStream(random.Random):
+    """
+    A random number generator (with all the methods of random.Random) that
+        is made from a seed key, so that a game can be replayed exactly.
+
+    Child streams get the key of their parent with their number added
+        (e.g. "42/0", "42/1"), so every child stream is independent of its
+        parent and its siblings, and spawning them again from the same seed
+        gives the same streams (e.g. one for each worker process).
+
+    Attributes
+    ----------
+    seed_key: str
+        - The key that the stream was seeded with.
+
+    _spawned_streams: int
+        - How many child streams have been spawned.
+
+    Methods
+    -------
+    spawn(amount):
+        - Return new independent child streams.
+
+    at_start(state):
+        - Return whether a state of the stream is the start of its seed.
+    """
+
+    def __init__(self, seed=None):
+        """
+        Construct all the necessary attributes for the RandomStream object.
+
+        Parameters
+        ----------
+        seed: int | str | None
+            - The seed of the stream (a random seed is picked if it is None).
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed_key = str(seed)
+        self._spawned_streams = 0
+        super().__init__(self.seed_key)  # String seeds are hashed with SHA-512, so they are the same in every process.
+
+    @staticmethod
+    def of(seed) -> "RandomStream":
+        """
+        Return the seed if it already is a stream, or a new stream seeded with it.
+
+        Parameters
+        ----------
+        seed: RandomStream | int | str | None
+            - A stream or the seed of a new stream.
+        """
+        return seed if isinstance(seed, RandomStream) else RandomStream(seed)
+
+    def spawn(self, amount: int = 1) -> list["RandomStream"]:
+        """
+        Return new independent child streams.
+
+        Parameters
+        ----------
+        amount: int
+            - How many streams to spawn.
+        """
+        children = [RandomStream(f"{self.seed_key}/{self._spawned_streams + number}") for number in range(amount)]
+        self._spawned_streams += amount
+        return children
+
+    def at_start(self, state: tuple = None) -> bool:
+        """
+        Return whether a state of the stream (its current state by default)
+            is the state it had when it was seeded.
+
+        Parameters
+        ----------
+        state: tuple
+            - A state of the stream (from getstate).
+        """
+        if state is None:
+            state = self.getstate()
+        return state == random.Random(self.seed_key).getstate()
+
+    def __reduce__(self):
+        """
+        Keep the seed key and the position in the stream when the stream is
+            pickled (e.g. sent to a worker process).
+        """
+        return RandomStream, (self.seed_key,), (self.getstate(), self._spawned_streams)
+
+    def __setstate__(self, state) -> None:
+        """
+        Restore the position in the stream after it is unpickled.
+        """
+        random_state, self._spawned_streams = state
+        self.setstate(random_state)
+        return None
@@ -0,0 +1,461 @@
+"""
+Save and resume a match: the whole state of the game window, the engine and the bot in a compact binary file.
+"""
+
+
+# Importing libraries and modules.
+import struct
+import zlib
+
+from BotBelief import OpponentBelief
+from BotFunctions import Bot
+from GameEngine import Step
+from GameFunctions import Game
+from GameSettings import GameSettings
+from GameState import GameState
+from MoveLog import MoveLog
+from RandomStream import RandomStream
+from ZobristHash import ZobristHash
+
+
+class SaveGame:
+    """
+    The state of a match in the game window, read from (or written to) a
+        save file. Everything is written as fixed-size fields and arrays
+        (no text format), so a save takes well under a millisecond, and
+        the words of the game are kept in the file, so resuming doesn't
+        load the words file or build the start words again.
+
+    File (little-endian, each part after the other):
+        - HEADER: MAGIC, VERSION and the rules of the game (GameSettings.rules,
+            a save is resumed with the rule profile that has the same rules).
+        - The words (zlib-compressed) and a bitmask of the start words.
+        - The random streams of the game and of the bot (seed key,
+            state and how many streams they spawned).
+        - The engine (ENGINE, the word, the deck and each seat's cards,
+            with the slot of each card of the player).
+        - The move log of the game.
+        - The game window (WINDOW, the staged word and the replaced positions).
+        - The bot (BOT, its answer of the turn and the card it used).
+        - What the bot believes the player's hand is (BELIEF, the seed of
+            the belief and its observations, which are played again to
+            make the same sampled hands when the match is resumed).
+
+    Attributes
+    ----------
+    MAGIC: bytes
+        - The first bytes of every save file.
+
+    VERSION: int
+        - The version of the format (files of other versions aren't resumed).
+
+    NO_VALUE: int
+        - Byte that stands for None (e.g. no winner yet).
+
+    profile: str
+        - The rule profile that the match was played with.
+
+    _lexicon_blocks: dict[int, tuple]
+        - The words of the last game of each word length that was saved
+            and their bytes (so the words are only compressed once for
+            each variant of the game, see prepare).
+
+    Methods
+    -------
+    prepare(game):
+        - Make the parts of a save that stay the same for the whole game (when the game is set up).
+
+    save(progress, file_name):
+        - Write the state of a match to a file.
+
+    load(file_name):
+        - Read a save file.
+
+    make_game():
+        - Return the Game of the saved match (with its words and random stream).
+
+    make_bot():
+        - Return the bot of the saved match.
+
+    make_belief(game):
+        - Return what the bot of the saved match believes the player's hand is.
+
+    restore(progress):
+        - Put the saved state into a game window (that was made with make_game and make_bot).
+    """
+
+    MAGIC = b"WSAV"
+    VERSION = 5
+    NO_VALUE = 0xFF
+    CARDS = MoveLog.CARDS
+
+    HEADER = struct.Struct("<4s7B")
+    RANDOM_STATE = struct.Struct("<625I")
+    # Side, winner, seats, bitmask of the seats that are still playing, deck capacity, cards to draw, discarded cards.
+    ENGINE = struct.Struct("<7B")
+    WINDOW = struct.Struct("<2hH2B2H8B")
+    BOT = struct.Struct("<4B5d")
+    BELIEF = struct.Struct("<QII")  # Seed, sampled hands and number of observations.
+    OBSERVATIONS = ("play", "penalty", "missed_turn", "discard", "sample")
+    ADAPTIVE_SETTINGS = Bot.ADAPTIVE_SETTINGS + ("WORD_FREQUENCY_CUTOFF",)
+    DIFFICULTIES = list(Bot.Difficulty)
+
+    _lexicon_blocks = {}
+
+    def __init__(self, data: bytes):
+        """
+        Construct all the necessary attributes for the SaveGame object
+            (reads the whole file, raises ValueError if it isn't a save file).
+
+        Parameters
+        ----------
+        data: bytes
+            - The bytes of the save file.
+        """
+        self._data = memoryview(data)
+        self._offset = 0
+        magic, version, *rules = self._unpack(SaveGame.HEADER)
+        if magic != SaveGame.MAGIC:
+            raise ValueError("The file is not a saved game.")
+        if version != SaveGame.VERSION:
+            raise ValueError(f"Saved game version {version} is not supported (version {SaveGame.VERSION} is).")
+        self.profile = GameSettings.find_profile(**dict(zip(GameSettings.RULE_NAMES, rules)))
+        if self.profile is None:
+            raise ValueError("The game was saved with rules that are not in any rule profile.")
+
+        # The words and the start words (their bytes are kept, so saving the resumed match doesn't make them again).
+        lexicon_start = self._offset
+        word_count, compressed_size = self._unpack(struct.Struct("<HI"))
+        try:
+            self.words = zlib.decompress(self._take(compressed_size)).decode().split("\n")
+        except zlib.error:
+            raise ValueError("The words of the saved game are damaged.")
+        pool_mask = int.from_bytes(self._take((word_count + 7) // 8), "little")
+        self.lexicon_block = bytes(self._data[lexicon_start:self._offset])
+        self.start_word_pool = [word for index, word in enumerate(self.words) if pool_mask >> index & 1]
+
+        self.game_random = self._read_random()
+        self.bot_random = self._read_random()
+
+        # The engine.
+        word = self._read_text()
+        side, winner, seats, active_mask, capacity, cursor, discard_count = self._unpack(SaveGame.ENGINE)
+        valid_moves = self._unpack(struct.Struct(f"<{seats}H"))
+        discards_earned = self._unpack(struct.Struct(f"<{seats}H"))
+        draw_pile = self._read_cards(cursor) + [None] * (capacity - cursor)
+        discard_pile = self._read_cards(discard_count) + [None] * (capacity - discard_count)
+        slot_count = self._unpack(struct.Struct("<B"))[0]
+        self.player_slots = [None if card == SaveGame.NO_VALUE else SaveGame.CARDS[card]
+                             for card in self._take(slot_count)]
+        player_cards = sorted((card for card in self.player_slots if card is not None), key=SaveGame.CARDS.index)
+        hands = [tuple(player_cards)]
+        for _ in range(seats - 1):
+            hands.append(tuple(self._read_cards(self._unpack(struct.Struct("<B"))[0])))
+        self.engine_state = GameState(word, side, None if winner == SaveGame.NO_VALUE else winner, tuple(hands),
+                                      valid_moves, discards_earned,
+                                      (draw_pile, cursor, discard_pile, discard_count),
+                                      tuple(bool(active_mask >> seat & 1) for seat in range(seats)),
+                                      ZobristHash.hash_game(word, hands, side))
+        self.move_log = bytes(self._take(self._unpack(struct.Struct("<I"))[0]))
+
+        # The game window.
+        self.window = self._unpack(SaveGame.WINDOW)
+        self.word_cards = list(self._read_text())
+        self.replaced_positions = list(self._take(self._unpack(struct.Struct("<B"))[0]))
+
+        # The bot.
+        self.bot = self._unpack(SaveGame.BOT)
+        self.bot_answer = self._read_text()
+        self.bot_card = self._read_text()
+        self.belief_seed, self.belief_particles, observation_count = self._unpack(SaveGame.BELIEF)
+        self.belief_observations = []
+        for _ in range(observation_count):
+            name = SaveGame.OBSERVATIONS[self._take(1)[0]]
+            if name == "play":
+                value = SaveGame.CARDS[self._take(1)[0]]
+            elif name == "missed_turn":
+                value = self._read_text()
+            elif name == "sample":
+                value = self._take(1)[0]
+            else:
+                value = None
+            self.belief_observations.append((name, value))
+
+    def _take(self, size: int) -> memoryview:
+        """
+        Return the next bytes of the file.
+        """
+        if self._offset + size > len(self._data):
+            raise ValueError("The saved game is cut short.")
+        data = self._data[self._offset:self._offset + size]
+        self._offset += size
+        return data
+
+    def _unpack(self, fields: struct.Struct) -> tuple:
+        """
+        Return the next fields of the file.
+        """
+        return fields.unpack(self._take(fields.size))
+
+    def _read_text(self) -> str | None:
+        """
+        Return the next text of the file (its length comes first, NO_VALUE for None).
+        """
+        length, = self._unpack(struct.Struct("<B"))
+        return None if length == SaveGame.NO_VALUE else bytes(self._take(length)).decode()
+
+    def _read_cards(self, amount: int) -> list[str]:
+        """
+        Return the next cards of the file (as card indexes).
+        """
+        return [SaveGame.CARDS[card] for card in self._take(amount)]
+
+    def _read_random(self) -> tuple[str, tuple]:
+        """
+        Return the next random stream of the file (its seed key, and its state for RandomStream.__setstate__).
+        """
+        seed_key = self._read_text()
+        spawned_streams, = self._unpack(struct.Struct("<I"))
+        return seed_key, ((3, self._unpack(SaveGame.RANDOM_STATE), None), spawned_streams)
+
+    @staticmethod
+    def _text(text: str | None) -> bytes:
+        """
+        Return a text as bytes (its length first, NO_VALUE for None).
+        """
+        if text is None:
+            return bytes((SaveGame.NO_VALUE,))
+        encoded = text.encode()
+        return bytes((len(encoded),)) + encoded
+
+    @staticmethod
+    def _cards(cards) -> bytes:
+        """
+        Return cards as bytes (card indexes).
+        """
+        return bytes(SaveGame.CARDS.index(card) for card in cards)
+
+    @staticmethod
+    def _random(stream: RandomStream) -> bytes:
+        """
+        Return a random stream as bytes.
+        """
+        random_state, spawned_streams = stream.__reduce__()[2]
+        return (SaveGame._text(stream.seed_key) + struct.pack("<I", spawned_streams)
+                + SaveGame.RANDOM_STATE.pack(*random_state[1]))
+
+    @staticmethod
+    def prepare(game: Game) -> None:
+        """
+        Make the parts of a save that stay the same for the whole game (the
+            words and the start words), e.g. when the game is set up, so that
+            saving the match later only writes what changed.
+
+        Parameters
+        ----------
+        game: Game
+            - The game of the match.
+        """
+        SaveGame._lexicon(game)
+        return None
+
+    @staticmethod
+    def _lexicon(game: Game) -> bytes:
+        """
+        Return the words of a game and the bitmask of its start words as bytes
+            (made once for each game of each word length).
+        """
+        word_length = game.object_settings.WORD_LENGTH
+        if SaveGame._lexicon_blocks.get(word_length, (None,))[0] is not game.words:
+            words = sorted(game.words)
+            pool = set(game.start_words())
+            pool_mask = sum(1 << index for index, word in enumerate(words) if word in pool)
+            compressed = zlib.compress("\n".join(words).encode())
+            SaveGame._lexicon_blocks[word_length] = (
+                game.words, struct.pack("<HI", len(words), len(compressed)) + compressed
+                + pool_mask.to_bytes((len(words) + 7) // 8, "little"))
+        return SaveGame._lexicon_blocks[word_length][1]
+
+    @staticmethod
+    def save(progress, file_name: str) -> None:
+        """
+        Write the state of a match to a file.
+
+        Parameters
+        ----------
+        progress: GameProgress
+            - The game window of the match.
+
+        file_name: str
+            - The name of the file.
+        """
+        engine, bot, belief = progress.engine, progress.bot, progress.opponent_belief
+        deck_state = engine.deck.snapshot()
+        draw_pile, cursor, discard_pile, discard_count = deck_state
+        player_slots = [SaveGame.NO_VALUE] * max((slot + 1 for slot, _ in progress.player_hand.slots()), default=0)
+        for slot, card in progress.player_hand.slots():
+            player_slots[slot] = SaveGame.CARDS.index(card)
+
+        settings = engine.game_settings
+        parts = [
+            SaveGame.HEADER.pack(SaveGame.MAGIC, SaveGame.VERSION, *settings.rules),
+            SaveGame._lexicon(progress.logic),
+            SaveGame._random(progress.logic.random),
+            SaveGame._random(bot.random),
+            SaveGame._text(engine.word),
+            SaveGame.ENGINE.pack(engine.side, SaveGame.NO_VALUE if engine.winner is None else engine.winner,
+                                 len(engine.hands), sum(is_active << seat for seat, is_active
+                                                        in enumerate(engine.turns.active)),
+                                 len(draw_pile), cursor, discard_count),
+            struct.pack(f"<{len(engine.hands)}H", *engine.valid_moves),
+            struct.pack(f"<{len(engine.hands)}H", *engine.discards_earned),
+            SaveGame._cards(draw_pile[:cursor]),
+            SaveGame._cards(discard_pile[:discard_count]),
+            bytes((len(player_slots),)) + bytes(player_slots),
+        ]
+        for hand in engine.hands[1:]:
+            cards = hand.cards
+            parts.append(bytes((len(cards),)) + SaveGame._cards(cards))
+        move_log = bytes(engine.log) if engine.log is not None else b""
+        parts.append(struct.pack("<I", len(move_log)) + move_log)
+
+        flags = (progress.show_popup | progress.show_remove_page << 1 | progress.show_remove_page_mode << 2
+                 | progress.adaptive_difficulty << 3)
+        bot_step = progress.bot_step
+        parts += [
+            SaveGame.WINDOW.pack(
+                progress.points, progress.computer_points, progress.bot_correct_answers, progress.side_status,
+                progress.timer_seconds, progress.round, progress.round_counter_popup_click_count,
+                progress.theme_setting,
+                SaveGame.NO_VALUE if progress.player_answer_status is None else progress.player_answer_status,
+                SaveGame.NO_VALUE if progress.computer_answer_status is None else progress.computer_answer_status,
+                flags,
+                SaveGame.NO_VALUE if progress.played_slot is None else progress.played_slot,
+                SaveGame.NO_VALUE if progress.last_swapped_position is None else progress.last_swapped_position,
+                SaveGame.NO_VALUE if bot_step is None else bot_step.valid,
+                SaveGame.NO_VALUE if bot_step is None or bot_step.penalty_card is None
+                else SaveGame.CARDS.index(bot_step.penalty_card)),
+            SaveGame._text("".join(progress.word_cards)),
+            bytes((len(progress.replaced_positions),)) + bytes(progress.replaced_positions),
+        ]
+
+        difficulty_settings = bot.difficulty_settings
+        parts += [
+            SaveGame.BOT.pack(SaveGame.DIFFICULTIES.index(bot.difficulty_level), bot.ran_current_turn_code,
+                              bot.current_turn_will_answer_or_not, bot.opening_turn, bot.current_turn_answer_time,
+                              *(difficulty_settings[name] for name in SaveGame.ADAPTIVE_SETTINGS)),
+            SaveGame._text(bot.current_turn_answer),
+            SaveGame._text(bot.current_turn_card_used),
+            SaveGame.BELIEF.pack(belief.seed, len(belief.hands), len(belief.observations)),
+        ]
+        for name, value in belief.observations:
+            parts.append(bytes((SaveGame.OBSERVATIONS.index(name),)))
+            if name == "play":
+                parts.append(bytes((SaveGame.CARDS.index(value.lower()),)))
+            elif name == "missed_turn":
+                parts.append(SaveGame._text(value))
+            elif name == "sample":
+                parts.append(bytes((value,)))
+
+        with open(file_name, "wb") as file:
+            file.write(b"".join(parts))
+        return None
+
+    @staticmethod
+    def load(file_name: str) -> "SaveGame":
+        """
+        Read a save file (raises ValueError if it isn't one, or FileNotFoundError if there is none).
+
+        Parameters
+        ----------
+        file_name: str
+            - The name of the file.
+        """
+        with open(file_name, "rb") as file:
+            return SaveGame(file.read())
+
+    def make_game(self) -> Game:
+        """
+        Return the Game of the saved match: its words, start words and random stream
+            (the words file isn't loaded).
+        """
+        game = Game(self.game_random[0], words=self.words, settings=GameSettings(self.profile))
+        game.random.__setstate__(self.game_random[1])
+        game.start_word_pool = self.start_word_pool
+        # The words are saved as they were read (see prepare).
+        SaveGame._lexicon_blocks[game.object_settings.WORD_LENGTH] = (game.words, self.lexicon_block)
+        return game
+
+    def make_bot(self) -> Bot:
+        """
+        Return the bot of the saved match (its difficulty, settings, random stream and turn).
+        """
+        difficulty, ran_turn_code, will_answer, opening_turn, answer_time, *settings = self.bot
+        bot = Bot(SaveGame.DIFFICULTIES[difficulty], seed=self.bot_random[0], settings=GameSettings(self.profile))
+        bot.random.__setstate__(self.bot_random[1])
+        bot.update_difficulty_settings(dict(zip(SaveGame.ADAPTIVE_SETTINGS, settings)))
+        bot.ran_current_turn_code = bool(ran_turn_code)
+        bot.current_turn_will_answer_or_not = bool(will_answer)
+        bot.opening_turn = bool(opening_turn)
+        bot.current_turn_answer_time = answer_time
+        bot.current_turn_answer = self.bot_answer
+        bot.current_turn_card_used = self.bot_card
+        return bot
+
+    def make_belief(self, game: Game) -> OpponentBelief:
+        """
+        Return what the bot of the saved match believes the player's hand is
+            (made from its seed, with its observations played again).
+
+        Parameters
+        ----------
+        game: Game
+            - The game of the saved match (from make_game).
+        """
+        belief = OpponentBelief(game.words, game.object_settings.START_CARDS_AMOUNT,
+                                particles=self.belief_particles, seed=self.belief_seed,
+                                settings=game.object_settings)
+        belief.replay(self.belief_observations)
+        return belief
+
+    def restore(self, progress) -> None:
+        """
+        Put the saved state into a game window that was made with make_game, make_bot
+            and make_belief, and an engine made from engine_state (the move log,
+            the player's slots and the window).
+
+        Parameters
+        ----------
+        progress: GameProgress
+            - The game window.
+        """
+        engine = progress.engine
+        engine.log = MoveLog(self.move_log) if self.move_log else None
+        if engine.log is not None:
+            progress.move_log = engine.log
+        # The engine dealt the player's cards in order, so they go back to their slots.
+        progress.player_hand.cards = []
+        for slot, card in enumerate(self.player_slots):
+            if card is not None:
+                progress.player_hand.add_card(card, slot)
+
+        (progress.points, progress.computer_points, progress.bot_correct_answers, progress.side_status,
+         progress.timer_seconds, progress.round, progress.round_counter_popup_click_count,
+         progress.theme_setting, player_answer_status, computer_answer_status, flags, played_slot,
+         last_swapped_position, bot_step_valid, bot_step_card) = self.window
+        progress.player_answer_status = None if player_answer_status == SaveGame.NO_VALUE else player_answer_status
+        progress.computer_answer_status = (None if computer_answer_status == SaveGame.NO_VALUE
+                                           else computer_answer_status)
+        progress.show_popup = bool(flags & 1)
+        progress.show_remove_page = bool(flags & 2)
+        progress.show_remove_page_mode = bool(flags & 4)
+        progress.adaptive_difficulty = bool(flags & 8)
+        progress.played_slot = None if played_slot == SaveGame.NO_VALUE else played_slot
+        progress.last_swapped_position = None if last_swapped_position == SaveGame.NO_VALUE else last_swapped_position
+        progress.bot_step = (None if bot_step_valid == SaveGame.NO_VALUE else
+                             Step(bool(bot_step_valid),
+                                  None if bot_step_card == SaveGame.NO_VALUE else SaveGame.CARDS[bot_step_card]))
+        progress.word = engine.word.upper()
+        progress.word_cards = self.word_cards
+        progress.replaced_positions = self.replaced_positions
+        return None
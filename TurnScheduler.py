@@ -0,0 +1,113 @@
+"""
+Turn order of a game with any amount of seats: a ring of the seats that are still playing.
+"""
+
+
+class TurnScheduler:
+    """
+    The order that the seats play in, kept as a ring (each seat points to
+        the next and the previous seat still playing), so passing the turn
+        and taking a seat out of the game are O(1) however many seats
+        there are, and the seats that are out are never visited again.
+
+    Attributes
+    ----------
+    active: tuple[bool, ...]
+        - Whether each seat is still playing (a new tuple when a seat is
+            taken out, so snapshots of the game can share it).
+
+    seats_left: int
+        - How many seats are still playing.
+
+    _next_seats: list[int]
+        - The next seat still playing after each seat.
+
+    _previous_seats: list[int]
+        - The previous seat still playing before each seat.
+
+    Methods
+    -------
+    next_seat(seat):
+        - Return the seat that plays after a seat.
+
+    remove(seat):
+        - Take a seat out of the game.
+
+    last_seat():
+        - Return the only seat still playing (or None if there are more).
+
+    restore(active):
+        - Go back to the seats that were playing at some point.
+    """
+
+    def __init__(self, seats: int):
+        """
+        Construct all the necessary attributes for the TurnScheduler object.
+
+        Parameters
+        ----------
+        seats: int
+            - How many seats the game has (they play in order, and all of them start playing).
+        """
+        self.restore((True,) * seats)
+
+    def next_seat(self, seat: int) -> int:
+        """
+        Return the seat that plays after a seat.
+
+        Parameters
+        ----------
+        seat: int
+            - The seat (it can already be out of the game: the seat that
+                was after it when it was taken out is returned).
+        """
+        return self._next_seats[seat]
+
+    def remove(self, seat: int) -> None:
+        """
+        Take a seat out of the game (the seats on either side of it become neighbours).
+
+        Parameters
+        ----------
+        seat: int
+            - The seat.
+        """
+        if not self.active[seat]:
+            return None
+        previous_seat, next_seat = self._previous_seats[seat], self._next_seats[seat]
+        self._next_seats[previous_seat] = next_seat
+        self._previous_seats[next_seat] = previous_seat
+        self.active = self.active[:seat] + (False,) + self.active[seat + 1:]
+        self.seats_left -= 1
+        return None
+
+    def last_seat(self) -> int | None:
+        """
+        Return the only seat still playing, or None if more than one is.
+        """
+        if self.seats_left != 1:
+            return None
+        return self.active.index(True)
+
+    def restore(self, active: tuple[bool, ...]) -> None:
+        """
+        Go back to the seats that were playing at some point (e.g. from a snapshot of the game).
+
+        Parameters
+        ----------
+        active: tuple[bool, ...]
+            - Whether each seat is playing.
+        """
+        self.active = active
+        playing = [seat for seat, is_active in enumerate(active) if is_active]
+        self.seats_left = len(playing)
+        self._next_seats = [0] * len(active)
+        self._previous_seats = [0] * len(active)
+        for number, seat in enumerate(playing):
+            self._next_seats[seat] = playing[(number + 1) % len(playing)]
+            self._previous_seats[seat] = playing[number - 1]
+        for seat in range(len(active)):  # Seats that are out point to the next seat still playing.
+            if not active[seat]:
+                self._next_seats[seat] = next((later for later in playing if later > seat), playing[0] if playing
+                                              else seat)
+        return None
@@ -0,0 +1,90 @@
+"""
+Graph of words where two words are joined by an edge
+    when they differ by exactly one letter.
+"""
+
+
+class WordGraph:
+    """
+    A graph of words of the same length, where every edge joins
+        two words that differ by exactly one letter.
+
+    Attributes
+    ----------
+    words: list[str]
+        - All the words in the graph (sorted alphabetically).
+
+    word_ids: dict[str, int]
+        - The id of each word (its index in words).
+
+    _patterns: dict[str, list[str]]
+        - Words grouped by pattern (a word with one letter replaced
+            by "_"), so that all the neighbors of a word can be found
+            without comparing it to every other word.
+
+    _neighbors: dict[str, list[tuple[int, str, str]]]
+        - Cache of the neighbors that have already been looked up.
+
+    Methods
+    -------
+    neighbors(word):
+        - Return the position, the new letter and the new word
+            for every neighbor of a word.
+
+    edge_count():
+        - Return the number of edges in the graph.
+    """
+
+    def __init__(self, words):
+        """
+        Construct all the necessary attributes for the WordGraph object.
+
+        Parameters
+        ----------
+        words: Iterable[str]
+            - The words in the graph (all of the same length).
+        """
+        self.words = sorted(set(words))  # Sorted so that word ids are the same every time the graph is built.
+        self.word_ids = {word: word_id for word_id, word in enumerate(self.words)}
+        self._patterns = {}
+        for word in self.words:
+            for position in range(len(word)):
+                self._patterns.setdefault(self._pattern(word, position), []).append(word)
+        self._neighbors = {}
+
+    @staticmethod
+    def _pattern(word: str, position: int) -> str:
+        """
+        Return the word with the letter at the position replaced by "_".
+        """
+        return word[:position] + "_" + word[position + 1:]
+
+    def neighbors(self, word: str) -> list[tuple[int, str, str]]:
+        """
+        Return the position, the new letter and the new word
+            for every neighbor of a word (a neighbor is a word in
+            the graph with exactly one letter changed).
+
+        The word itself does not have to be in the graph.
+
+        Parameters
+        ----------
+        word: str
+            - The word to find the neighbors of.
+        """
+        neighbors = self._neighbors.get(word)
+        if neighbors is None:
+            neighbors = []
+            for position in range(len(word)):
+                for neighbor in self._patterns.get(self._pattern(word, position), ()):
+                    if neighbor != word:
+                        neighbors.append((position, neighbor[position], neighbor))
+            self._neighbors[word] = neighbors
+        return neighbors
+
+    def edge_count(self) -> int:
+        """
+        Return the number of edges in the graph.
+        """
+        # Each group of n words with the same pattern joins every pair of its words.
+        return sum(len(group) * (len(group) - 1) // 2 for group in self._patterns.values())
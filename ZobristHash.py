@@ -0,0 +1,326 @@
+"""
+Zobrist hashing of game positions (used as keys for caches and solved position tables).
+"""
+
+
+# Importing libraries and modules.
+import random
+
+from GameSettings import GameSettings
+
+
+_KEY_RANDOM = random.Random(0x5742)  # Fixed seed so that the keys never change.
+_MAX_WORD_LENGTH = 16  # The longest word that can be hashed.
+_CARD_KINDS = 27  # 26 letters and the star card.
+_MAX_COPIES = 64  # The most copies of one card that one owner can hold.
+_MAX_SEATS = 8  # The most seats a game can have (GameEngine.MAX_SEATS).
+
+
+class ZobristHash:
+    """
+    Zobrist-style 64-bit hash of a game position:
+        (current word, both hands as multisets, side to move, deck contents).
+
+    Every part of a position has its own random 64-bit key, and the hash of
+        a position is all of its keys XORed together. So when a move is
+        applied, only the keys of the parts that changed are XORed in or out,
+        and undoing the move is the exact same XORs.
+    The keys come from a fixed seed, so hashes are the same every time
+        the game runs (needed for tables that are stored in files).
+
+    Cards are numbered by GameSettings.card_index.
+
+    A game with any amount of seats (GameEngine.position_hash) is hashed
+        the same way: the current word, the hand of each seat (with the
+        owner number seat_owner(seat)) and the seat to move.
+
+    Attributes
+    ----------
+    BOT: int
+        - Owner number of the bots hand.
+
+    OPPONENT: int
+        - Owner number of the opponents hand.
+
+    DECK: int
+        - Owner number of the deck.
+
+    SEATS: int
+        - Owner number of the hand of the first seat of a game (the other seats follow it).
+
+    MAX_COPIES: int
+        - The most copies of one card that one owner can hold.
+
+    _letter_keys: list[list[int]]
+        - Key of each card in each position of the word.
+
+    _card_keys: list[list[list[int]]]
+        - Key of the n-th copy of each card for each owner.
+
+    _side_key: int
+        - Key that is in the hash when the opponent is to move.
+
+    _seat_keys: list[int]
+        - Key of each seat of a game, that is in the hash when the seat is to move.
+
+    Methods
+    -------
+    hash_word(word):
+        - Return the hash of a word.
+
+    hash_cards(owner, counts):
+        - Return the hash of a hand or deck (given as card counts).
+
+    hash_hand(owner, cards):
+        - Return the hash of a hand (given as a list of cards).
+
+    hash_position(word, bot_counts, opponent_counts, side, deck_counts):
+        - Return the hash of a whole position.
+
+    hash_game(word, hands, side):
+        - Return the hash of a game with any amount of seats.
+
+    seat_owner(seat):
+        - Return the owner number of the hand of a seat.
+
+    change_letter(position_hash, position, old_card, new_card):
+        - Return the hash after a letter of the word changes.
+
+    add_card(position_hash, owner, card, count_before):
+        - Return the hash after a card is added to a hand or the deck.
+
+    remove_card(position_hash, owner, card, count_before):
+        - Return the hash after a card is removed from a hand or the deck.
+
+    switch_side(position_hash):
+        - Return the hash after the side to move changes.
+
+    change_seat(position_hash, old_seat, new_seat):
+        - Return the hash of a game after the seat to move changes.
+    """
+
+    BOT = 0
+    OPPONENT = 1
+    DECK = 2
+    SEATS = 3
+    MAX_COPIES = _MAX_COPIES
+
+    _letter_keys = [[_KEY_RANDOM.getrandbits(64) for _ in range(_CARD_KINDS)] for _ in range(_MAX_WORD_LENGTH)]
+    # Copy 0 has no key (it is never in a hash), so that the n-th copy of a card uses key n.
+    _card_keys = [[[0] + [_KEY_RANDOM.getrandbits(64) for _ in range(_MAX_COPIES)] for _ in range(_CARD_KINDS)]
+                  for _ in range(3)]
+    _side_key = _KEY_RANDOM.getrandbits(64)
+    # The keys of the seats come after the others, so the keys of the bot, opponent and deck never change.
+    _card_keys += [[[0] + [_KEY_RANDOM.getrandbits(64) for _ in range(_MAX_COPIES)] for _ in range(_CARD_KINDS)]
+                   for _ in range(_MAX_SEATS)]
+    _seat_keys = [_KEY_RANDOM.getrandbits(64) for _ in range(_MAX_SEATS)]
+
+    @staticmethod
+    def hash_word(word: str) -> int:
+        """
+        Return the hash of a word.
+
+        Parameters
+        ----------
+        word: str
+            - The word (lowercase letters and star cards).
+        """
+        word_hash = 0
+        for position, card in enumerate(word):
+            word_hash ^= ZobristHash._letter_keys[position][GameSettings.card_index(card)]
+        return word_hash
+
+    @staticmethod
+    def hash_cards(owner: int, counts) -> int:
+        """
+        Return the hash of a hand or the deck.
+
+        Parameters
+        ----------
+        owner: int
+            - ZobristHash.BOT, ZobristHash.OPPONENT, ZobristHash.DECK or seat_owner(seat).
+
+        counts: Sequence[int]
+            - How many of each card the owner has (by card index).
+        """
+        cards_hash = 0
+        owner_keys = ZobristHash._card_keys[owner]
+        for card, count in enumerate(counts):
+            for copy in range(1, count + 1):
+                cards_hash ^= owner_keys[card][copy]
+        return cards_hash
+
+    @staticmethod
+    def hash_hand(owner: int, cards) -> int:
+        """
+        Return the hash of a hand (the same as hash_cards with its card counts).
+
+        Parameters
+        ----------
+        owner: int
+            - ZobristHash.BOT, ZobristHash.OPPONENT, ZobristHash.DECK or seat_owner(seat).
+
+        cards: Iterable[str]
+            - The cards of the hand (in any order).
+        """
+        counts = [0] * _CARD_KINDS
+        for card in cards:
+            counts[GameSettings.card_index(card.lower())] += 1
+        return ZobristHash.hash_cards(owner, counts)
+
+    @staticmethod
+    def hash_position(word: str, bot_counts, opponent_counts, side: int, deck_counts) -> int:
+        """
+        Return the hash of a whole position.
+
+        Parameters
+        ----------
+        word: str
+            - The current word.
+
+        bot_counts: Sequence[int]
+            - How many of each card the bot has.
+
+        opponent_counts: Sequence[int]
+            - How many of each card the opponent has.
+
+        side: int
+            - The side to move (ZobristHash.BOT or ZobristHash.OPPONENT).
+
+        deck_counts: Sequence[int]
+            - How many of each card are left in the deck.
+        """
+        position_hash = (ZobristHash.hash_word(word)
+                         ^ ZobristHash.hash_cards(ZobristHash.BOT, bot_counts)
+                         ^ ZobristHash.hash_cards(ZobristHash.OPPONENT, opponent_counts)
+                         ^ ZobristHash.hash_cards(ZobristHash.DECK, deck_counts))
+        if side == ZobristHash.OPPONENT:
+            position_hash ^= ZobristHash._side_key
+        return position_hash
+
+    @staticmethod
+    def hash_game(word: str, hands, side: int) -> int:
+        """
+        Return the hash of a game with any amount of seats.
+
+        Parameters
+        ----------
+        word: str
+            - The current word.
+
+        hands: Sequence[Iterable[str]]
+            - The cards of each seat.
+
+        side: int
+            - The seat to move.
+        """
+        game_hash = ZobristHash.hash_word(word) ^ ZobristHash._seat_keys[side]
+        for seat, cards in enumerate(hands):
+            game_hash ^= ZobristHash.hash_hand(ZobristHash.seat_owner(seat), cards)
+        return game_hash
+
+    @staticmethod
+    def seat_owner(seat: int) -> int:
+        """
+        Return the owner number of the hand of a seat (for add_card and remove_card).
+
+        Parameters
+        ----------
+        seat: int
+            - The seat.
+        """
+        return ZobristHash.SEATS + seat
+
+    @staticmethod
+    def change_letter(position_hash: int, position: int, old_card: int, new_card: int) -> int:
+        """
+        Return the hash after a letter of the word changes.
+
+        Parameters
+        ----------
+        position_hash: int
+            - The hash before the change.
+
+        position: int
+            - The position of the letter in the word.
+
+        old_card: int
+            - Card index of the letter that is replaced.
+
+        new_card: int
+            - Card index of the new letter.
+        """
+        keys = ZobristHash._letter_keys[position]
+        return position_hash ^ keys[old_card] ^ keys[new_card]
+
+    @staticmethod
+    def add_card(position_hash: int, owner: int, card: int, count_before: int) -> int:
+        """
+        Return the hash after a card is added to a hand or the deck.
+
+        Parameters
+        ----------
+        position_hash: int
+            - The hash before the card is added.
+
+        owner: int
+            - ZobristHash.BOT, ZobristHash.OPPONENT, ZobristHash.DECK or seat_owner(seat).
+
+        card: int
+            - Card index of the card.
+
+        count_before: int
+            - How many copies of the card the owner had before.
+        """
+        return position_hash ^ ZobristHash._card_keys[owner][card][count_before + 1]
+
+    @staticmethod
+    def remove_card(position_hash: int, owner: int, card: int, count_before: int) -> int:
+        """
+        Return the hash after a card is removed from a hand or the deck.
+
+        Parameters
+        ----------
+        position_hash: int
+            - The hash before the card is removed.
+
+        owner: int
+            - ZobristHash.BOT, ZobristHash.OPPONENT, ZobristHash.DECK or seat_owner(seat).
+
+        card: int
+            - Card index of the card.
+
+        count_before: int
+            - How many copies of the card the owner had before.
+        """
+        return position_hash ^ ZobristHash._card_keys[owner][card][count_before]
+
+    @staticmethod
+    def switch_side(position_hash: int) -> int:
+        """
+        Return the hash after the side to move changes.
+
+        Parameters
+        ----------
+        position_hash: int
+            - The hash before the side changes.
+        """
+        return position_hash ^ ZobristHash._side_key
+
+    @staticmethod
+    def change_seat(position_hash: int, old_seat: int, new_seat: int) -> int:
+        """
+        Return the hash of a game after the seat to move changes.
+
+        Parameters
+        ----------
+        position_hash: int
+            - The hash before the seat changes.
+
+        old_seat: int
+            - The seat that was to move.
+
+        new_seat: int
+            - The seat to move next.
+        """
+        return position_hash ^ ZobristHash._seat_keys[old_seat] ^ ZobristHash._seat_keys[new_seat]
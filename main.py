@@ -2,13 +2,20 @@
 # Combined by Jiaxi Huang (5670238) & Leen Alqurashi (5663960)
 
 # Import libraries
+import os
 import sys
 import math
+import time
 import pygame
+from BotBelief import OpponentBelief
 from BotFunctions import Bot
+from GameEngine import GameEngine, Move
+from MoveLog import MoveLog
 from GameFunctions import Game
 from GameSettings import GameSettings
+from Hand import Hand
 from NotificationBar import NotificationBar
+from SaveGame import SaveGame
 
 
 class GameProgress:
@@ -34,12 +41,22 @@ class GameProgress:
             Current round number.
         side_status : int
             Current active player (0 for player, 1 for computer).
+        bot_pondering : bool
+            Whether the bot has started pondering on the player's turn
+            (so it is only started once when the turn starts).
         points : int
             Current player score.
         theme_setting : int
             Theme setting (0 for default theme, 1 for dark theme).
         sound_enabled : bool
             Whether sound is enabled.
+        adaptive_difficulty : bool
+            Whether the bot adapts its difficulty every turn to how far
+            ahead the player is (in cards).
+        FRAME_RATE : int
+            Frames per second of the game loop.
+        FRAME_MARGIN : int
+            Microseconds of each frame that the bot's search leaves free.
 
     Methods:
     --------
@@ -51,13 +68,30 @@ class GameProgress:
             Handle card selection events
         organize_cards():
             Rearrange card positions
-        add_penalty_card():
-            Draw new card from deck
+        add_penalty_card(penalty_card):
+            Put a penalty card in the player's hand
+        save_game():
+            Save the match to the save file
         run():
             Launch and maintain main game loop
     """
 
-    def __init__(self):
+    FRAME_RATE = 60  # Frames per second.
+    FRAME_MARGIN = 1000  # Microseconds of each frame that the bot's search leaves free.
+
+    def __init__(self, seed=None, adaptive_difficulty=False, saved_game=None):
+        """
+        Set up the game window, the deck, the hands and the bot.
+
+        Parameters:
+            seed (int | str | None): Seed of the game's random stream
+                (the bot gets a child stream of it). The same seed
+                replays the same deck, words and bot choices.
+            adaptive_difficulty (bool): Whether the bot adapts its
+                difficulty every turn to how far ahead the player is (in cards).
+            saved_game (SaveGame | None): A saved match to resume
+                (straight onto the board, without loading the words file).
+        """
         # Initialize pygame.
         pygame.init()
         pygame.mixer.init()
@@ -71,50 +105,58 @@ class GameProgress:
         pygame.display.set_caption("Word Battle")
 
         # Initialize game logic and settings.
-        self.logic = Game()
-        self.game_settings = GameSettings()
+        # The rules of the match come from the rule profile that was picked (or the one it was saved with).
+        if saved_game is not None:
+            GameSettings.use_profile(saved_game.profile)
+        self.logic = Game(seed) if saved_game is None else saved_game.make_game()
+        self.game_settings = self.logic.object_settings
+        # The words are made ready for saving now, so saving the match is quick.
+        SaveGame.prepare(self.logic)
         self.notification = NotificationBar(
             self.screen_width, self.screen_height
         )
 
-        # Prepare card deck.
-        self.card_stack = self.logic.card_stack()
-        self.deck = self.card_stack
+        # Initialize the bot.
+        if saved_game is None:
+            self.bot = Bot(Bot.Difficulty.EASY, seed=self.logic.random.spawn()[0],
+                           settings=self.game_settings)
+        else:
+            self.bot = saved_game.make_bot()
+
+        # Start the game engine (the rules of the game), which
+        # prepares the deck, passes the cards and picks the word
+        # (or carries on from the saved match).
+        # Every step of the game is kept in a binary move log.
+        self.player_hand = Hand()
+        self.move_log = MoveLog()
+        self.match_ended = False
+        self.engine = GameEngine(
+            hands=[self.player_hand, self.bot], game=self.logic,
+            log=self.move_log,
+            state=None if saved_game is None else saved_game.engine_state
+        )
         print(f"\n[__init__] --- Game Initialization in progress ---")
-        print(f"[__init__] Initial Deck content:", self.card_stack)
+        print(f"[__init__] Seed: {self.logic.random.seed_key}")
+        print(f"[__init__] Initial Deck content:", self.deck)
 
-        # Initialize the word generator.
-        self.word = self.logic.word_generator().upper()
-        self.word_cards = list(self.word)
-        self.word = self.logic.word_generator().upper()
+        self.word = self.engine.word.upper()
         self.word_cards = list(self.word)
 
-        # Pass cards for player 1 and player 2.
-        self.player_cards_initial = [
-            self.card_stack.pop().upper()
-            for _ in range(self.game_settings.START_CARDS_AMOUNT)
-        ]
-        print(f"[__init__] Player's Cards: {self.player_cards_initial}")
+        print(f"[__init__] Player's Cards: {self.player_hand.cards}")
+        print(f"[__init__] Computer's Cards: {self.bot.cards}")
 
-        self.computer_cards_initial = [
-            self.card_stack.pop().lower()
-            for _ in range(self.game_settings.START_CARDS_AMOUNT)
-        ]
-        print(f"[__init__] Computer's Cards: {self.computer_cards_initial}")
-
-        # Configure 15 card slots for the player.
-        self.player_cards = [''] * 15
-        for i in range(len(self.player_cards_initial)):
-            self.player_cards[i] = self.player_cards_initial[i]
-
-        # Set up card display positions.
+        # Set up card display positions (a slot for each card a hand can hold).
         self.card_positions = []
         self.player_card_x = 28
         self.player_card_y = 449
         self.player_card_width = 49
         self.player_card_spacing = 1
+        max_cards = self.game_settings.MAX_CARDS
+        # More slots than fit on the screen are made narrower.
+        if max_cards * (self.player_card_width + self.player_card_spacing) > self.screen_width - self.player_card_x:
+            self.player_card_width = (self.screen_width - self.player_card_x) // max_cards - self.player_card_spacing
 
-        for i in range(15):
+        for i in range(max_cards):
             self.card_positions.append(
                 (
                     self.player_card_x + i * (
@@ -126,7 +168,7 @@ class GameProgress:
         
         # Configure card click areas.
         self.card_click_areas = []
-        for i in range(15):
+        for i in range(max_cards):
             x = self.player_card_x + i * (
                     self.player_card_width + self.player_card_spacing
             )
@@ -135,14 +177,25 @@ class GameProgress:
                 (x, y, self.player_card_width, self.player_card_width)
             )
 
-        # Initialize the bot.
-        self.bot = Bot(Bot.Difficulty.EASY, self.computer_cards_initial)
+        # What the bot believes the player's hand is (updated from the player's plays, penalties and discards).
+        # Its samples come from a stream of the game, so a seed plays the same game every time.
+        if saved_game is None:
+            self.opponent_belief = OpponentBelief(
+                self.logic.words, self.game_settings.START_CARDS_AMOUNT,
+                seed=self.logic.random.spawn()[0].getrandbits(64),
+                settings=self.game_settings
+            )
+        else:
+            self.opponent_belief = saved_game.make_belief(self.logic)
 
         # Configure initial variables.
+        self.adaptive_difficulty = adaptive_difficulty
         self.points = 1
         self.side_status = 0
+        self.bot_pondering = False
         self.computer_points = 0
         self.bot_correct_answers = 0
+        self.bot_step = None
         self.theme_setting = 0
         self.player_answer_status = None
         self.computer_answer_status = None
@@ -319,8 +372,8 @@ class GameProgress:
             "data/font/AaHuanMengKongJianXiangSuTi-2.ttf", self.font_size_word
         )
 
-        #Configure first-hand player.
-        self.value = self.logic.coin_flip()
+        #Configure first-hand player (the engine tossed the coin).
+        self.value = "Head" if self.engine.side == 0 else "Tail"
         print(f"[__init__] {self.value}")
 
         if self.value == "Head":
@@ -345,6 +398,8 @@ class GameProgress:
         self.timer_event = pygame.USEREVENT + 1
         self.timer_seconds = self.game_settings.TURN_TIME_LIMIT
         pygame.time.set_timer(self.timer_event, 1000)
+        # When the turn started (for the time each answer took in the move log).
+        self.turn_start_ticks = pygame.time.get_ticks()
 
         # Configure popup.
         self.popup_side_changer_width = 800
@@ -393,24 +448,22 @@ class GameProgress:
         self.popup_bot_difficulty_medium_button_rect = pygame.Rect(self.screen_width // 2 - 50, self.screen_height // 2 + 10, self.popup_bot_difficulty_difficulty_button_width, self.popup_bot_difficulty_difficulty_button_height)
         self.popup_bot_difficulty_hard_button_rect = pygame.Rect(self.screen_width // 2 + 70, self.screen_height // 2 + 10, self.popup_bot_difficulty_difficulty_button_width, self.popup_bot_difficulty_difficulty_button_height)
 
-        # Configure word.
-        self.word_card_1 = self.word_cards[0]
-        self.word_card_2 = self.word_cards[1]
-        self.word_card_3 = self.word_cards[2]
-        self.word_cards = [self.word_card_1, self.word_card_2, self.word_card_3]
+        # Configure word (a card for each letter, centred where the three letter word is).
+        word_length = self.game_settings.WORD_LENGTH
         self.word_card_positions = []
-        self.word_card_x = 256
         self.word_card_y = 110
         self.word_card_width = 95
         self.word_card_spacing = 5
-        for i in range(3):
-            self.word_card_positions.append((self.word_card_x + i * (self.word_card_width + self.word_card_spacing), self.word_card_y))
-            self.word_click_areas = []
-            for i in range(3):
-                x = self.word_card_x + i * (self.word_card_width + self.word_card_spacing)
-                y = self.word_card_y
-                self.word_click_areas.append((x, y, self.word_card_width, self.word_card_width))
-                self.selected_word_cards = []
+        self.word_card_center_x = 403
+        self.word_card_x = self.word_card_center_x - (
+            word_length * (self.word_card_width + self.word_card_spacing) - self.word_card_spacing) // 2
+        self.word_click_areas = []
+        self.selected_word_cards = []
+        for i in range(word_length):
+            x = self.word_card_x + i * (self.word_card_width + self.word_card_spacing)
+            y = self.word_card_y
+            self.word_card_positions.append((x, y))
+            self.word_click_areas.append((x, y, self.word_card_width, self.word_card_width))
 
         # Configure side text box
         self.side_text = None
@@ -418,13 +471,11 @@ class GameProgress:
         
         # Configure selected cards
         self.selected_card = []
-        self.original_cards = []
         self.replaced_positions = []
-        self.star_card_active = False
         self.last_swapped_position = None
-        self.used_card_positions = list(range(7, 15))
-        self.previous_word_cards = self.word_cards.copy()
-        self.previous_used_card_positions = self.used_card_positions.copy()
+        # Slot of the card that the player put in the word this turn (it stays
+        # in the hand until the engine plays it).
+        self.played_slot = None
 
         # Configure points
         self.point_maximum = 3
@@ -482,9 +533,19 @@ class GameProgress:
         self.update_popup_text()
         print(f"[__init__] Popup text (All) updated")
 
+        if saved_game is not None:
+            self.resume_game(saved_game)
+
         # Initial section end marker
         print(f"[__init__] --- Game initialization completed ---\n")
 
+    @property
+    def deck(self):
+        """
+        The cards left in the deck (kept by the game engine).
+        """
+        return self.engine.deck
+
     def update_side_text(self):
         """
         Update the display text for current active player.
@@ -531,66 +592,37 @@ class GameProgress:
             self.popup_side_changer_text = self.popup_side_changer_text_computer
             print(f"[update_popup_text] Popup text (Computer) updated")
 
-    def add_penalty_card(self):
+    def add_penalty_card(self, penalty_card):
         """
-        Draw a random card from the deck and add it to player's hand.
+        Note a penalty card that the engine gave the player.
 
-        Selects a random letter from the remaining cards in the deck
-        that aren't already in the player's hand. The card is then
-        placed in the first available empty slot in the player's hand.
+        The engine puts the card in the first empty slot
+        of the player's hand.
 
-        Returns:
-            str: The letter drawn from the deck, or None if no cards remain.
+        Parameters:
+            penalty_card : str | None
+                The card drawn from the deck (None if no cards remain).
         """
-        if self.player_answer_status == 0 or self.computer_answer_status == 0:
-            penalty_card = self.deck.pop()
-            print(f"[add_penalty_card] Penalty card {penalty_card} generated")
-
-            if self.side_status == 0:
-                for i in range(1, 15):
-                    if self.player_cards[i] == '':
-                        self.player_cards[i] = penalty_card.upper()
-                        print(f"[add_penalty_card] Penalty card is added to player's cards")
-                        if i in self.used_card_positions:
-                            self.used_card_positions.remove(i)
-                        break
-            return penalty_card
-
-        else:
+        if penalty_card is None:
             print(f"[add_penalty_card] No remaining card in Deck.")
-            return None
+            return
+
+        print(f"[add_penalty_card] Penalty card {penalty_card} generated")
+        self.opponent_belief.observe_penalty()
+        print(f"[add_penalty_card] Penalty card is added to player's cards")
 
     def organize_cards(self):
         """
         Rearrange cards to fill empty spaces in the player's hand.
 
-        Moves all non-empty cards forward to fill any gaps, maintaining
-        their relative order. Updates the used card positions list and
-        saves the previous state for potential rollback.
+        Moves all cards to the first slots in alphabetical order.
         """
-        new_previous_cards = [''] * len(self.player_cards)
-        non_empty_cards = []
-
-        for i in range(len(self.player_cards)):
-            if self.player_cards[i] != '' and i not in self.used_card_positions:
-                non_empty_cards.append(self.player_cards[i])
-
-        for i, card in enumerate(non_empty_cards):
-            if i < len(new_previous_cards):
-                new_previous_cards[i] = card
-
-        self.player_cards = new_previous_cards
-        self.used_card_positions = [
-            i for i in range(len(self.player_cards))
-            if i >= len(non_empty_cards) or self.player_cards[i] == ''
-        ]
-        self.previous_word_cards = self.word_cards.copy()
-        self.previous_used_card_positions = self.used_card_positions.copy()
+        self.player_hand.organize()
+        self.played_slot = None
 
         print(f"[organize_cards] Cards (Player) organizing completed")
-        print(f"[organize_cards] Current Cards (Player): {self.player_cards}")
-        print(f"[organize_cards] Used Position (Player): {self.used_card_positions}")
-        print(f"[organize_cards] Used Position (Player): {len(self.used_card_positions)}")
+        print(f"[organize_cards] Current Cards (Player): {self.player_hand.cards}")
+        print(f"[organize_cards] Cards (Player): {len(self.player_hand)}")
 
     def update_theme(self):
         """
@@ -769,20 +801,17 @@ class GameProgress:
             - Updates click areas for each visible card.
             - Maintains consistent spacing between cards.
 
-        Card positions are calculated using:
-            - Total screen width.
-            - Number of unused cards.
-            - Card width and spacing.
-            - Historical card usage data.
+        Only the slots of the hand that hold a card are visited.
         """
-        for i, pos in enumerate(self.card_positions[:self.game_settings.MAX_CARDS]):
+        for i, card in self.player_hand.slots():
 
             # Only draw unused cards.
-            if i not in self.used_card_positions:
+            if i != self.played_slot and i < len(self.card_positions):
+                pos = self.card_positions[i]
                 letter_text = self.font_cards.render(
-                    self.player_cards[i], True, self.color_text_cards
+                    card.upper(), True, self.color_text_cards
                 )
-                text_x = pos[0] + 25 - letter_text.get_width() // 2
+                text_x = pos[0] + (self.player_card_width + 1) // 2 - letter_text.get_width() // 2
                 text_y = pos[1] + 25 - letter_text.get_height() // 2
                 self.screen.blit(letter_text, (text_x, text_y))
 
@@ -793,7 +822,8 @@ class GameProgress:
             if isinstance(letter, tuple):
                 position, letter = letter
                 text_x = (
-                        self.card_positions[position][0] + 25 - font.size(letter)[0] // 2
+                        self.card_positions[position][0] + (self.player_card_width + 1) // 2
+                        - font.size(letter)[0] // 2
                 )
             else:
                 text_x = self.screen_width - 150 + i * 20
@@ -804,10 +834,13 @@ class GameProgress:
             self.screen.blit(letter_text, (text_x, start_y))
 
     def draw_card_overlay(self):
-        for i, pos in enumerate(self.card_positions[:self.game_settings.MAX_CARDS]):
-            if i in self.used_card_positions:
-                rect = pygame.Rect(pos[0], pos[1] - 10, 49, 70)
-                pygame.draw.rect(self.screen, self.color_card_overlay, rect)
+        overlay_slots = list(self.player_hand.empty_slots(len(self.card_positions)))
+        if self.played_slot is not None:
+            overlay_slots.append(self.played_slot)
+        for i in overlay_slots:
+            pos = self.card_positions[i]
+            rect = pygame.Rect(pos[0], pos[1] - 10, self.player_card_width, 70)
+            pygame.draw.rect(self.screen, self.color_card_overlay, rect)
 
     def draw_coordinate_display(self):
         """
@@ -977,11 +1010,32 @@ class GameProgress:
             self.screen.blit(button_text, text_rect)
 
     def handle_bot_turn(self):
-        if self.side_status == 1 and not self.game_paused:
+        if (self.side_status == 0 and not self.game_paused
+                and not self.bot_pondering):
+            # The bot works out its replies while the player is thinking
+            # (started once, on the first frame of the player's turn),
+            # with the hands it believes the player has (it can't see
+            # the player's cards).
+            self.bot.ponder(
+                self.engine.word,
+                belief=self.opponent_belief
+            )
+            self.bot_pondering = True
+
+        elif (self.side_status == 1 and not self.game_paused
+                and self.bot_step is None):
             current_word = "".join(self.word_cards).lower()
             print(f"[handle_bot_turn] Current Word: {str(current_word).upper()}")
 
-            bot_output = self.bot.play_turn(current_word, self.timer_seconds)
+            player_cards = self.player_hand.cards
+            if self.adaptive_difficulty and not self.bot.ran_current_turn_code:
+                # The further the player is ahead (the fewer cards they hold
+                # than the bot), the harder the bot plays this turn.
+                self.bot.adapt(len(self.bot) - len(self.player_hand))
+            bot_output = self.bot.play_turn(
+                current_word, self.timer_seconds, player_cards, self.deck,
+                belief=self.opponent_belief
+            )
 
             match bot_output:
                 case self.bot.Output.THINKING:
@@ -999,18 +1053,18 @@ class GameProgress:
                     print(f"[handle_bot_turn] {bot_output} answered")
                     print(f"[handle_bot_turn] Computer Used Card:", computer_used_card)
 
-                    if computer_answer and computer_used_card:
-                        if computer_used_card in self.bot.cards:
-                            self.bot.cards.remove(computer_used_card)
-                            print(f"[handle_bot_turn] Card {computer_used_card} removed from Computer's Cards")
-                            print(f"[handle_bot_turn] Computer Cards (after removed Used Card): {self.bot.cards}")
-                        self.deck.append(computer_used_card)
-                        print(f"[handle_bot_turn] Card {computer_used_card} returned to Deck")
+                    # The engine checks the answer, and plays the card (or gives a penalty card).
+                    self.bot_step = self.engine.apply(
+                        Move(computer_answer, computer_used_card),
+                        self.turn_seconds()
+                    )
+                    print(f"[handle_bot_turn] Computer Cards (after answer): {self.bot.cards}")
 
                     self.timer_seconds = 0
 
-                    if self.computer_points == 3:
-                        self.bot.discard_card()
+                    while self.engine.discards_earned[1]:
+                        if not self.engine.discard(1, self.bot.choose_discard()):
+                            break
                         print(f"[handle_bot_turn] Computer discarded a Card")
 
                     return
@@ -1161,11 +1215,75 @@ class GameProgress:
 
         return True
     
+    def turn_seconds(self):
+        """
+        Return how many seconds the current turn has taken so far.
+        """
+        return (pygame.time.get_ticks() - self.turn_start_ticks) / 1000
+
+    def end_match(self):
+        """
+        Write the move log of the game to its file once the game is over
+        (e.g. to replay it for a bug report), and remove the saved match
+        (it can't be resumed any more).
+        """
+        if not self.match_ended:
+            self.move_log.save(self.game_settings.MOVE_LOG_FILE_NAME)
+            self.match_ended = True
+            print(f"[end_match] Move log saved ({len(self.move_log)} "
+                  f"events, {len(bytes(self.move_log))} bytes)")
+            if os.path.exists(self.game_settings.SAVE_FILE_NAME):
+                os.remove(self.game_settings.SAVE_FILE_NAME)
+
+    def match_in_progress(self):
+        """
+        Return whether a match is being played (the board is shown and
+        nobody has won yet).
+        """
+        return (self.engine.winner is None and
+                not (self.show_welcome_page or self.show_rules_page or
+                     self.show_options_page or self.show_credits_page or
+                     self.show_popup_bot_difficulty or
+                     self.show_player_first_page or
+                     self.show_computer_first_page))
+
+    def save_game(self):
+        """
+        Save the match to the save file (e.g. when the window is closed),
+        so it can be resumed with --resume.
+        """
+        start = time.perf_counter()
+        SaveGame.save(self, self.game_settings.SAVE_FILE_NAME)
+        print(f"[save_game] Match saved in "
+              f"{(time.perf_counter() - start) * 1000:.3f} ms")
+
+    def resume_game(self, saved_game):
+        """
+        Put a saved match on the board: the engine, the hands, the
+        timer, the points and the bot's turn, skipping the welcome pages.
+
+        Args:
+            saved_game : SaveGame
+                The saved match (its game and bot made this window).
+        """
+        saved_game.restore(self)
+        self.show_welcome_page = False
+        self.game_paused = self.show_popup or self.show_remove_page
+        pygame.time.set_timer(self.timer_event,
+                              0 if self.game_paused else 1000)
+        self.turn_start_ticks = pygame.time.get_ticks()
+        self.update_theme()
+        self.update_side_text()
+        self.update_popup_text()
+        print(f"[resume_game] Match resumed: {self.word}, "
+              f"Player's Cards: {self.player_hand.cards}")
+
     def check_victory_condition(self):
         """
         Check if the player has won the game.
 
-        Victory occurs when all card positions are used (no cards left).
+        Victory occurs when the player has no cards left, or the computer
+        holds the maximum amount of cards.
         When victory is achieved, displays the victory page
         and stops the timer.
 
@@ -1173,8 +1291,8 @@ class GameProgress:
             bool:
                 True if victory condition is met, False otherwise.
         """
-        if (len(self.used_card_positions) == 15 or
-                len(self.bot.cards) == 15):
+        if self.engine.winner == 0:
+            self.end_match()
             self.show_victory_page = True
             self.game_paused = True
             pygame.time.set_timer(self.timer_event, 0)
@@ -1186,15 +1304,16 @@ class GameProgress:
         """
         Check if the player has lost the game.
 
-        Defeat occurs when there are no used card positions (all positions filled).
+        Defeat occurs when the player holds the maximum amount of cards,
+        or the computer has no cards left.
         When defeat is detected, displays the defeat page and stops the timer.
 
         Returns:
             bool:
                 True if failure condition is met, False otherwise.
         """
-        if (len(self.used_card_positions) == 0 or
-                len(self.bot.cards) == 0):
+        if self.engine.winner == 1:
+            self.end_match()
             self.show_defeat_page = True
             self.game_paused = True
             pygame.time.set_timer(self.timer_event, 0)
@@ -1224,27 +1343,53 @@ class GameProgress:
         Side effects:
             - Updates self.selected_card when a valid card is clicked.
         """
+        i = self.card_slot_at(mouse_x, mouse_y)
+        card = self.player_hand.card_at(i) if i is not None else None
+
         if self.show_remove_page:
-            for i, (x, y, width, height) in enumerate(self.card_click_areas):
-                if x <= mouse_x <= x + width and y <= mouse_y <= y + height:
-                    if i not in self.used_card_positions:
-                        self.selected_card = [(i, self.player_cards[i])]
-                        self.show_popup_remove = True
-                        return True
+            if card is not None:
+                self.selected_card = [(i, card.upper())]
+                self.show_popup_remove = True
+                return True
             return False
 
         if self.side_status != 0 or self.game_paused:
             return
 
-        for i, (x, y, width, height) in enumerate(self.card_click_areas):
-            if x <= mouse_x <= x + width and y <= mouse_y <= y + height:
-                if i not in self.used_card_positions:
-                    selected_card = self.player_cards[i]
-                    self.selected_card = [(i, selected_card)]
-                    print(f"[handle_card_click] Selected Card: {selected_card}")
-                    return True
+        if card is not None and i != self.played_slot:
+            selected_card = card.upper()
+            self.selected_card = [(i, selected_card)]
+            print(f"[handle_card_click] Selected Card: {selected_card}")
+            return True
         return False
 
+    def card_slot_at(self, mouse_x, mouse_y):
+        """
+        Return the card slot under a mouse position.
+
+        The card click areas are in one row with the same spacing,
+        so the slot is worked out from the position directly.
+
+        Parameters:
+            mouse_x : int
+                X coordinate of mouse click.
+            mouse_y : int
+                Y coordinate of mouse click.
+
+        Returns:
+            int | None:
+                The slot, or None if the position is not on a card.
+        """
+        i = (mouse_x - self.player_card_x) // (
+            self.player_card_width + self.player_card_spacing
+        )
+        if not 0 <= i < len(self.card_click_areas):
+            return None
+        x, y, width, height = self.card_click_areas[i]
+        if x <= mouse_x <= x + width and y <= mouse_y <= y + height:
+            return i
+        return None
+
     def handle_word_click(self, mouse_x, mouse_y):
         """
         Handle letter swapping in the current word.
@@ -1280,8 +1425,7 @@ class GameProgress:
                             return False
 
                         # Check if the letters are the same as those in the original word.
-                        if (previous_card.lower() ==
-                                self.previous_word_cards[i].lower()):
+                        if previous_card.lower() == self.engine.word[i]:
                             print(f"[handle_word_click] Cannot replace same "
                                   f"card：{previous_card}")
                             self.notification.show_message_box(
@@ -1301,26 +1445,22 @@ class GameProgress:
                         # Handle previous swap.
                         elif self.last_swapped_position is not None:
                             if self.last_swapped_position == i:
-                                if self.used_card_positions:
-                                    last_card_position = self.used_card_positions.pop()
+                                if self.played_slot is not None:
                                     print(f"[handle_word_click] Restored "
-                                          f"Previous Card at Position {last_card_position}")
+                                          f"Previous Card at Position {self.played_slot}")
+                                    self.played_slot = None
 
-                            # Different position swap.
+                            # Different position swap (the engine still holds the word of the turn).
                             else:
-                                self.word_cards[self.last_swapped_position] = self.original_cards[
-                                    self.last_swapped_position]
-                                if self.used_card_positions:
-                                    last_card_position = self.used_card_positions.pop()
+                                self.word_cards[self.last_swapped_position] = self.engine.word[
+                                    self.last_swapped_position].upper()
+                                if self.played_slot is not None:
                                     print(f"[handle_word_click] Restored Card "
-                                          f"at Position {last_card_position}")
+                                          f"at Position {self.played_slot}")
+                                    self.played_slot = None
                                 print(f"[handle_word_click] Restored Position "
                                       f"{self.last_swapped_position} to "
-                                      f"{self.original_cards[self.last_swapped_position]}")
-
-                        # Store original cards.
-                        elif not self.original_cards:
-                            self.original_cards = self.word_cards.copy()
+                                      f"{self.word_cards[self.last_swapped_position]}")
 
                         # Update_Current_Word
                         self.word_cards[i] = previous_card
@@ -1331,17 +1471,39 @@ class GameProgress:
 
                         # Update swap status.
                         self.last_swapped_position = i
-                        self.used_card_positions.append(card_position)
+                        self.played_slot = card_position
                         self.selected_card = []
                     return True
             return False
 
+    def player_move(self):
+        """
+        Return the player's move: the word they made and the card they used.
+
+        A star card move keeps the star card in the word
+        (the engine makes a new word for it).
+
+        Returns:
+            Move:
+                The new word and the card that changed it (no card if
+                the player didn't change exactly one letter).
+        """
+        current_word_str = ''.join(self.word_cards).lower()
+        changed_cards = [
+            card for card, word_card in zip(current_word_str, self.engine.word)
+            if card != word_card
+        ]
+        if len(changed_cards) != 1:
+            return Move(current_word_str, "")
+        return Move(current_word_str, changed_cards[0])
+
     def check_word_validity(self):
         """
-        Verify if the current word exists in the dictionary.
+        Let the game engine check the current answer.
 
-        Uses GameFunctions' check_exists function to verify
-        if the player's word is valid.
+        For the player, the engine plays their move; for the computer,
+        the engine has already played its answer (or it gets a penalty
+        card now if it didn't answer).
         If valid:
             - Sets player_answer_status to 1.
             - Sets computer_answer_status to 1.
@@ -1349,72 +1511,50 @@ class GameProgress:
         If invalid:
             - Sets player_answer_status to 0.
             - Sets computer_answer_status to 0.
-            - Restores previous state.
+            - Restores previous state and adds the penalty card.
         """
-        current_word_str = ''.join(self.word_cards).lower()
-        previous_word_str = ''.join(self.previous_word_cards).lower()
-
-        if self.logic.check_exists(current_word_str, previous_word_str):
-            if self.side_status == 0:
+        if self.side_status == 0:
+            move = self.player_move()
+            step = self.engine.apply(move, self.turn_seconds())
+            if step.valid:
                 self.player_answer_status = 1
                 self.notification.show_message_box("VALID WORD")
-                replaced_card = None
-
-                for i, card in enumerate(self.word_cards):
-                    if card != self.previous_word_cards[i]:
-                        replaced_card = card
-                        print(f"[check_word_validity] Player's Used Card: {card}")
-                        self.deck.append(card.lower())
-                        print(f"[check_word_validity] {card} returned to deck")
+                print(f"[check_word_validity] Player's Used Card: {move.card}")
+                self.opponent_belief.observe_play(move.card)
+                print(f"[check_word_validity] {move.card} put on the discard pile")
 
-                self.previous_word_cards = self.word_cards.copy()
-                self.previous_used_card_positions = self.used_card_positions.copy()
+                self.played_slot = None
                 print(f"[check_word_validity] Answer checked (Player): "
                       f"{self.player_answer_status}")
-
-            elif self.side_status == 1:
-                if self.bot.current_turn_will_answer_or_not:
-                    if not self.bot.current_turn_answer == None:
-                        self.computer_answer_status = 1
-                        print(f"[check_word_validity] Answer checked (Computer "
-                              f"answered and not NONE): "
-                              f"{self.computer_answer_status}")
-                        self.notification.show_message_box("VALID WORD")
-                    else:
-                        self.computer_answer_status = 0
-                        print(f"[check_word_validity] Answer checked (Computer "
-                              f"answered but NONE): "
-                              f"{self.computer_answer_status}")
-                        new_card = self.deck.pop()
-                        self.bot.add_card(new_card)
-                        print(f"[handle_bot_turn] Computer got a penalty card: {new_card}")
-                        self.notification.show_message_box("NO WORD CHANGED")
-                else:
-                    self.computer_answer_status = 0
-                    print(f"[check_word_validity] Answer checked (Computer "
-                          f"did not answer): "
-                          f"{self.computer_answer_status}")
-                    new_card = self.deck.pop()
-                    self.bot.add_card(new_card)
-                    print(f"[handle_bot_turn] Computer got a penalty card: "
-                          f"{new_card}")
-                    self.notification.show_message_box("NO WORD CHANGED")
-
-        else:
-            if self.side_status == 0:
+            else:
                 self.player_answer_status = 0
                 self.notification.show_message_box("INVALID WORD")
-                self.word_cards = self.previous_word_cards.copy()
-                self.used_card_positions = (
-                    self.previous_used_card_positions.copy()
-                )
+                # The engine keeps the word of the turn after an invalid move.
+                self.word_cards = list(self.engine.word.upper())
+                self.played_slot = None
+                self.add_penalty_card(step.penalty_card)
                 print(f"[check_word_validity] Answer Checked (Player): "
                       f"{self.player_answer_status}")
 
-            elif self.side_status == 1:
+        elif self.side_status == 1:
+            if self.bot_step is None:
+                # The computer did not answer in time.
+                step = self.engine.timeout(self.turn_seconds())
+            else:
+                step = self.bot_step
+            self.bot_step = None
+
+            if step.valid:
+                self.computer_answer_status = 1
+                self.notification.show_message_box("VALID WORD")
+            else:
                 self.computer_answer_status = 0
-                print(f"[check_word_validity] Answer checked (Computer): "
-                      f"{self.computer_answer_status}")
+                self.word_cards = list(self.engine.word.upper())
+                print(f"[handle_bot_turn] Computer got a penalty card: "
+                      f"{step.penalty_card}")
+                self.notification.show_message_box("NO WORD CHANGED")
+            print(f"[check_word_validity] Answer checked (Computer): "
+                  f"{self.computer_answer_status}")
 
     def handle_timer_event(self):
         """
@@ -1422,7 +1562,7 @@ class GameProgress:
 
         Manages the game timer, round transitions, and updates game state.
         when timer runs out. Includes:
-            - Countdown management (15 seconds per turn).
+            - Countdown management (TURN_TIME_LIMIT seconds per turn).
             - Round completion logging.
             - Card usage history tracking.
             - Player turn switching.
@@ -1440,16 +1580,20 @@ class GameProgress:
             if self.side_status == 0:
                 print(f"[handle_timer_event] Current Word:", self.word_cards)
                 print(f"[handle_timer_event] Previous Word:",
-                      self.previous_word_cards)
+                      self.engine.word.upper())
 
                 if not self.show_remove_page and not self.show_remove_page_mode:
-                    if self.word_cards == self.previous_word_cards:
+                    if ''.join(self.word_cards).lower() == self.engine.word:
                         print(f"[handle_timer_event] No Word changed")
                         print(f"[handle_timer_event] Answer Checked (Player "
                               f"did not change Word): {self.player_answer_status}")
                         self.notification.show_message_box("NO WORD CHANGED")
                         self.player_answer_status = 0
-                        self.add_penalty_card()
+                        self.opponent_belief.observe_missed_turn(
+                            self.engine.word.upper()
+                        )
+                        step = self.engine.timeout(self.turn_seconds())
+                        self.add_penalty_card(step.penalty_card)
                         self.update_side_text()
                         self.update_popup_text()
                         pass
@@ -1464,8 +1608,6 @@ class GameProgress:
                             print(f"[handle_timer_event] Points (Player) added one")
                             print(f"[handle_timer_event] Points (Player): "
                                   f"{self.points}")
-                        elif self.player_answer_status == 0:
-                            self.add_penalty_card()
 
                         self.update_popup_text()
                         print(f"[handle_timer_event] Popup Text (All) Updated.")
@@ -1492,17 +1634,17 @@ class GameProgress:
                   f"(Invalid-0 Valid-1): {self.computer_answer_status}")
 
             self.side_status = 1 - self.side_status
+            self.bot_pondering = False  # A new turn, so the bot ponders again on the player's next turn.
             self.check_failure_condition()
             self.check_victory_condition()
             self.timer_seconds = self.game_settings.TURN_TIME_LIMIT
 
-            if (self.points == 0 or self.points == 1 or
-                    self.points == 2 or self.points == 3):
+            if not self.engine.discards_earned[0] or self.engine.winner is not None:
                 self.show_popup = True
                 self.game_paused = True
                 pygame.time.set_timer(self.timer_event, 0)
 
-            elif self.points == 4:
+            else:
                 self.show_popup = False
                 self.show_remove_page = True
                 self.game_paused = True
@@ -1510,8 +1652,7 @@ class GameProgress:
                 print(f"[handle_timer_event] --- Remove Mode Enables ---")
                 print(f"[handle_timer_event] Remove Mode: Enable")
 
-            # Reset original letters and last swapped position at the end of each round.
-            self.original_cards = []
+            # Reset the last swapped position at the end of each round.
             self.last_swapped_position = None
 
     def handle_popup_click(self, pos):
@@ -1540,26 +1681,13 @@ class GameProgress:
                 # Shuffle the deck.
                 print(f"[handle_popup_click] Deck (before shuffled): "
                       f"{self.deck}")
-                self.deck = self.logic.fisher_shuffle(self.deck)
+                self.engine.shuffle()
                 print(f"[handle_popup_click] Deck (after shuffled): "
                       f"{self.deck}")
 
-                # Sort player cards.
-                valid_cards = []
-                valid_positions = []
-                for i in range(len(self.player_cards)):
-                    if (self.player_cards[i] and
-                            i not in self.used_card_positions):
-                        valid_cards.append(self.player_cards[i])
-                        valid_positions.append(i)
-
-                self.logic.quicksort(valid_cards)
-
-                for i, pos in enumerate(valid_positions):
-                    self.player_cards[pos] = valid_cards[i]
-
+                # The player's cards were sorted by organize_cards.
                 print(f"[handle_popup_click] Player's cards have been sorted: "
-                      f"{valid_cards}")
+                      f"{self.player_hand.cards}")
 
                 self.show_popup = False
                 self.game_paused = False
@@ -1569,16 +1697,12 @@ class GameProgress:
                 self.round = math.floor(
                     self.round_counter_popup_click_count / 2
                 )
+                self.turn_start_ticks = pygame.time.get_ticks()
 
-                if '*' in self.word_cards:
-                    self.star_card_active = True
-
-                # If the star card is activated, generate new word.
-                if self.star_card_active:
-                    self.word = self.logic.word_generator().upper()
+                # If a star card was played, the engine generated a new word.
+                if self.engine.word.upper() != ''.join(self.word_cards):
+                    self.word = self.engine.word.upper()
                     self.word_cards = list(self.word)
-                    self.previous_word_cards = self.word_cards.copy()
-                    self.star_card_active = False
                     print(f"[handle_popup_click] New word generated ('*' Card): "
                           f"{self.word}")
 
@@ -1608,13 +1732,14 @@ class GameProgress:
 
                     if (self.selected_card and
                             isinstance(self.selected_card[0], tuple)):
-                        position, _ = self.selected_card[0]
-                        self.used_card_positions.append(position)
+                        _, card = self.selected_card[0]
+                        if self.engine.discard(0, card):
+                            self.opponent_belief.observe_discard()
 
                     self.selected_card = []
                     self.show_popup_remove = False
                     self.show_remove_page = False
-                    self.points = 0
+                    self.points = 1
                     self.timer_seconds = self.game_settings.TURN_TIME_LIMIT
                     self.show_remove_page_mode = True
                     pygame.time.set_timer(self.timer_event, 1000)
@@ -1634,21 +1759,21 @@ class GameProgress:
             if self.popup_bot_difficulty_easy_button_rect.collidepoint(
                     mouse_x, mouse_y):
                 self.button_sound.play()
-                self.bot = Bot(Bot.Difficulty.EASY, self.bot.cards)
+                self.bot.set_difficulty(Bot.Difficulty.EASY)
                 self.show_popup_bot_difficulty = False
                 print(f"[handle_popup_click] Computer Difficulty EASY")
 
             elif self.popup_bot_difficulty_medium_button_rect.collidepoint(
                     mouse_x, mouse_y):
                 self.button_sound.play()
-                self.bot = Bot(Bot.Difficulty.MEDIUM, self.bot.cards)
+                self.bot.set_difficulty(Bot.Difficulty.MEDIUM)
                 self.show_popup_bot_difficulty = False
                 print(f"[handle_popup_click] Computer Difficulty MEDIUM")
 
             elif self.popup_bot_difficulty_hard_button_rect.collidepoint(
                     mouse_x, mouse_y):
                 self.button_sound.play()
-                self.bot = Bot(Bot.Difficulty.HARD, self.bot.cards)
+                self.bot.set_difficulty(Bot.Difficulty.HARD)
                 self.show_popup_bot_difficulty = False
                 print(f"[handle_popup_click] Computer Difficulty HARD")
 
@@ -1687,6 +1812,7 @@ class GameProgress:
                     return False
 
                 if self.show_victory_page or self.show_defeat_page:
+                    self.bot.stop_search()  # The bot's search thread ends with the game.
                     pygame.quit()
                     sys.exit()
 
@@ -1722,19 +1848,10 @@ class GameProgress:
 
                                 # Self.notification.show_message_box("THE COIN IS HEAD").
                                 self.show_computer_first_page = False
-                                valid_cards = []
-                                valid_positions = []
-                                for i in range(len(self.player_cards)):
-                                    if (self.player_cards[i] and
-                                            i not in self.used_card_positions):
-                                        valid_cards.append(self.player_cards[i])
-                                        valid_positions.append(i)
-                                self.logic.quicksort(valid_cards)
-                                for i, pos in enumerate(valid_positions):
-                                    self.player_cards[pos] = valid_cards[i]
+                                self.player_hand.organize()
 
                                 print(f"[handle_events] Player's cards have been sorted: "
-                                      f"{valid_cards}")
+                                      f"{self.player_hand.cards}")
 
                             elif self.side_status == 1:
                                 self.show_player_first_page = False
@@ -1997,18 +2114,55 @@ class GameProgress:
 
         Continuously processes events and updates the display
         until the game is exited. Handles cleanup when the game ends.
+        The time left in each frame after drawing is given to the
+        bot's search.
         """
         running = True
+        clock = pygame.time.Clock()
+        frame_time = 1_000_000 / self.FRAME_RATE  # Microseconds in each frame.
 
         while running:
+            frame_start = time.perf_counter()
             running = self.handle_events()
             self.draw()
 
+            # The bot searches in whatever time is left of the frame
+            # (only when its search doesn't run in its own thread).
+            time_left = (frame_time - self.FRAME_MARGIN
+                         - (time.perf_counter() - frame_start) * 1_000_000)
+            if time_left > 0:
+                self.bot.advance_search(time_left)
+            clock.tick(self.FRAME_RATE)
+
+        self.bot.stop_search()  # The bot's search thread ends with the game (before its state is saved).
+        # A match that isn't over can be resumed later.
+        if self.match_in_progress():
+            self.save_game()
+
         # Quit pygame.
         pygame.mixer.music.stop()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = GameProgress()
+    # An optional seed (e.g. from a bug report) replays the same game,
+    # --adaptive makes the bot adapt its difficulty to the score,
+    # --resume resumes the match that was saved when the window closed, and
+    # --rules=<profile> plays a variant of the game (a rule profile, e.g. --rules=blitz).
+    arguments = [argument for argument in sys.argv[1:]
+                 if argument not in ("--adaptive", "--resume")
+                 and not argument.startswith("--rules=")]
+    for argument in sys.argv[1:]:
+        if argument.startswith("--rules="):
+            GameSettings.use_profile(argument[len("--rules="):])
+    saved_match = None
+    if "--resume" in sys.argv[1:]:
+        try:
+            saved_match = SaveGame.load(GameSettings().SAVE_FILE_NAME)
+        except FileNotFoundError:
+            print("There is no saved match to resume, so a new game is started.")
+        except ValueError as error:  # A file that was cut short or saved by another version.
+            print(f"The saved match can't be resumed ({error}), so a new game is started.")
+    game = GameProgress(arguments[0] if arguments else None,
+                        "--adaptive" in sys.argv[1:], saved_match)
     game.run()
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+Test setup: the games modules are at the top of the repository.
+"""
+
+
+# Importing libraries.
+import os
+import sys
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,88 @@
+"""
+The bot only searches hands drawn from its belief (never the opponents real cards) when it has a belief.
+"""
+
+
+# Importing libraries and modules.
+import os
+
+import pytest
+
+if not os.path.exists("data/word_frequencies_json.txt"):  # The game files are read from the working directory.
+    pytest.skip("the game files (data/word_frequencies_json.txt) are not in the working directory",
+                allow_module_level=True)
+
+from BotBelief import OpponentBelief
+from BotFunctions import Bot
+from BotSearch import AnytimeSearch
+from GameFunctions import Game
+
+
+# A hand that a belief made from a deck can't draw (there aren't five z cards in a deck).
+TRUE_OPPONENT_CARDS = ["z", "z", "z", "z", "z"]
+
+
+@pytest.fixture
+def game() -> Game:
+    """
+    Return a game with a fixed seed.
+    """
+    return Game(7)
+
+
+@pytest.fixture
+def belief(game: Game) -> OpponentBelief:
+    """
+    Return a belief about a hand of five cards that records every hand it draws.
+    """
+    opponent_belief = OpponentBelief(game.words, len(TRUE_OPPONENT_CARDS), particles=200, seed=3,
+                                     settings=game.object_settings)
+    opponent_belief.drawn_hands = []
+    sample_hands = opponent_belief.sample_hands
+
+    def recording_sample_hands(amount: int) -> list[list[str]]:
+        hands = sample_hands(amount)
+        opponent_belief.drawn_hands.extend(hands)
+        return hands
+
+    opponent_belief.sample_hands = recording_sample_hands
+    return opponent_belief
+
+
+@pytest.fixture
+def bot(game: Game) -> Bot:
+    """
+    Return a hard bot (it searches and ponders) that always answers and has a move on "cat".
+    """
+    hard_bot = Bot(Bot.Difficulty.HARD, ["b", "h", "m", "r", "s"], seed=1, settings=game.object_settings)
+    hard_bot.update_difficulty_settings({"ANSWER_PROBABILITY": 1})
+    return hard_bot
+
+
+def test_search_uses_believed_hand(monkeypatch, bot: Bot, belief: OpponentBelief):
+    searched_hands = []
+    monkeypatch.setattr(AnytimeSearch, "start",
+                        lambda search, word, bot_cards, opponent_cards, *budgets: searched_hands.append(opponent_cards))
+
+    # At the end of the timer the bot still has all of its answer time to search.
+    bot.play_turn("cat", bot.game_settings.TURN_TIME_LIMIT, TRUE_OPPONENT_CARDS, belief=belief)
+
+    assert searched_hands, "the bot didn't search"
+    for opponent_cards in searched_hands:
+        assert sorted(opponent_cards) != TRUE_OPPONENT_CARDS
+        assert opponent_cards in belief.drawn_hands
+
+
+def test_pondering_uses_believed_hands(monkeypatch, bot: Bot, belief: OpponentBelief):
+    pondered_positions = []
+    monkeypatch.setattr(AnytimeSearch, "start_pondering",
+                        lambda search, positions, *budgets: pondered_positions.extend(positions))
+
+    bot.ponder("cat", belief=belief)
+
+    assert pondered_positions, "the bot didn't ponder"
+    assert len(belief.drawn_hands) == Bot.PONDER_SAMPLES
+    for new_word, _, opponent_cards_after in pondered_positions:
+        # The hand after the move is one of the drawn hands without the card that was played.
+        card = next(letter for letter, old_letter in zip(new_word, "cat") if letter != old_letter)
+        assert sorted(opponent_cards_after + [card]) in [sorted(hand) for hand in belief.drawn_hands]